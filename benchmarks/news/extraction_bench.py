@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Content Extraction Benchmark: article body length, quality and cost per method
+
+Renders article pages from the replay fixtures (no server needed) and runs:
+- all_p     the previous behaviour: join every <p> on the page
+- selector  content_extractor with the site's content_tag from get_sites()
+- learned   content_extractor without selectors: the first page per site is
+            found by text density, later pages reuse the learned template
+
+Per site and method it reports average content length, body recall (share
+of the article's real paragraphs kept), noise (characters that are not body
+text) and extraction time per article (HTML parsing excluded).
+
+Examples:
+  python benchmarks/news/extraction_bench.py
+  python benchmarks/news/extraction_bench.py --articles 500 --json extraction.json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+BENCH_DIR = Path(__file__).resolve().parent
+HELPER_DIR = BENCH_DIR.parents[1] / "src" / "helper"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(HELPER_DIR))
+
+from replay_server import ReplayCorpus  # noqa: E402
+from scraper import get_sites  # noqa: E402
+from content_extractor import ContentExtractor  # noqa: E402
+
+METHODS = ["all_p", "selector", "learned"]
+
+
+def _all_p(soup):
+    return " ".join(p.get_text(" ", strip=True) for p in soup.find_all("p"))
+
+
+def _score(content, body):
+    kept = [p for p in body if p in content]
+    body_chars = sum(len(p) for p in kept)
+    return len(kept) / len(body), max(0, len(content) - body_chars - len(kept))
+
+
+def run(articles_per_site):
+    sites = get_sites()
+    corpus = ReplayCorpus([s["url"] for s in sites], articles_per_site=articles_per_site)
+    workdir = Path(tempfile.mkdtemp(prefix="extraction_bench_"))
+
+    results = []
+    for site in sites:
+        netloc = site["url"].split("/")[2]
+        url = site["url"]
+        pages = [(corpus.article(netloc, i), corpus.body_paragraphs(i)) for i in range(articles_per_site)]
+        extractors = {
+            "selector": ContentExtractor(templates_file=str(workdir / f"{netloc}_selector.json")),
+            "learned": ContentExtractor(templates_file=str(workdir / f"{netloc}_learned.json")),
+        }
+
+        for method in METHODS:
+            chars = recall = noise = 0
+            elapsed = 0.0
+            for html, body in pages:
+                soup = BeautifulSoup(html, "html.parser")
+                t0 = time.perf_counter()
+                if method == "all_p":
+                    content = _all_p(soup)
+                elif method == "selector":
+                    content = extractors["selector"].extract(soup, url, site.get("content_tag"))
+                else:
+                    content = extractors["learned"].extract(soup, url)
+                elapsed += time.perf_counter() - t0
+
+                r, n = _score(content, body)
+                chars += len(content)
+                recall += r
+                noise += n
+
+            count = len(pages)
+            results.append({
+                "site": netloc,
+                "method": method,
+                "articles": count,
+                "avg_chars": round(chars / count, 1),
+                "body_recall": round(recall / count, 4),
+                "avg_noise_chars": round(noise / count, 1),
+                "ms_per_article": round(elapsed / count * 1000, 3),
+            })
+    return results
+
+
+def print_report(results):
+    header = f"{'site':<24} {'method':<9} {'avg_chars':>10} {'recall':>7} {'noise':>7} {'ms/art':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['site']:<24} {r['method']:<9} {r['avg_chars']:>10.0f} {r['body_recall']:>7.1%} "
+              f"{r['avg_noise_chars']:>7.0f} {r['ms_per_article']:>8.3f}")
+
+    print()
+    for method in METHODS:
+        rows = [r for r in results if r["method"] == method]
+        chars = sum(r["avg_chars"] for r in rows) / len(rows)
+        noise = sum(r["avg_noise_chars"] for r in rows) / len(rows)
+        recall = sum(r["body_recall"] for r in rows) / len(rows)
+        ms = sum(r["ms_per_article"] for r in rows) / len(rows)
+        print(f"{'ALL':<24} {method:<9} {chars:>10.0f} {recall:>7.1%} {noise:>7.0f} {ms:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare article body extraction methods on replay fixtures")
+    parser.add_argument("--articles", type=int, default=200, help="Articles per site")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.articles)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
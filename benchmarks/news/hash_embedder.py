@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for sentence_transformers.SentenceTransformer
+
+Installed as sys.modules["sentence_transformers"] when the real model is not
+available (or --embedder hash is requested). Produces 384-dim hashed
+bag-of-words vectors, so index/query cost reflects the pipeline itself rather
+than transformer inference.
+"""
+import re
+import zlib
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class SentenceTransformer:
+    def __init__(self, model_name_or_path=None, dim=384, **kwargs):
+        self.model_name = model_name_or_path
+        self.dim = dim
+
+    def encode(self, sentences, show_progress_bar=False, **kwargs):
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        out = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            for token in _TOKEN.findall(text.lower()):
+                h = zlib.crc32(token.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+            norm = np.linalg.norm(out[row])
+            if norm > 0:
+                out[row] /= norm
+        return out
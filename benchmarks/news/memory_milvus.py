@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+In-memory stand-in for the subset of pymilvus used by rag_indexer.py / rag_query.py
+
+Installed as sys.modules["pymilvus"] by the benchmark driver so the indexer and
+querier run unmodified without a Milvus server. Vectors live in a NumPy matrix,
+search is exact L2 (the same ranking IVF_FLAT converges to at full nprobe), and
+filter expressions support the forms the pipeline emits:
+    field op literal [and field op literal ...]   (op: == != > >= < <=)
+    field in [literal, ...]
+"""
+import ast
+import re
+from types import SimpleNamespace
+
+import numpy as np
+
+_COLLECTIONS = {}
+
+
+class DataType:
+    INT64 = "INT64"
+    VARCHAR = "VARCHAR"
+    FLOAT_VECTOR = "FLOAT_VECTOR"
+
+
+class FieldSchema:
+    def __init__(self, name, dtype, is_primary=False, auto_id=False, **params):
+        self.name = name
+        self.dtype = dtype
+        self.is_primary = is_primary
+        self.auto_id = auto_id
+        self.params = params
+
+
+class CollectionSchema:
+    def __init__(self, fields, description=""):
+        self.fields = fields
+        self.description = description
+
+
+class _Connections:
+    def connect(self, alias="default", **kwargs):
+        self.alias = alias
+        self.kwargs = kwargs
+
+
+connections = _Connections()
+
+
+class _Utility:
+    def has_collection(self, name):
+        return name in _COLLECTIONS
+
+    def drop_collection(self, name):
+        _COLLECTIONS.pop(name, None)
+
+
+utility = _Utility()
+
+
+def reset():
+    """Forget every collection (used between benchmark runs in one process)."""
+    _COLLECTIONS.clear()
+
+
+class _Store:
+    def __init__(self, schema):
+        self.schema = schema
+        self.columns = {f.name: [] for f in schema.fields if f.dtype != DataType.FLOAT_VECTOR}
+        self.vector_field = next(f.name for f in schema.fields if f.dtype == DataType.FLOAT_VECTOR)
+        dim = next(f.params.get("dim", 0) for f in schema.fields if f.name == self.vector_field)
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.pending = []
+        self.next_id = 1
+        self.indexes = []
+
+
+_CONDITION = re.compile(r"^\s*(\w+)\s*(==|!=|>=|<=|>|<|in\b)\s*(.+?)\s*$")
+_OPS = {
+    "==": np.equal, "!=": np.not_equal,
+    ">=": np.greater_equal, "<=": np.less_equal,
+    ">": np.greater, "<": np.less,
+}
+
+
+class _Hit:
+    def __init__(self, id_, distance, entity):
+        self.id = id_
+        self.distance = distance
+        self.entity = entity
+
+
+class Collection:
+    def __init__(self, name, schema=None, **kwargs):
+        if name not in _COLLECTIONS:
+            if schema is None:
+                raise Exception(f"collection not found[collection={name}]")
+            _COLLECTIONS[name] = _Store(schema)
+        self.name = name
+        self._store = _COLLECTIONS[name]
+
+    @property
+    def schema(self):
+        return self._store.schema
+
+    @property
+    def indexes(self):
+        return [SimpleNamespace(field_name=field, params=params) for field, params in self._store.indexes]
+
+    @property
+    def num_entities(self):
+        self.flush()
+        return len(self._store.columns["id"])
+
+    def create_index(self, field_name, index_params=None, **kwargs):
+        self._store.indexes.append((field_name, index_params or {}))
+
+    def load(self, *args, **kwargs):
+        pass
+
+    def insert(self, entities):
+        self._store.pending.append(entities)
+        return SimpleNamespace(insert_count=len(entities[0]) if entities else 0)
+
+    def flush(self, *args, **kwargs):
+        store = self._store
+        for entities in store.pending:
+            fields = [f for f in store.schema.fields if not (f.is_primary and f.auto_id)]
+            count = len(entities[0]) if entities else 0
+            store.columns["id"].extend(range(store.next_id, store.next_id + count))
+            store.next_id += count
+            for field, values in zip(fields, entities):
+                if field.name == store.vector_field:
+                    block = np.asarray(values, dtype=np.float32).reshape(count, -1)
+                    store.vectors = np.vstack([store.vectors, block]) if len(store.vectors) else block
+                else:
+                    store.columns[field.name].extend(values)
+        store.pending = []
+
+    def _mask(self, expr):
+        size = len(self._store.columns["id"])
+        mask = np.ones(size, dtype=bool)
+        if not expr:
+            return mask
+        for clause in re.split(r"\s+and\s+", expr.strip()):
+            match = _CONDITION.match(clause)
+            if not match:
+                raise ValueError(f"Unsupported expression: {clause}")
+            field, op, literal = match.group(1), match.group(2), ast.literal_eval(match.group(3))
+            column = np.asarray(self._store.columns[field], dtype=object)
+            if op == "in":
+                allowed = set(literal)
+                mask &= np.fromiter((v in allowed for v in column), dtype=bool, count=size)
+            else:
+                mask &= _OPS[op](column, literal).astype(bool)
+        return mask
+
+    def _entity(self, row, output_fields):
+        columns = self._store.columns
+        return {f: columns[f][row] for f in (output_fields or []) if f in columns}
+
+    def query(self, expr="", output_fields=None, limit=None, offset=0, **kwargs):
+        self.flush()
+        rows = np.flatnonzero(self._mask(expr))[offset:]
+        if limit is not None:
+            rows = rows[:limit]
+        results = []
+        for row in rows:
+            entity = self._entity(row, output_fields)
+            entity["id"] = self._store.columns["id"][row]
+            results.append(entity)
+        return results
+
+    def search(self, data, anns_field, param=None, limit=10, expr=None, output_fields=None, **kwargs):
+        self.flush()
+        rows = np.flatnonzero(self._mask(expr))
+        vectors = self._store.vectors[rows]
+        all_hits = []
+        for query in np.asarray(data, dtype=np.float32):
+            if len(rows) == 0:
+                all_hits.append([])
+                continue
+            distances = ((vectors - query) ** 2).sum(axis=1)
+            k = min(limit, len(rows))
+            top = np.argpartition(distances, k - 1)[:k]
+            top = top[np.argsort(distances[top], kind="stable")]
+            all_hits.append([
+                _Hit(self._store.columns["id"][rows[i]], float(distances[i]), self._entity(rows[i], output_fields))
+                for i in top
+            ])
+        return all_hits
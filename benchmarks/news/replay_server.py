@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Replay Server: local stand-in for the six news sites in scraper.get_sites()
+
+Serves the HTML fixtures in fixtures/<netloc>/ so the scraper can be exercised
+without touching the live sites:
+    /<netloc><listing path>[?page=N]   -> listing.html with one item.html per article
+    /<netloc>/read/<i>/<slug>.html      -> article.html for article i
+
+Article i of every site is published `spacing_minutes * i` before the server
+started (newest first), so listing order and publish dates behave like the
+real feeds. Run standalone for manual poking:
+    python benchmarks/news/replay_server.py --articles_per_site 50 --port 8765
+"""
+import argparse
+import multiprocessing
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+WIB = timezone(timedelta(hours=7))
+
+HARI = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+BULAN = ["Januari", "Februari", "Maret", "April", "Mei", "Juni", "Juli",
+         "Agustus", "September", "Oktober", "November", "Desember"]
+
+HEADLINES = [
+    "IHSG Ditutup Menguat, Asing Borong Saham Perbankan",
+    "Saham Batu Bara Tertekan Harga Acuan Newcastle",
+    "Emiten Nikel Berbalik Melemah di Sesi Kedua",
+    "Rupiah Menguat Tipis, Investor Cermati Data Inflasi AS",
+    "Laba Kuartal III Tumbuh Dua Digit, Saham Konsumer Diburu",
+    "OJK Perketat Pengawasan Transaksi Saham Gorengan",
+    "Analis Rekomendasikan Saham Blue Chip Jelang Akhir Tahun",
+    "Emiten Properti Catat Lonjakan Volume Transaksi",
+    "Dividen Interim Rp120 per Saham, Cum Date Akhir Bulan",
+    "Bursa Asia Bervariasi, Hang Seng Tertekan Data China",
+]
+
+
+def _slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def _published_text(dt):
+    return f"{HARI[dt.weekday()]}, {dt.day:02d} {BULAN[dt.month - 1]} {dt.year} {dt:%H:%M} WIB"
+
+
+class ReplayCorpus:
+    """Renders listing and article pages for every fixture site."""
+
+    def __init__(self, site_urls, articles_per_site=50, per_page=None, spacing_minutes=30, anchor=None):
+        self.articles_per_site = articles_per_site
+        self.per_page = per_page or articles_per_site
+        self.spacing = timedelta(minutes=spacing_minutes)
+        self.anchor = (anchor or datetime.now(WIB)).replace(microsecond=0)
+        self.paragraphs = (FIXTURES_DIR / "paragraphs.txt").read_text(encoding="utf-8").split("\n")
+        self.paragraphs = [p for p in self.paragraphs if p.strip()]
+
+        self.sites = {}
+        for url in site_urls:
+            parsed = urlparse(url)
+            fixture_dir = FIXTURES_DIR / parsed.netloc
+            self.sites[parsed.netloc] = {
+                "listing_path": parsed.path,
+                "listing": Template((fixture_dir / "listing.html").read_text(encoding="utf-8")),
+                "item": Template((fixture_dir / "item.html").read_text(encoding="utf-8")),
+                "article": Template((fixture_dir / "article.html").read_text(encoding="utf-8")),
+            }
+
+    def _article_meta(self, netloc, index):
+        label = netloc.replace("www.", "").split(".")[0]
+        title = f"{HEADLINES[index % len(HEADLINES)]} ({label} #{index})"
+        published = self.anchor - self.spacing * index
+        slug = _slugify(title)
+        return {
+            "title": title,
+            "slug": slug,
+            "href": f"/{netloc}/read/{index}/{slug}.html",
+            "published_iso": published.isoformat(),
+            "published_text": _published_text(published),
+        }
+
+    def listing(self, netloc, page=1):
+        site = self.sites[netloc]
+        start = (page - 1) * self.per_page
+        end = min(start + self.per_page, self.articles_per_site)
+        items = "\n".join(
+            site["item"].safe_substitute(self._article_meta(netloc, i)) for i in range(start, end)
+        )
+        next_page = ""
+        if end < self.articles_per_site:
+            next_page = f'<a class="next" rel="next" href="/{netloc}{site["listing_path"]}?page={page + 1}">Berikutnya</a>'
+        return site["listing"].safe_substitute(items=items, next_page=next_page)
+
+    def body_paragraphs(self, index):
+        """The real article text of article `index`, without any page boilerplate."""
+        count = 6 + index % 5
+        return [self.paragraphs[(index * 7 + k * 3) % len(self.paragraphs)] for k in range(count)]
+
+    def article(self, netloc, index):
+        meta = self._article_meta(netloc, index)
+        paragraphs = [f"    <p>{text}</p>" for text in self.body_paragraphs(index)]
+        half = len(paragraphs) // 2
+        return self.sites[netloc]["article"].safe_substitute(
+            meta,
+            body="\n".join(paragraphs[:half]),
+            body_tail="\n".join(paragraphs[half:]),
+        )
+
+
+def _make_handler(corpus, latency_ms):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000.0)
+
+            parsed = urlparse(self.path)
+            parts = parsed.path.lstrip("/").split("/", 1)
+            netloc = parts[0]
+            rest = "/" + (parts[1] if len(parts) > 1 else "")
+            site = corpus.sites.get(netloc)
+
+            body = None
+            if site is not None:
+                if rest == site["listing_path"]:
+                    page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+                    body = corpus.listing(netloc, page)
+                else:
+                    match = re.match(r"^/read/(\d+)/", rest)
+                    if match and int(match.group(1)) < corpus.articles_per_site:
+                        body = corpus.article(netloc, int(match.group(1)))
+
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return ReplayHandler
+
+
+def serve(corpus, host="127.0.0.1", port=0, latency_ms=0):
+    """Start a threaded server in the current process. Returns (server, thread)."""
+    server = ThreadingHTTPServer((host, port), _make_handler(corpus, latency_ms))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+def _serve_process(site_urls, articles_per_site, per_page, spacing_minutes, latency_ms, port_queue):
+    corpus = ReplayCorpus(site_urls, articles_per_site, per_page, spacing_minutes)
+    server, thread = serve(corpus, latency_ms=latency_ms)
+    port_queue.put(server.server_address[1])
+    thread.join()
+
+
+def start_in_subprocess(site_urls, articles_per_site=50, per_page=None, spacing_minutes=30, latency_ms=0):
+    """
+    Start the replay server in a child process so its CPU and memory do not
+    pollute the scraper measurements. Returns (process, base_url).
+    """
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_serve_process,
+        args=(site_urls, articles_per_site, per_page, spacing_minutes, latency_ms, port_queue),
+        daemon=True,
+    )
+    process.start()
+    port = port_queue.get(timeout=30)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def replay_url(base_url, site_url):
+    """Map a live listing URL onto the replay server."""
+    parsed = urlparse(site_url)
+    return f"{base_url}/{parsed.netloc}{parsed.path}"
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "helper"))
+    from scraper import get_sites
+
+    parser = argparse.ArgumentParser(description="Serve recorded news-site fixtures locally")
+    parser.add_argument("--articles_per_site", type=int, default=50)
+    parser.add_argument("--per_page", type=int, default=None, help="Listing items per page (default: all on one page)")
+    parser.add_argument("--spacing_minutes", type=int, default=30, help="Minutes between consecutive articles")
+    parser.add_argument("--latency_ms", type=int, default=0, help="Artificial latency per request")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    sites = get_sites()
+    corpus = ReplayCorpus([s["url"] for s in sites], args.articles_per_site, args.per_page, args.spacing_minutes)
+    server, thread = serve(corpus, port=args.port, latency_ms=args.latency_ms)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    for site in sites:
+        print(replay_url(base, site["url"]))
+    thread.join()
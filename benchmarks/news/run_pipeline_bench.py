@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+News Pipeline Benchmark: offline scrape → index → query at configurable corpus sizes
+
+Runs the real scraper.py / rag_indexer.py / rag_query.py code against:
+- replay_server.py  (recorded HTML fixtures for all six sites, served locally)
+- memory_milvus.py  (in-memory pymilvus stand-in) or Milvus Lite (--store lite)
+- the real embedding model when installed, else hash_embedder.py (--embedder)
+
+Each corpus size runs in a fresh child process so peak RSS is per run.
+Reports wall time, CPU time, peak RSS and throughput per stage.
+
+Examples:
+  python benchmarks/news/run_pipeline_bench.py
+  python benchmarks/news/run_pipeline_bench.py --sizes 60,600,3000 --latency_ms 20
+  python benchmarks/news/run_pipeline_bench.py --json after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+HELPER_DIR = BENCH_DIR.parents[1] / "src" / "helper"
+RESULT_PREFIX = "BENCH_RESULT "
+
+DEFAULT_QUERY = "today's indonesia stock market movements, price changes, trading analysis, and financial news"
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def stage(results, name, items=None):
+    """Record wall time, CPU time and peak RSS of the enclosed block."""
+    record = {"stage": name}
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = round(time.perf_counter() - wall0, 4)
+        record["cpu_s"] = round(time.process_time() - cpu0, 4)
+        record["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+        count = record.get("items", items)
+        if count is not None:
+            record["items"] = count
+            record["items_per_s"] = round(count / record["wall_s"], 2) if record["wall_s"] > 0 else None
+        results.append(record)
+
+
+def _install_stand_ins(store, embedder):
+    """Swap in the Milvus / embedding stand-ins before the helpers are imported."""
+    sys.path.insert(0, str(BENCH_DIR))
+    sys.path.insert(0, str(HELPER_DIR))
+
+    if store == "memory":
+        import memory_milvus
+        sys.modules["pymilvus"] = memory_milvus
+
+    used_embedder = embedder
+    if embedder == "auto":
+        try:
+            import sentence_transformers  # noqa: F401
+            used_embedder = "model"
+        except ImportError:
+            used_embedder = "hash"
+    if used_embedder == "hash":
+        import hash_embedder
+        sys.modules["sentence_transformers"] = hash_embedder
+    return used_embedder
+
+
+def run_single(args, size):
+    """Benchmark one corpus size in this process and return its result dict."""
+    workdir = Path(tempfile.mkdtemp(prefix="news_bench_"))
+    if args.store == "lite":
+        os.environ["MILVUS_URI"] = str(workdir / "milvus_lite.db")
+    used_embedder = _install_stand_ins(args.store, args.embedder)
+
+    import replay_server
+    import scraper
+    from rag_indexer import NewsIndexer
+    from rag_query import NewsQuerier
+
+    if args.host_rate:
+        scraper.rate_limiter = scraper.HostRateLimiter(rate=args.host_rate, max_rate=args.host_rate)
+    scraper.extractor = scraper.ContentExtractor(templates_file=str(workdir / "content_templates.json"))
+
+    sites = scraper.get_sites()
+    articles_per_site = max(1, size // len(sites))
+    server, base_url = replay_server.start_in_subprocess(
+        [s["url"] for s in sites],
+        articles_per_site=articles_per_site,
+        per_page=args.per_page,
+        spacing_minutes=args.spacing_minutes,
+        latency_ms=args.latency_ms,
+    )
+    replay_sites = [dict(s, url=replay_server.replay_url(base_url, s["url"])) for s in sites]
+
+    stages = []
+    news_file = workdir / "news.txt"
+    condensed_file = workdir / "news_condensed.txt"
+    collection_name = f"bench_{size}_{os.getpid()}"
+
+    try:
+        with stage(stages, "scrape") as record:
+            articles = scraper.scrape_sites(replay_sites, max_items=size, days_back=args.days_back)
+            scraper.save_to_txt(articles, filename=str(news_file))
+            record["items"] = len(articles)
+            record["content_chars"] = sum(len(a.get("content", "")) for a in articles)
+
+        with stage(stages, "index_setup"):
+            indexer = NewsIndexer(collection_name=collection_name)
+
+        with stage(stages, "index") as record:
+            record["items"] = indexer.index_from_file(str(news_file))
+
+        # Incremental run: everything is indexed now, so each site should stop
+        # after one listing page without fetching any article
+        with stage(stages, "rescrape") as record:
+            seen_links = indexer.get_existing_links()
+            again = scraper.scrape_sites(replay_sites, max_items=size, days_back=args.days_back,
+                                         seen_links=seen_links)
+            record["items"] = len(again)
+
+        with stage(stages, "query_setup"):
+            querier = NewsQuerier(collection_name=collection_name)
+
+        with stage(stages, "query", items=args.queries) as record:
+            retrieved = []
+            for _ in range(args.queries):
+                retrieved = querier.search(DEFAULT_QUERY, top_k=args.top_k, days_back=args.days_back)
+            querier.export_to_condensed(retrieved, output_file=str(condensed_file), max_chars=args.max_chars)
+            record["retrieved"] = len(retrieved)
+    finally:
+        server.terminate()
+
+    return {
+        "size": size,
+        "store": args.store,
+        "embedder": used_embedder,
+        "latency_ms": args.latency_ms,
+        "stages": stages,
+        "total_wall_s": round(sum(s["wall_s"] for s in stages), 4),
+        "total_cpu_s": round(sum(s["cpu_s"] for s in stages), 4),
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in stages),
+    }
+
+
+def _child_args(args, size):
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--single", str(size)]
+    for name in ("store", "embedder", "latency_ms", "queries", "top_k", "days_back", "max_chars",
+                 "spacing_minutes", "host_rate", "per_page"):
+        value = getattr(args, name)
+        if value is not None:
+            cmd.extend([f"--{name}", str(value)])
+    return cmd
+
+
+def print_report(results, baseline=None):
+    baseline_index = {}
+    for run in baseline or []:
+        for s in run["stages"]:
+            baseline_index[(run["size"], s["stage"])] = s
+
+    header = f"{'size':>6} {'stage':<12} {'wall_s':>9} {'cpu_s':>9} {'rss_mb':>8} {'items':>7} {'items/s':>9}"
+    if baseline_index:
+        header += f" {'Δwall':>8}"
+    print(header)
+    print("-" * len(header))
+    for run in results:
+        for s in run["stages"]:
+            line = (f"{run['size']:>6} {s['stage']:<12} {s['wall_s']:>9.3f} {s['cpu_s']:>9.3f} "
+                    f"{s['peak_rss_mb']:>8.1f} {s.get('items', ''):>7} {s.get('items_per_s') or '':>9}")
+            base = baseline_index.get((run["size"], s["stage"]))
+            if base and base["wall_s"] > 0:
+                line += f" {(s['wall_s'] - base['wall_s']) / base['wall_s'] * 100:>+7.1f}%"
+            print(line)
+        print(f"{run['size']:>6} {'TOTAL':<12} {run['total_wall_s']:>9.3f} {run['total_cpu_s']:>9.3f} "
+              f"{run['peak_rss_mb']:>8.1f}   (store={run['store']}, embedder={run['embedder']})")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for scrape → index → query")
+    parser.add_argument("--sizes", type=str, default="60,300,1200",
+                        help="Comma-separated corpus sizes (total articles across all sites)")
+    parser.add_argument("--store", choices=["memory", "lite"], default="memory",
+                        help="Vector store: in-memory stand-in or Milvus Lite (needs milvus-lite)")
+    parser.add_argument("--embedder", choices=["auto", "model", "hash"], default="auto",
+                        help="Embedding backend (auto = real model if installed, else hash)")
+    parser.add_argument("--latency_ms", type=int, default=0, help="Artificial latency per HTTP request")
+    parser.add_argument("--per_page", type=int, default=20,
+                        help="Listing items per page, so larger sizes exercise pagination")
+    parser.add_argument("--spacing_minutes", type=int, default=30, help="Minutes between fixture articles")
+    parser.add_argument("--host_rate", type=float, default=1000.0,
+                        help="Per-host request rate for the scraper's limiter (default: 1000, effectively "
+                             "unthrottled so the stage measures the pipeline, not politeness delays)")
+    parser.add_argument("--queries", type=int, default=20, help="Number of searches in the query stage")
+    parser.add_argument("--top_k", type=int, default=50)
+    parser.add_argument("--days_back", type=int, default=None)
+    parser.add_argument("--max_chars", type=int, default=2000)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="Baseline JSON to compare wall time against")
+    parser.add_argument("--single", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        result = run_single(args, args.single)
+        print(RESULT_PREFIX + json.dumps(result))
+        return 0
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        log(f"Benchmarking corpus size {size}")
+        proc = subprocess.run(_child_args(args, size), capture_output=True, text=True)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith(RESULT_PREFIX)]
+        if proc.returncode != 0 or not lines:
+            log(f"Run for size {size} failed:\n{proc.stderr[-2000:]}")
+            return 1
+        results.append(json.loads(lines[-1][len(RESULT_PREFIX):]))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        log(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Backtest Benchmark: every strategy over years of a full synthetic universe
+
+Builds a deterministic synthetic panel (fake_yfinance random walks, no
+downloads), times run_backtest() for the four strategies at the endpoint
+defaults and prints each strategy's summary. The backtest's signals on the
+latest bar are then compared with what the live screeners pick from the
+same panel (screen_all_setups()): the symbols they agree on, and the ones
+only one of them picked, which come from the backtest's full-history
+indicator recursions (see backtest.py).
+
+Examples:
+  python benchmarks/stock_api/backtest_bench.py
+  python benchmarks/stock_api/backtest_bench.py --symbols 200 --history_days 1300 --hold 3 --cost_pct 0.4
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("FAKE_YF_LATENCY_MS", "0")
+os.environ.setdefault("INFO_PREWARM", "0")
+os.environ.setdefault("BAR_STORE_DIR", "")
+os.environ.setdefault("SYMBOL_MASTER_FILE", "")
+os.environ.setdefault("SCREEN_SCHEDULE", "")
+
+import fake_yfinance  # noqa: E402
+sys.modules["yfinance"] = fake_yfinance
+
+import pandas as pd  # noqa: E402
+
+import stock_api_server as api  # noqa: E402
+from backtest import BacktestFeatures, run_backtest, strategy_signals  # noqa: E402
+from market_data import OHLCVPanel  # noqa: E402
+
+# Endpoint defaults (/api/screen/all)
+SETTINGS = {
+    "preopen": {"min_score": 70, "min_avg_volume": 1000000, "enable_bandarmology": True},
+    "bpjs": {"min_score": 65, "min_avg_volume": 1000000, "enable_bandarmology": True},
+    "bsjp": {"min_score": 60, "min_avg_volume": 1000000, "enable_bandarmology": False},
+    "day_trade": {"mode": "mandiri"},
+}
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def build_universe(n_symbols, history_days):
+    symbols = [f"X{i:04d}" for i in range(n_symbols)]
+    frames = {s: fake_yfinance.bars(s + ".JK", history_days) for s in symbols}
+    panel = OHLCVPanel(pd.concat(frames, axis=1).sort_index(), period="max")
+    return symbols, panel
+
+
+def signal_settings(settings):
+    """backtest_strategies()'s translation of screen settings to signal arguments and periods"""
+    params, periods = {}, {}
+    for name, kwargs in settings.items():
+        if name == "day_trade":
+            params[name] = api._day_trade_thresholds(kwargs["mode"])
+            periods[name] = api.plan_screen_period(name)
+        else:
+            params[name] = dict(kwargs)
+            periods[name] = api.plan_screen_period(name, enable_bandarmology=kwargs["enable_bandarmology"])
+    return params, periods
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest speed and agreement with the live screeners")
+    parser.add_argument("--symbols", type=int, default=900, help="Universe size")
+    parser.add_argument("--history_days", type=int, default=1300, help="Bars per symbol (1300 = about 5 years)")
+    parser.add_argument("--hold", type=int, default=1, help="Bars each trade is held at most")
+    parser.add_argument("--cost_pct", type=float, default=0.0, help="Round-trip cost per trade in percent")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs (best is kept)")
+    args = parser.parse_args()
+
+    symbols, panel = build_universe(args.symbols, args.history_days)
+    log(f"Universe: {len(symbols)} symbols x {args.history_days} bars")
+    params, periods = signal_settings(SETTINGS)
+
+    best = None
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        features = BacktestFeatures(panel, symbols)
+        result = run_backtest(panel, params, periods=periods, hold=args.hold, cost_pct=args.cost_pct, features=features)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"{'strategy':<10} {'signals':>8} {'trades':>7} {'hit%':>6} {'target%':>8} {'stop%':>6} "
+          f"{'exp%':>7} {'expR':>6} {'PF':>5} {'maxDD%':>7}")
+    for name, s in result["strategies"].items():
+        if not s["trades"]:
+            print(f"{name:<10} {s['signals']:>8} {0:>7}")
+            continue
+        print(f"{name:<10} {s['signals']:>8} {s['trades']:>7} {s['hit_rate_pct']:>6} {s['target_rate_pct']:>8} "
+              f"{s['stop_rate_pct']:>6} {s['expectancy_pct']:>7} {s['expectancy_r']:>6} "
+              f"{s['profit_factor'] if s['profit_factor'] is not None else '-':>5} {s['max_drawdown_pct']:>7}")
+    print(f"backtest: {len(symbols)} symbols x {args.history_days} bars ({result['from']} to {result['to']}) in {best:.2f}s")
+
+    # The latest bar against the live screens
+    t0 = time.perf_counter()
+    live = api.screen_all_setups(symbols, SETTINGS, limit=None, panel=panel)
+    log(f"Live screens in {time.perf_counter() - t0:.2f}s")
+    print(f"{'strategy':<10} {'live':>5} {'backtest':>8} {'both':>5} {'live only':>9} {'bt only':>7}")
+    for name in SETTINGS:
+        signal = strategy_signals(features, name, periods[name], **params[name])[0][-1]
+        picked = {s for s, hit in zip(features.symbols, signal) if hit}
+        screened = {c["symbol"] for c in live[name]}
+        print(f"{name:<10} {len(screened):>5} {len(picked):>8} {len(screened & picked):>5} "
+              f"{len(screened - picked):>9} {len(picked - screened):>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
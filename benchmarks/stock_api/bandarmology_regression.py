@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Bandarmology Regression: panel_bandarmology() vs calculate_bandarmology()
+
+Builds a fixture panel from fake_yfinance.py bars and compares the
+vectorized result for every symbol with the per-symbol function on
+panel.history(symbol). Besides plain random walks the fixture includes:
+- short histories (30, 40, 45, 49, 50 bars) around the 40/50-bar gates
+- symbols listed late and symbols with missing sessions (holes in the panel)
+- flat bars (High == Low), zero-volume days and an all-zero-volume symbol
+- closes pinned at the high and untraded tails that drive MFI to 100 or 0/0
+- volume-backed breakouts that close above the day's High (bad adjusted bars)
+
+Exits non-zero on any difference and reports the time of both paths.
+
+Examples:
+  python benchmarks/stock_api/bandarmology_regression.py
+  python benchmarks/stock_api/bandarmology_regression.py --symbols 900 --period 1y
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+
+import fake_yfinance  # noqa: E402
+sys.modules["yfinance"] = fake_yfinance
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from market_data import OHLCVPanel  # noqa: E402
+from panel_indicators import panel_bandarmology  # noqa: E402
+from stock_api_server import calculate_bandarmology  # noqa: E402
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def build_fixture(n_symbols, period):
+    rng = np.random.default_rng(7)
+    frames = {}
+    for i in range(n_symbols):
+        symbol = f"X{i:04d}"
+        frame = fake_yfinance._window(fake_yfinance.bars(symbol + ".JK"), period=period).copy()
+        kind = i % 10
+        if kind == 1:
+            frame = frame.tail([30, 40, 45, 49, 50][(i // 10) % 5])  # short or late-listed
+        elif kind == 2:
+            frame = frame.drop(frame.index[rng.choice(len(frame) - 1, size=len(frame) // 8, replace=False)])  # suspended days
+        elif kind == 3:
+            flat = rng.choice(len(frame), size=len(frame) // 5, replace=False)
+            frame.iloc[flat, :4] = frame["Close"].iloc[flat].to_numpy()[:, None]  # High == Low == Open == Close
+            frame.iloc[rng.choice(len(frame), size=len(frame) // 6, replace=False), 4] = 0.0
+        elif kind == 4:
+            frame["Close"] = frame["High"]  # closes at the high every day: MFI pinned near 100
+        elif kind == 5 and i % 20 == 5:
+            frame["Volume"] = 0.0
+        elif kind == 7:
+            # Rising closes into a volume-backed breakout: MARKUP. The 20-day high
+            # includes today's bar, so this needs a Close above the High, as
+            # adjusted Yahoo bars occasionally have
+            frame.iloc[-12:, :4] = frame.iloc[-12:, :4].mul(1.01 ** np.arange(1, 13), axis=0).round()
+            frame.iloc[-12:, 3] = frame["High"].iloc[-12:]
+            breakout = frame["High"].iloc[-21:].max() * 1.05
+            frame.iloc[-1, :4] = [frame["Close"].iloc[-2], breakout, frame["Close"].iloc[-2], breakout + 1]
+            frame.iloc[-1, 4] = frame["Volume"].iloc[-21:].mean() * 3
+        elif kind == 6:
+            frame.iloc[-15:, :4] = frame["Close"].iloc[-16]  # untraded tail: flat prices, MFI 0/0
+        frames[symbol] = frame
+    frame = pd.concat(frames, axis=1).sort_index()
+    return list(frames), OHLCVPanel(frame, period=period)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vectorized and per-symbol bandarmology")
+    parser.add_argument("--symbols", type=int, default=400, help="Symbols in the fixture")
+    parser.add_argument("--period", type=str, default="6mo", help="History period per symbol")
+    args = parser.parse_args()
+
+    symbols, panel = build_fixture(args.symbols, args.period)
+    log(f"Fixture: {len(symbols)} symbols x {len(panel.frame)} dates")
+
+    t0 = time.perf_counter()
+    expected = {s: calculate_bandarmology(panel.history(s)) for s in symbols}
+    per_symbol_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = panel_bandarmology(panel, symbols)
+    panel_s = time.perf_counter() - t0
+
+    mismatches = [s for s in symbols if actual.get(s) != expected[s]]
+    for symbol in mismatches[:5]:
+        log(f"{symbol} differs:\n  expected {expected[symbol]}\n  actual   {actual.get(symbol)}")
+
+    phases = pd.Series([r["phase"] for r in expected.values()]).value_counts().to_dict()
+    print(f"symbols:      {len(symbols)} ({', '.join(f'{k} {v}' for k, v in phases.items())})")
+    print(f"mismatches:   {len(mismatches)}")
+    print(f"per-symbol:   {per_symbol_s * 1000:.0f} ms")
+    print(f"panel:        {panel_s * 1000:.0f} ms ({per_symbol_s / panel_s:.0f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
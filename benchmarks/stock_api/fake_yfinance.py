@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the subset of yfinance used by the stock API
+
+Installed as sys.modules["yfinance"] by the benchmark drivers so the server
+code runs unmodified without Yahoo. Bars are a deterministic random walk per
+ticker on IDX business days; FAKE_YF_LATENCY_MS adds a per-request delay
+(yf.download pays it once per `threads`-sized wave of tickers, like the real
+threaded download).
+"""
+import math
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+LATENCY_MS = float(os.getenv("FAKE_YF_LATENCY_MS", "150"))
+HISTORY_DAYS = int(os.getenv("FAKE_YF_HISTORY_DAYS", "1300"))
+
+_PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+
+
+def _sleep(requests=1):
+    if LATENCY_MS:
+        time.sleep(LATENCY_MS / 1000.0 * requests)
+
+
+def bars(ticker, periods=None):
+    """Full synthetic daily history of a ticker (most recent bar = last business day)."""
+    periods = periods or HISTORY_DAYS
+    end = pd.Timestamp.now(tz="Asia/Jakarta").normalize()
+    index = pd.bdate_range(end=end, periods=periods, tz="Asia/Jakarta", name="Date")
+    rng = np.random.default_rng(zlib.crc32(ticker.encode("utf-8")))
+    drift = rng.normal(0.0004, 0.0008)
+    close = rng.uniform(200, 9000) * np.exp(np.cumsum(rng.normal(drift, 0.021, periods)))
+    spread = np.abs(rng.normal(0, 0.012, periods))
+    high = close * (1 + spread * rng.uniform(0.1, 1.0, periods))
+    low = close * (1 - spread * rng.uniform(0.1, 1.0, periods))
+    open_ = low + (high - low) * rng.uniform(0, 1, periods)
+    volume = rng.lognormal(math.log(rng.uniform(2e5, 8e7)), 0.55, periods).round()
+    # IDX tick sizes make prices whole rupiah
+    return pd.DataFrame(
+        {"Open": open_.round(), "High": high.round(), "Low": low.round(), "Close": close.round(), "Volume": volume},
+        index=index,
+    )
+
+
+def _window(frame, period=None, start=None, **kwargs):
+    if start is not None:
+        return frame[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+    if period in (None, "max"):
+        return frame
+    if period == "ytd":
+        return frame[frame.index.year == frame.index[-1].year]
+    return frame[frame.index > frame.index[-1] - pd.Timedelta(days=_PERIOD_DAYS[period])]
+
+
+class Ticker:
+    def __init__(self, ticker, session=None):
+        self.ticker = ticker
+
+    def history(self, period="1mo", interval="1d", start=None, **kwargs):
+        _sleep()
+        frame = _window(bars(self.ticker), period=period, start=start).copy()
+        frame["Dividends"] = 0.0
+        frame["Stock Splits"] = 0.0
+        return frame
+
+    @property
+    def info(self):
+        _sleep(2)  # info is one of the slow Yahoo calls
+        rng = np.random.default_rng(zlib.crc32(self.ticker.encode("utf-8")) + 1)
+        last = bars(self.ticker, 5)["Close"].iloc[-1]
+        shares = rng.uniform(1e9, 1.2e11)
+        return {
+            "symbol": self.ticker,
+            "currency": "IDR",
+            "marketCap": float(last * shares),
+            "trailingPE": float(rng.uniform(4, 40)),
+            "priceToBook": float(rng.uniform(0.5, 6)),
+            "trailingEps": float(last / rng.uniform(4, 40)),
+            "dividendYield": float(rng.uniform(0, 0.08)),
+            "beta": float(rng.uniform(0.4, 1.6)),
+        }
+
+
+def download(tickers, period=None, start=None, interval="1d", group_by="column", threads=True, **kwargs):
+    tickers = tickers if isinstance(tickers, (list, tuple, set)) else str(tickers).replace(",", " ").split()
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    workers = len(tickers) if threads is True else max(1, int(threads or 1))
+    _sleep(math.ceil(len(tickers) / workers))
+    frames = {t: _window(bars(t), period=period, start=start) for t in tickers}
+    if len(tickers) == 1 and group_by != "ticker":
+        return frames[tickers[0]]
+    return pd.concat(frames, axis=1)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Stock API Load Test: latency of lightweight endpoints while screens run
+
+Starts the API server in a child process with fake_yfinance.py standing in for
+Yahoo (or targets --url), then:
+1. idle:  hammers the lightweight endpoints alone
+2. load:  the same, while --screens concurrent /api/screen/* calls run
+and reports p50/p95/p99/max latency of the lightweight requests per phase.
+With blocking calls on the event loop the load-phase p99 is roughly the
+screening time; with them off-loop it stays in milliseconds.
+
+Examples:
+  python benchmarks/stock_api/load_test.py
+  python benchmarks/stock_api/load_test.py --screens 4 --latency_ms 300 --json load.json
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+
+LIGHT_ENDPOINTS = [
+    ("GET", "/api/news/status", None),
+    ("POST", "/api/market/time-context", {}),
+    ("POST", "/api/market/stock-list", {"stock_index": "LQ45"}),
+]
+SCREEN_ENDPOINTS = [
+    ("/api/screen/day-trade", {"stock_index": "BOTH", "limit": 10}),
+    ("/api/screen/bpjs", {"stock_index": "BOTH", "limit": 10}),
+    ("/api/screen/bsjp", {"stock_index": "BOTH", "limit": 10}),
+    ("/api/screen/preopen", {"stock_index": "BOTH", "limit": 10}),
+]
+
+SERVER_BOOT = """
+import sys
+sys.path.insert(0, {bench!r})
+sys.path.insert(0, {api!r})
+import fake_yfinance
+sys.modules["yfinance"] = fake_yfinance
+import uvicorn
+from stock_api_server import app
+uvicorn.run(app, host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(latency_ms, workdir):
+    port = _free_port()
+    env = dict(os.environ, FAKE_YF_LATENCY_MS=str(latency_ms), INFO_PREWARM="0",
+               BAR_STORE_DIR="")  # every screen downloads, the worst case
+    code = SERVER_BOOT.format(bench=str(BENCH_DIR), api=str(API_DIR), port=port)
+    server_log = open(os.path.join(workdir, "server.log"), "w")
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=workdir, env=env,
+                               stdout=server_log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(url + "/api/news/status", timeout=1)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def hammer(url, stop, clients, results):
+    """Fire lightweight requests from `clients` threads until `stop` is set."""
+    def worker(i):
+        session = requests.Session()
+        n = i
+        while not stop.is_set():
+            method, path, body = LIGHT_ENDPOINTS[n % len(LIGHT_ENDPOINTS)]
+            n += 1
+            t0 = time.perf_counter()
+            try:
+                session.request(method, url + path, json=body, timeout=120).raise_for_status()
+                results.append((time.perf_counter() - t0) * 1000)
+            except requests.RequestException:
+                results.append(float("inf"))
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def run_phase(url, clients, duration=None, screens=0):
+    results, stop = [], threading.Event()
+    threads = hammer(url, stop, clients, results)
+    screen_times = []
+    t0 = time.perf_counter()
+    if screens:
+        def screen(i):
+            path, body = SCREEN_ENDPOINTS[i % len(SCREEN_ENDPOINTS)]
+            s0 = time.perf_counter()
+            requests.post(url + path, json=body, timeout=600).raise_for_status()
+            screen_times.append(time.perf_counter() - s0)
+
+        with ThreadPoolExecutor(max_workers=screens) as pool:
+            list(pool.map(screen, range(screens)))
+    else:
+        time.sleep(duration)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in threads:
+        t.join()
+
+    ok = [r for r in results if r != float("inf")]
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "wall_s": round(elapsed, 2),
+        "p50_ms": round(percentile(ok, 50), 1) if ok else None,
+        "p95_ms": round(percentile(ok, 95), 1) if ok else None,
+        "p99_ms": round(percentile(ok, 99), 1) if ok else None,
+        "max_ms": round(max(ok), 1) if ok else None,
+        "screen_s": [round(s, 2) for s in screen_times],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of lightweight endpoints under screening load")
+    parser.add_argument("--url", type=str, default=None, help="Target a running server instead of starting one")
+    parser.add_argument("--screens", type=int, default=4, help="Concurrent screening requests in the load phase")
+    parser.add_argument("--clients", type=int, default=4, help="Threads issuing lightweight requests")
+    parser.add_argument("--idle_s", type=float, default=3.0, help="Duration of the idle phase")
+    parser.add_argument("--latency_ms", type=int, default=150, help="Fake Yahoo latency per request")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        workdir = BENCH_DIR / ".load_test"
+        workdir.mkdir(exist_ok=True)
+        process, url = start_server(args.latency_ms, str(workdir))
+    try:
+        log("Phase 1: lightweight endpoints only")
+        idle = run_phase(url, args.clients, duration=args.idle_s)
+        log(f"Phase 2: lightweight endpoints during {args.screens} concurrent screens")
+        load = run_phase(url, args.clients, screens=args.screens)
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    print(f"{'phase':<6} {'requests':>8} {'errors':>6} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+    for name, r in (("idle", idle), ("load", load)):
+        print(f"{name:<6} {r['requests']:>8} {r['errors']:>6} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+              f"{r['p99_ms']:>8} {r['max_ms']:>8}")
+    print(f"screens took: {', '.join(f'{s:.1f}s' for s in load['screen_s'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"idle": idle, "load": load, "args": vars(args)}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Record Fixtures: capture market data once, replay it offline
+
+Runs every screener over a universe through RecordingProvider, which saves
+the bars and Ticker.info it is served as replay fixtures (bar store layout
+plus info/). The source is fake_yfinance.py unless --live is given, in which
+case it is Yahoo itself. The same screens are then run again through
+ReplayProvider reading those fixtures, and the script checks they return
+identical candidates and reports both wall times.
+
+Replay the fixtures in the server or another benchmark with:
+  MARKET_DATA_PROVIDER=replay REPLAY_DIR=<out> REPLAY_LATENCY_MS=150
+
+Examples:
+  python benchmarks/stock_api/record_fixtures.py --out data/replay
+  python benchmarks/stock_api/record_fixtures.py --live --index LQ45 --out data/replay-lq45
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("INFO_PREWARM", "0")
+os.environ.setdefault("BAR_STORE_DIR", "")
+os.environ.setdefault("SYMBOL_MASTER_FILE", "")
+os.environ.setdefault("SCREEN_SCHEDULE", "")
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+# Endpoint defaults
+SETTINGS = {
+    "preopen": {"min_score": 70, "min_avg_volume": 1000000, "enable_bandarmology": True},
+    "bpjs": {"min_score": 65, "min_avg_volume": 1000000, "enable_bandarmology": True},
+    "bsjp": {"min_score": 60, "min_avg_volume": 1000000, "enable_bandarmology": False},
+    "day_trade": {"mode": "mandiri"},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record replay fixtures and check the replay matches")
+    parser.add_argument("--out", type=str, default="data/replay", help="Fixture directory")
+    parser.add_argument("--live", action="store_true", help="Record from Yahoo instead of fake_yfinance")
+    parser.add_argument("--index", type=str, default=None, help="Stock index to record (default LQ45+IDX30, or --symbols fake tickers)")
+    parser.add_argument("--symbols", type=int, default=200, help="Fake universe size when not --live")
+    parser.add_argument("--latency_ms", type=float, default=150, help="Latency per request, fake source and replay")
+    args = parser.parse_args()
+
+    os.environ["FAKE_YF_LATENCY_MS"] = str(args.latency_ms)
+    if not args.live:
+        import fake_yfinance
+        sys.modules["yfinance"] = fake_yfinance
+    import stock_api_server as api
+    from data_provider import RecordingProvider, ReplayProvider, YFinanceProvider, set_provider
+    from info_cache import InfoCache
+
+    if args.live or args.index:
+        symbols = api.get_all_idx_stocks(args.index)
+    else:
+        symbols = [f"X{i:04d}" for i in range(args.symbols)]
+
+    def run():
+        results = api.screen_all_setups(symbols, SETTINGS, limit=None)
+        cache = InfoCache()
+        info = {s: cache.get(s) for s in symbols}
+        return results, info
+
+    set_provider(RecordingProvider(YFinanceProvider(), args.out))
+    t0 = time.perf_counter()
+    recorded, recorded_info = run()
+    record_s = time.perf_counter() - t0
+    log(f"Recorded {len(symbols)} symbols to {args.out} in {record_s:.2f}s")
+
+    set_provider(ReplayProvider(args.out, latency_ms=args.latency_ms))
+    api.global_markets._entries.clear()
+    t0 = time.perf_counter()
+    replayed, replayed_info = run()
+    replay_s = time.perf_counter() - t0
+    log(f"Replayed in {replay_s:.2f}s")
+
+    identical = {name: recorded[name] == replayed[name] for name in SETTINGS}
+    identical["info"] = recorded_info == replayed_info
+    print(f"{'screen':<10} {'count':>6} {'identical':>9}")
+    for name in SETTINGS:
+        print(f"{name:<10} {len(replayed[name]):>6} {str(identical[name]):>9}")
+    print(f"info       {len(replayed_info):>6} {str(identical['info']):>9}")
+    print(f"wall time: record {record_s:.2f}s, replay {replay_s:.2f}s")
+    return 0 if all(identical.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark: screeners on synthetic universes from 50 to 2,000 symbols
+
+For each universe size, builds a deterministic synthetic panel (fake_yfinance
+random walks, --history_days bars per symbol, no downloads) and runs
+screen_preopen_setups, screen_bpjs_setups, screen_bsjp_setups,
+screen_day_trade_setups, per-symbol calculate_bandarmology and the
+vectorized panel_bandarmology on it. Every run starts with an empty feature
+store. Reports, per function and size: total time (best of --repeat),
+per-symbol latency and peak traced memory (tracemalloc, in a separate run so
+tracing does not slow the timings), plus the scaling exponent fitted over
+the sizes (1.0 = linear in the number of symbols).
+
+--save_baseline writes the results as JSON; --baseline compares against one
+and exits non-zero when a per-symbol latency or peak memory grew by more
+than --tolerance. benchmarks/stock_api/baselines/screen_scaling.json was
+recorded with the defaults on a 1-CPU container; record your own baseline on
+the machine you compare on.
+
+Examples:
+  python benchmarks/stock_api/scaling_bench.py
+  python benchmarks/stock_api/scaling_bench.py --sizes 50,500 --baseline benchmarks/stock_api/baselines/screen_scaling.json
+  python benchmarks/stock_api/scaling_bench.py --sizes 50,100,250,500,1000,2000 --save_baseline scaling.json
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("FAKE_YF_LATENCY_MS", "0")
+os.environ.setdefault("INFO_PREWARM", "0")
+os.environ.setdefault("BAR_STORE_DIR", "")
+os.environ.setdefault("SYMBOL_MASTER_FILE", "")
+os.environ.setdefault("SCREEN_SCHEDULE", "")
+
+import fake_yfinance  # noqa: E402
+sys.modules["yfinance"] = fake_yfinance
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import screen_engine  # noqa: E402
+import stock_api_server as api  # noqa: E402
+from feature_store import feature_store  # noqa: E402
+from market_data import OHLCVPanel  # noqa: E402
+from panel_indicators import panel_bandarmology  # noqa: E402
+
+DEFAULT_BASELINE = BENCH_DIR / "baselines" / "screen_scaling.json"
+
+
+def _bandarmology(symbols, panel, histories):
+    return {s: api.calculate_bandarmology(histories[s]) for s in symbols}
+
+
+FUNCTIONS = {
+    "preopen": lambda symbols, panel, histories: api.screen_preopen_setups(symbols, limit=len(symbols), panel=panel),
+    "bpjs": lambda symbols, panel, histories: api.screen_bpjs_setups(symbols, limit=len(symbols), panel=panel),
+    "bsjp": lambda symbols, panel, histories: api.screen_bsjp_setups(symbols, limit=len(symbols), panel=panel),
+    "day_trade": lambda symbols, panel, histories: api.screen_day_trade_setups(symbols, limit=len(symbols), panel=panel),
+    "bandarmology": _bandarmology,
+    "panel_bandarmology": lambda symbols, panel, histories: panel_bandarmology(panel, symbols),
+}
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def build_universe(n_symbols, history_days):
+    """Deterministic synthetic panel: the same bars for a given size and length on any machine"""
+    symbols = [f"X{i:04d}" for i in range(n_symbols)]
+    frames = {s: fake_yfinance.bars(s + ".JK", history_days) for s in symbols}
+    panel = OHLCVPanel(pd.concat(frames, axis=1).sort_index(), period="max")
+    return symbols, panel
+
+
+def measure(fn, symbols, panel, histories, repeat, memory):
+    """(best wall time, result, traced peak bytes or None), each run on a cold feature store"""
+    best, result = None, None
+    for _ in range(repeat):
+        feature_store.clear()
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn(symbols, panel, histories)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        feature_store.clear()
+        gc.collect()
+        tracemalloc.start()
+        fn(symbols, panel, histories)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, result, peak
+
+
+def scaling_exponent(sizes, seconds):
+    """Slope of log(time) against log(symbols)"""
+    if len(sizes) < 2 or min(seconds) <= 0:
+        return None
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+
+def compare(results, baseline, tolerance):
+    """Regressions against a baseline: per-symbol latency or peak memory up by more than tolerance"""
+    if baseline["args"]["history_days"] != results["args"]["history_days"]:
+        log(f"Baseline has {baseline['args']['history_days']} bars per symbol, not comparable")
+        return ["history_days"]
+    regressions = []
+    for name, runs in results["functions"].items():
+        old_runs = {r["symbols"]: r for r in baseline["functions"].get(name, [])}
+        for run in runs:
+            old = old_runs.get(run["symbols"])
+            if old is None:
+                continue
+            for metric in ("per_symbol_ms", "peak_mb"):
+                if run.get(metric) is None or old.get(metric) is None:
+                    continue
+                change = run[metric] / old[metric] - 1 if old[metric] else 0.0
+                if change > tolerance:
+                    regressions.append(f"{name} @ {run['symbols']}: {metric} {old[metric]} -> {run[metric]} (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screener latency, memory and scaling on synthetic universes")
+    parser.add_argument("--sizes", type=str, default="50,100,250,500,1000,2000", help="Comma-separated universe sizes")
+    parser.add_argument("--history_days", type=int, default=260, help="Bars per symbol (260 = about a year)")
+    parser.add_argument("--functions", type=str, default=",".join(FUNCTIONS), help="Comma-separated functions to run")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per function and size (best is kept)")
+    parser.add_argument("--workers", type=int, default=1, help="Screening worker processes (1 = in-process)")
+    parser.add_argument("--no_memory", action="store_true", help="Skip the traced run for peak memory")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare against this baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative growth before a regression")
+    parser.add_argument("--save_baseline", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    names = args.functions.split(",")
+    screen_engine.SCREEN_WORKERS = args.workers
+    screen_engine.PARALLEL_SCREEN_MIN_SYMBOLS = 1
+
+    results = {"args": {"sizes": sizes, "history_days": args.history_days, "workers": args.workers, "repeat": args.repeat},
+               "functions": {name: [] for name in names}}
+    for size in sizes:
+        symbols, panel = build_universe(size, args.history_days)
+        histories = {s: panel.history(s) for s in symbols}
+        log(f"Universe: {size} symbols x {args.history_days} bars")
+        for name in names:
+            seconds, result, peak = measure(FUNCTIONS[name], symbols, panel, histories, args.repeat, not args.no_memory)
+            results["functions"][name].append({
+                "symbols": size,
+                "total_s": round(seconds, 3),
+                "per_symbol_ms": round(seconds / size * 1000, 3),
+                "peak_mb": round(peak / 2 ** 20, 1) if peak is not None else None,
+                "results": len(result),
+            })
+            log(f"{name} @ {size}: {seconds:.2f}s")
+    screen_engine.shutdown_pool()
+
+    for name, runs in results["functions"].items():
+        exponent = scaling_exponent([r["symbols"] for r in runs], [r["total_s"] for r in runs])
+        results.setdefault("scaling", {})[name] = round(exponent, 2) if exponent is not None else None
+
+    print(f"{'function':<19} {'symbols':>7} {'total_s':>8} {'ms/symbol':>9} {'peak_mb':>8} {'results':>7}")
+    for name, runs in results["functions"].items():
+        for r in runs:
+            print(f"{name:<19} {r['symbols']:>7} {r['total_s']:>8.2f} {r['per_symbol_ms']:>9.2f} "
+                  f"{r['peak_mb'] if r['peak_mb'] is not None else '-':>8} {r['results']:>7}")
+    print("scaling exponent (time ~ symbols^k): " + ", ".join(f"{n} {k}" for n, k in results["scaling"].items()))
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        log(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        print(f"baseline {args.baseline}: {len(regressions)} regressions (tolerance {args.tolerance:.0%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Screen-All Benchmark: four screen endpoints back to back vs /api/screen/all
+
+Runs the morning routine against fake_yfinance.py: screen_preopen_setups,
+screen_bpjs_setups, screen_bsjp_setups and screen_day_trade_setups one after
+the other, each downloading its own universe, then screen_all_setups, which
+downloads once. Reports wall time for both.
+
+It then checks the candidates match. Both paths are given the same bars for
+this: one shared panel, trimmed to each screener's own period for the
+standalone calls. fake_yfinance windows periods in calendar days, not by
+date offset like the bar store, so separate downloads differ by a bar or so.
+
+Examples:
+  python benchmarks/stock_api/screen_all_bench.py
+  python benchmarks/stock_api/screen_all_bench.py --symbols 900 --latency_ms 150 --json all.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("INFO_PREWARM", "0")
+os.environ.setdefault("BAR_STORE_DIR", "")
+os.environ.setdefault("SYMBOL_MASTER_FILE", "")
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+# Endpoint defaults
+SETTINGS = {
+    "preopen": {"min_score": 70, "min_avg_volume": 1000000, "enable_bandarmology": True},
+    "bpjs": {"min_score": 65, "min_avg_volume": 1000000, "enable_bandarmology": True},
+    "bsjp": {"min_score": 60, "min_avg_volume": 1000000, "enable_bandarmology": False},
+    "day_trade": {"mode": "mandiri"},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back-to-back screens vs one /api/screen/all pass")
+    parser.add_argument("--symbols", type=int, default=300, help="Universe size")
+    parser.add_argument("--latency_ms", type=float, default=150, help="Fake Yahoo latency per request")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+    os.environ["FAKE_YF_LATENCY_MS"] = str(args.latency_ms)
+
+    import fake_yfinance
+    sys.modules["yfinance"] = fake_yfinance
+    import stock_api_server as api
+    from market_data import load_panel
+
+    symbols = [f"X{i:04d}" for i in range(args.symbols)]
+    screens = {
+        "preopen": api.screen_preopen_setups,
+        "bpjs": api.screen_bpjs_setups,
+        "bsjp": api.screen_bsjp_setups,
+        "day_trade": api.screen_day_trade_setups,
+    }
+
+    t0 = time.perf_counter()
+    separate = {name: screen(symbols, limit=len(symbols), **SETTINGS[name]) for name, screen in screens.items()}
+    separate_s = time.perf_counter() - t0
+    log(f"Four screens back to back: {separate_s:.2f}s")
+
+    t0 = time.perf_counter()
+    combined = api.screen_all_setups(symbols, SETTINGS, limit=len(symbols))
+    combined_s = time.perf_counter() - t0
+    log(f"screen_all_setups: {combined_s:.2f}s")
+
+    # Same bars for both paths
+    panel = load_panel(symbols, period=api.plan_screen_period(*SETTINGS))
+    shared = api.screen_all_setups(symbols, SETTINGS, limit=len(symbols), panel=panel)
+    identical = {}
+    for name, screen in screens.items():
+        enable_bandarmology = SETTINGS[name].get("enable_bandarmology", False)
+        own = panel.trimmed(api.plan_screen_period(name, enable_bandarmology=enable_bandarmology))
+        identical[name] = screen(symbols, limit=len(symbols), panel=own, **SETTINGS[name]) == shared[name]
+
+    print(f"{'screen':<10} {'separate':>9} {'all':>5} {'identical':>9}")
+    for name in screens:
+        print(f"{name:<10} {len(separate[name]):>9} {len(combined[name]):>5} {str(identical[name]):>9}")
+    print(f"wall time: separate {separate_s:.2f}s, all {combined_s:.2f}s ({separate_s / combined_s:.1f}x)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"separate_s": round(separate_s, 2), "all_s": round(combined_s, 2),
+                       "identical": identical, "args": vars(args)}, f, indent=2)
+    return 0 if all(identical.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
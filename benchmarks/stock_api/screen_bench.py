@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Screening Benchmark: serial loop vs process pool on a synthetic universe
+
+Builds an OHLCVPanel of --symbols synthetic tickers from fake_yfinance.py
+(no downloads), then runs every screener with the serial loop and with
+screen_engine's process pool, checks that both return the same candidates
+and reports wall time per screener.
+
+Examples:
+  python benchmarks/stock_api/screen_bench.py
+  python benchmarks/stock_api/screen_bench.py --symbols 900 --workers 8 --json screen.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("FAKE_YF_LATENCY_MS", "0")
+os.environ.setdefault("INFO_PREWARM", "0")
+os.environ.setdefault("BAR_STORE_DIR", "")
+os.environ.setdefault("SYMBOL_MASTER_FILE", "")
+
+import fake_yfinance  # noqa: E402
+sys.modules["yfinance"] = fake_yfinance
+
+import pandas as pd  # noqa: E402
+
+import screen_engine  # noqa: E402
+import stock_api_server as api  # noqa: E402
+from market_data import OHLCVPanel  # noqa: E402
+
+SCREENS = {
+    "preopen": lambda symbols, panel: api.screen_preopen_setups(symbols, limit=len(symbols), panel=panel),
+    "bpjs": lambda symbols, panel: api.screen_bpjs_setups(symbols, limit=len(symbols), panel=panel),
+    "bsjp": lambda symbols, panel: api.screen_bsjp_setups(symbols, limit=len(symbols), panel=panel),
+    "day_trade": lambda symbols, panel: api.screen_day_trade_setups(symbols, limit=len(symbols), panel=panel),
+}
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def build_panel(n_symbols, period):
+    symbols = [f"X{i:04d}" for i in range(n_symbols)]
+    frames = {s: fake_yfinance._window(fake_yfinance.bars(s + ".JK"), period=period) for s in symbols}
+    return symbols, OHLCVPanel(pd.concat(frames, axis=1).sort_index(), period=period)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs process-pool screening on a synthetic universe")
+    parser.add_argument("--symbols", type=int, default=900, help="Universe size (the full IDX list is ~900)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for the pool")
+    parser.add_argument("--screens", type=str, default=",".join(SCREENS), help="Comma-separated screeners to run")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    symbols, panel = build_panel(args.symbols, api.plan_screen_period(*SCREENS))
+    log(f"Synthetic panel: {len(symbols)} symbols x {len(panel.frame)} bars")
+
+    screen_engine.SCREEN_WORKERS = args.workers
+    screen_engine.PARALLEL_SCREEN_MIN_SYMBOLS = 1
+    # Start the workers outside the timings (the API keeps its pool between screens)
+    screen_engine.evaluate_universe(api._evaluate_bsjp, "warmup", panel, symbols[:args.workers * 4],
+                                    min_score=60, min_avg_volume=1000000, enable_bandarmology=True)
+
+    results = []
+    for name in args.screens.split(","):
+        screen_engine.SCREEN_WORKERS = 1
+        serial, serial_s = timed(SCREENS[name], symbols, panel)
+        screen_engine.SCREEN_WORKERS = args.workers
+        parallel, parallel_s = timed(SCREENS[name], symbols, panel)
+        results.append({
+            "screen": name,
+            "candidates": len(serial),
+            "identical": serial == parallel,
+            "serial_s": round(serial_s, 2),
+            "parallel_s": round(parallel_s, 2),
+            "speedup": round(serial_s / parallel_s, 2) if parallel_s else None,
+        })
+        log(f"{name}: serial {serial_s:.2f}s, {args.workers} workers {parallel_s:.2f}s")
+    screen_engine.shutdown_pool()
+
+    print(f"{'screen':<10} {'candidates':>10} {'identical':>9} {'serial_s':>9} {'parallel_s':>10} {'speedup':>8}")
+    for r in results:
+        print(f"{r['screen']:<10} {r['candidates']:>10} {str(r['identical']):>9} {r['serial_s']:>9} "
+              f"{r['parallel_s']:>10} {r['speedup']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "args": vars(args)}, f, indent=2)
+    return 0 if all(r["identical"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Streaming Regression: IndicatorSet / IndicatorStore vs the batch indicators
+
+Uses the bandarmology_regression.py fixture (short histories, holes, flat
+bars, zero volume, MFI extremes, breakouts) and checks, for every symbol:
+- every streaming indicator fed bar by bar equals the ta series at every bar
+- bandarmology_from_state() equals calculate_bandarmology() and
+  IndicatorSet.technicals() equals calculate_technical_indicators()
+- state saved day by day, reloaded from disk by a new IndicatorStore and
+  resumed gives the same result, including after a revised last bar
+
+Then times an end-of-day refresh (one new bar per symbol on a primed store)
+against panel_bandarmology() and the per-symbol calculate_bandarmology().
+Exits non-zero on any difference.
+
+Examples:
+  python benchmarks/stock_api/streaming_regression.py
+  python benchmarks/stock_api/streaming_regression.py --symbols 900 --period 1y
+"""
+import argparse
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+
+import fake_yfinance  # noqa: E402
+sys.modules["yfinance"] = fake_yfinance
+
+import numpy as np  # noqa: E402
+
+from bandarmology_regression import build_fixture  # noqa: E402
+from feature_store import Features  # noqa: E402
+from panel_indicators import panel_bandarmology  # noqa: E402
+from stock_api_server import bandarmology_from_state, calculate_bandarmology, calculate_technical_indicators  # noqa: E402
+from streaming_indicators import OHLCV_FIELDS, IndicatorSet, IndicatorStore  # noqa: E402
+
+# Streaming value at each bar -> the ta series it must reproduce
+SERIES = {
+    "rsi14": (lambda s: s.rsi14.value, lambda f: f.rsi(14)),
+    "macd": (lambda s: s.macd.value[0], lambda f: f.macd()[0]),
+    "macd_signal": (lambda s: s.macd.value[1], lambda f: f.macd()[1]),
+    "macd_diff": (lambda s: s.macd.value[2], lambda f: f.macd()[2]),
+    "sma20": (lambda s: s.sma20.value, lambda f: f.sma(20)),
+    "sma50": (lambda s: s.sma50.value, lambda f: f.sma(50)),
+    "ema12": (lambda s: s.ema12.value, lambda f: f.ema(12)),
+    "ema20": (lambda s: s.ema20.value, lambda f: f.ema(20)),
+    "bb_upper": (lambda s: s.bollinger.value[0], lambda f: f.bollinger(20, 2)[0]),
+    "bb_lower": (lambda s: s.bollinger.value[2], lambda f: f.bollinger(20, 2)[2]),
+    "atr14": (lambda s: s.atr14.value, lambda f: f.atr(14)),
+    "obv": (lambda s: s.obv.value, lambda f: f.obv()),
+    "adl": (lambda s: s.adl.value, lambda f: f.adl()),
+    "vpt": (lambda s: s.vpt.value, lambda f: f.vpt()),
+    "mfi14": (lambda s: s.mfi14.value, lambda f: f.mfi(14)),
+    "volume_avg20": (lambda s: s.volume_avg20.value, lambda f: f.volume_avg(20)),
+    "high20": (lambda s: s.high20.value, lambda f: f.rolling_high(20)),
+    "low20": (lambda s: s.low20.value, lambda f: f.rolling_low(20)),
+}
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def stream(hist):
+    """IndicatorSet fed every bar of hist, with each indicator's value after each bar"""
+    state = IndicatorSet()
+    values = {name: [] for name in SERIES}
+    for ts, row in zip(hist.index.asi8, hist[OHLCV_FIELDS].to_numpy().tolist()):
+        state.update(int(ts), *row)
+        for name, (read, _) in SERIES.items():
+            values[name].append(read(state))
+    return state, values
+
+
+def same(a, b) -> bool:
+    return np.array_equal(np.asarray(a, dtype=float), np.asarray(b, dtype=float), equal_nan=True)
+
+
+def same_technicals(a: dict, b: dict) -> bool:
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_technicals(a[k], b[k]) for k in a)
+    return same(a, b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streaming indicator state with the batch indicators")
+    parser.add_argument("--symbols", type=int, default=200, help="Symbols in the fixture")
+    parser.add_argument("--period", type=str, default="1y", help="History period per symbol")
+    parser.add_argument("--days", type=int, default=5, help="Daily refreshes replayed through the store")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", category=RuntimeWarning)  # ta divides by zero on flat bars
+
+    symbols, panel = build_fixture(args.symbols, args.period)
+    histories = {s: panel.history(s) for s in symbols}
+    log(f"Fixture: {len(symbols)} symbols x {len(panel.frame)} dates")
+
+    failures = []
+    for symbol, hist in histories.items():
+        state, values = stream(hist)
+        f = Features(hist)
+        for name, (_, batch) in SERIES.items():
+            if (name != "atr14" or len(hist) >= 14) and not same(values[name], batch(f)):
+                failures.append(f"{symbol} {name}")
+        if bandarmology_from_state(state) != calculate_bandarmology(hist):
+            failures.append(f"{symbol} bandarmology")
+        if not same_technicals(state.technicals(), calculate_technical_indicators(hist)):
+            failures.append(f"{symbol} technicals")
+    log(f"Bar-by-bar comparison: {len(failures)} differences")
+
+    with tempfile.TemporaryDirectory() as root:
+        # Day-by-day refreshes, each on a fresh store so the state comes from disk
+        for day in range(args.days, -1, -1):
+            store = IndicatorStore(root)
+            for symbol, hist in histories.items():
+                if day == 1:
+                    # Intraday: the last bar is revised before the close
+                    revised = hist.iloc[:-1].copy()
+                    revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.02
+                    store.refresh(symbol, revised)
+                state = store.refresh(symbol, hist.iloc[:len(hist) - day])
+                expected = calculate_bandarmology(hist.iloc[:len(hist) - day])
+                if state is not None and bandarmology_from_state(state) != expected:
+                    failures.append(f"{symbol} resumed {day} days back")
+        log(f"Resume from disk: {store.stats()}")
+
+        # End-of-day refresh: one new bar per symbol on a primed store
+        store = IndicatorStore(root)
+        for symbol, hist in histories.items():
+            store.refresh(symbol, hist.iloc[:-1])
+        t0 = time.perf_counter()
+        states = store.refresh_panel(panel, symbols)
+        bands = {s: bandarmology_from_state(state) for s, state in states.items()}
+        stream_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    panel_bands = panel_bandarmology(panel, symbols)
+    panel_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    expected = {s: calculate_bandarmology(panel.history(s)) for s in symbols}
+    per_symbol_s = time.perf_counter() - t0
+    failures += [f"{s} end-of-day" for s in symbols if bands.get(s) != expected[s] or panel_bands.get(s) != expected[s]]
+
+    for failure in failures[:10]:
+        log(f"differs: {failure}")
+    print(f"symbols:      {len(symbols)}")
+    print(f"differences:  {len(failures)}")
+    print(f"end of day:   streaming {stream_s * 1000:.0f} ms, panel {panel_s * 1000:.0f} ms, "
+          f"per-symbol {per_symbol_s * 1000:.0f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
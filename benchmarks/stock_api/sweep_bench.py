@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Sweep Benchmark: the threshold grid search on a synthetic universe
+
+Builds a deterministic synthetic panel (fake_yfinance random walks, no
+downloads) and runs param_sweep.sweep() for each strategy over its full
+SWEEP_GRIDS grid, reporting the candidate-table build time, the grid time
+and combinations per second, and the best combinations. As a consistency
+check, each strategy's endpoint-default combination must score exactly
+what run_backtest() reports for the same settings; the script exits
+non-zero when they differ.
+
+--save_modes writes the winners as named modes to --modes_file (a scratch
+file by default, not the API's SCREEN_MODES_FILE).
+
+Examples:
+  python benchmarks/stock_api/sweep_bench.py
+  python benchmarks/stock_api/sweep_bench.py --symbols 900 --history_days 1300 --workers 8 --save_modes 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+API_DIR = BENCH_DIR.parents[1] / "src" / "stock_api"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("FAKE_YF_LATENCY_MS", "0")
+os.environ.setdefault("INFO_PREWARM", "0")
+os.environ.setdefault("BAR_STORE_DIR", "")
+os.environ.setdefault("SYMBOL_MASTER_FILE", "")
+os.environ.setdefault("SCREEN_SCHEDULE", "")
+
+import fake_yfinance  # noqa: E402
+sys.modules["yfinance"] = fake_yfinance
+
+import pandas as pd  # noqa: E402
+
+import param_sweep  # noqa: E402
+import stock_api_server as api  # noqa: E402
+from backtest import STRATEGY_RULES, BacktestFeatures, run_backtest  # noqa: E402
+from market_data import OHLCVPanel  # noqa: E402
+from screen_modes import save_modes  # noqa: E402
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted, file=sys.stderr)
+
+
+def build_universe(n_symbols, history_days):
+    symbols = [f"X{i:04d}" for i in range(n_symbols)]
+    frames = {s: fake_yfinance.bars(s + ".JK", history_days) for s in symbols}
+    panel = OHLCVPanel(pd.concat(frames, axis=1).sort_index(), period="max")
+    return symbols, panel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Threshold grid search speed and consistency with the backtest")
+    parser.add_argument("--symbols", type=int, default=300, help="Universe size")
+    parser.add_argument("--history_days", type=int, default=1300, help="Bars per symbol (1300 = about 5 years)")
+    parser.add_argument("--strategies", type=str, default="day_trade,preopen,bpjs,bsjp", help="Comma-separated strategies")
+    parser.add_argument("--workers", type=int, default=param_sweep.SWEEP_WORKERS, help="Worker processes")
+    parser.add_argument("--objective", type=str, default="expectancy_pct", choices=param_sweep.OBJECTIVES, help="Metric to rank by")
+    parser.add_argument("--top", type=int, default=5, help="Rows of the ranked table to print")
+    parser.add_argument("--save_modes", type=int, default=0, help="Save the best N combinations per strategy as modes")
+    parser.add_argument("--modes_file", type=str, default=os.path.join(tempfile.gettempdir(), "sweep_bench_modes.json"))
+    args = parser.parse_args()
+
+    symbols, panel = build_universe(args.symbols, args.history_days)
+    log(f"Universe: {len(symbols)} symbols x {args.history_days} bars")
+    t0 = time.perf_counter()
+    f = BacktestFeatures(panel, symbols)
+    log(f"Aligned in {time.perf_counter() - t0:.2f}s")
+
+    mismatches = 0
+    for strategy in args.strategies.split(","):
+        inputs = param_sweep.SWEEP_INPUTS[strategy]
+        period = api.plan_screen_period(strategy, **inputs)
+        grid = param_sweep.SWEEP_GRIDS[strategy]
+        defaults = STRATEGY_RULES[strategy][2]
+
+        t0 = time.perf_counter()
+        table = param_sweep.candidate_table(f, strategy, period, **inputs)
+        table_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        results = param_sweep.sweep(f, strategy, period, grid=grid, workers=args.workers, **inputs)
+        sweep_s = time.perf_counter() - t0
+
+        # The endpoint defaults, swept and backtested directly
+        swept = param_sweep.evaluate(table, [defaults])[0]
+        direct = run_backtest(panel, {strategy: {**defaults, **inputs}}, periods={strategy: period}, features=f)["strategies"][strategy]
+        same = all(swept.get(k) == direct.get(k) for k in swept if k != "params")
+        mismatches += not same
+
+        ranked = param_sweep.rank(results, args.objective)
+        print(f"\n{strategy}: {len(results)} combinations over {len(table['return_pct'])} candidate trades; "
+              f"table {table_s:.2f}s, grid {sweep_s:.2f}s ({len(results) / sweep_s:.0f}/s); defaults match backtest: {same}")
+        print(param_sweep.format_table(ranked, args.top))
+        if args.save_modes and ranked:
+            save_modes(strategy, param_sweep.winning_modes(ranked, args.save_modes, objective=args.objective), path=args.modes_file)
+            log(f"Saved {min(args.save_modes, len(ranked))} {strategy} modes to {args.modes_file}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Content Extractor: pull the article body out of a news page
+
+Joining every <p> on the page also picks up navigation, "Baca Juga" teasers,
+cookie banners and footers. The extractor narrows down to the main content
+container first, in this order:
+1. The site's own CSS selector (`content_tag` in scraper.get_sites())
+2. A template learned earlier for the same domain (cached on disk as JSON)
+3. A text-density heuristic: the element whose <p> children carry the most
+   non-link text wins, and its selector is learned for the next article
+
+Inside the container, known boilerplate blocks and lines are dropped.
+"""
+import json
+import os
+import re
+from datetime import datetime
+from urllib.parse import urlparse
+
+# Learned templates live next to this module unless told otherwise
+DEFAULT_TEMPLATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content_templates.json")
+
+# Blocks that never belong to the article body, even inside the container:
+# these tags, and any element with one of the keywords as a word of a class
+# name (classes split on "-" and "_": "share-box" and "baca_juga" match,
+# "shared-content" and "tagsline" do not)
+NOISE_TAGS = {"script", "style", "noscript", "iframe", "form", "nav", "header", "footer", "aside", "figure"}
+NOISE_CLASS_KEYWORDS = ("baca", "related", "cookie", "share", "newsletter", "sidebar", "paywall",
+                        "tags", "disclaimer", "linksisip")
+
+# Paragraphs dropped by their text, for teasers the markup does not mark up
+BOILERPLATE_RE = re.compile(
+    r"^(baca( juga)?\s*:?|saksikan( juga)? video|video\s*:|simak( juga)?\s*:|lihat juga\s*:|"
+    r"disclaimer\s*:|tag\s*:|terpopuler\s*:|copyright|©|\(\w+/\w+\)$)",
+    re.IGNORECASE,
+)
+
+CANDIDATE_TAGS = ["article", "main", "section", "div", "td"]
+
+
+def log(message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted = f"[{timestamp}] {message}"
+    print(formatted)
+
+
+def _is_noise(tag):
+    if tag.name in NOISE_TAGS:
+        return True
+    words = {word for cls in tag.get("class") or () for word in re.split(r"[-_]+", cls.lower())}
+    return any(keyword in words for keyword in NOISE_CLASS_KEYWORDS)
+
+
+def clean_paragraphs(container):
+    """Body paragraphs of a container, with boilerplate blocks and lines removed."""
+    for noise in container.find_all(_is_noise):
+        noise.decompose()
+
+    paragraphs = container.find_all("p") or [container]
+    texts = []
+    for p in paragraphs:
+        text = p.get_text(" ", strip=True)
+        if not text or BOILERPLATE_RE.match(text):
+            continue
+        texts.append(text)
+    return texts
+
+
+def _density_scores(soup):
+    """
+    Score containers by the non-link text of their paragraphs.
+    Each <p> counts fully for its parent and half for its grandparent, so the
+    tightest wrapper around the body wins over <body> itself.
+    """
+    scores = {}
+    for p in soup.find_all("p"):
+        text = p.get_text(" ", strip=True)
+        if len(text) < 25 or BOILERPLATE_RE.match(text):
+            continue
+        link_chars = sum(len(a.get_text(strip=True)) for a in p.find_all("a"))
+        score = len(text) - link_chars
+        if score <= 0:
+            continue
+        parent = p.parent
+        if parent is not None and parent.name in CANDIDATE_TAGS:
+            scores[parent] = scores.get(parent, 0) + score
+            grandparent = parent.parent
+            if grandparent is not None and grandparent.name in CANDIDATE_TAGS:
+                scores[grandparent] = scores.get(grandparent, 0) + score / 2
+    return scores
+
+
+def _selector_for(soup, element):
+    """A CSS selector that finds `element` first in this page, or None."""
+    if element.get("id"):
+        selector = f"{element.name}#{element['id']}"
+    elif element.get("class"):
+        classes = [c for c in element["class"] if re.match(r"^[A-Za-z_][\w-]*$", c)]
+        if not classes:
+            return None
+        selector = element.name + "".join(f".{c}" for c in classes)
+    else:
+        return None
+    return selector if soup.select_one(selector) is element else None
+
+
+class ContentExtractor:
+    def __init__(self, templates_file=None, min_chars=200):
+        """
+        Args:
+            templates_file: JSON file of learned {domain: selector} templates
+                            (default: CONTENT_TEMPLATES_FILE env or DEFAULT_TEMPLATES_FILE)
+            min_chars: Extractions shorter than this are treated as a miss
+        """
+        self.templates_file = templates_file or os.getenv("CONTENT_TEMPLATES_FILE", DEFAULT_TEMPLATES_FILE)
+        self.min_chars = min_chars
+        self.templates = self._load_templates()
+
+    def _load_templates(self):
+        try:
+            with open(self.templates_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log(f"⚠️ Ignoring unreadable content templates {self.templates_file}: {e}")
+            return {}
+
+    def save_templates(self):
+        try:
+            with open(self.templates_file, "w", encoding="utf-8") as f:
+                json.dump(self.templates, f, indent=2, sort_keys=True)
+        except OSError as e:
+            log(f"⚠️ Could not save content templates to {self.templates_file}: {e}")
+
+    def _from_selector(self, soup, selector):
+        containers = soup.select(selector)
+        texts = []
+        for container in containers:
+            texts.extend(clean_paragraphs(container))
+        return " ".join(texts)
+
+    def extract(self, soup, url, selector=None):
+        """
+        Main article text of a parsed page. The soup is modified (boilerplate
+        blocks are removed), so read anything else from it first.
+        """
+        if selector:
+            content = self._from_selector(soup, selector)
+            if len(content) >= self.min_chars:
+                return content
+
+        domain = urlparse(url).netloc
+        learned = self.templates.get(domain)
+        if learned:
+            content = self._from_selector(soup, learned)
+            if len(content) >= self.min_chars:
+                return content
+            log(f"Learned content template for {domain} no longer matches, re-learning")
+            del self.templates[domain]
+            self.save_templates()
+
+        scores = _density_scores(soup)
+        if scores:
+            best = max(scores, key=scores.get)
+            learned = _selector_for(soup, best)
+            content = " ".join(clean_paragraphs(best))
+            if learned and len(content) >= self.min_chars:
+                self.templates[domain] = learned
+                self.save_templates()
+                log(f"Learned content template for {domain}: {learned}")
+            if content:
+                return content
+
+        # Nothing looked like an article body; keep the old behaviour
+        return " ".join(p.get_text(" ", strip=True) for p in soup.find_all("p"))
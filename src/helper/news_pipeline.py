@@ -105,6 +105,16 @@ Examples:
             "--output", "news.txt"
         ]
 
+        # Same window as the query step, so old articles are never fetched
+        if args.days_back is not None:
+            scraper_cmd.extend(["--days_back", str(args.days_back)])
+
+        # Links indexed by earlier runs; a run of them ends a site's pagination
+        scraper_cmd.extend(["--seen_links", "indexed_links.txt"])
+
+        # Learned article body selectors, kept with the rest of the run's data
+        scraper_cmd.extend(["--templates", "content_templates.json"])
+
         if not run_command(scraper_cmd, "Step 1/3: Scraping news"):
             log("Pipeline failed at scraping step")
             return 1
@@ -115,7 +125,8 @@ Examples:
     if not args.skip_index:
         indexer_cmd = [
             sys.executable,
-            str(script_dir / "rag_indexer.py")
+            str(script_dir / "rag_indexer.py"),
+            "--links_file", "indexed_links.txt"
         ]
 
         if not run_command(indexer_cmd, "Step 2/3: Indexing to Milvus"):
@@ -3,6 +3,7 @@
 RAG Indexer: Embeds and stores articles in Milvus
 Scrape unlimited articles, store everything with semantic search capability
 """
+import argparse
 import os
 import re
 from datetime import datetime
@@ -14,17 +15,30 @@ def log(message: str):
     formatted = f"[{timestamp}] {message}"
     print(formatted)
 
+def published_epoch(published, default):
+    """Epoch seconds for a "YYYY-MM-DD HH:MM:SS" publish time, or for default if missing/invalid."""
+    try:
+        return int(datetime.strptime(published, "%Y-%m-%d %H:%M:%S").timestamp())
+    except (TypeError, ValueError):
+        return int(default.timestamp())
+
 class NewsIndexer:
-    def __init__(self, host=None, port=None, collection_name="news_articles"):
+    def __init__(self, host=None, port=None, collection_name="news_articles", uri=None):
         # Use environment variables if provided, otherwise use defaults
         host = host or os.getenv("MILVUS_HOST", "localhost")
         port = port or os.getenv("MILVUS_PORT", "19530")
+        # MILVUS_URI (e.g. "./milvus_lite.db") takes precedence over host/port
+        uri = uri or os.getenv("MILVUS_URI")
         self.collection_name = collection_name
         self.embedding_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')  # Supports Indonesian
         self.dim = 384  # Embedding dimension for this model
 
-        log(f"Connecting to Milvus at {host}:{port}")
-        connections.connect(alias="default", host=host, port=port)
+        if uri:
+            log(f"Connecting to Milvus at {uri}")
+            connections.connect(alias="default", uri=uri)
+        else:
+            log(f"Connecting to Milvus at {host}:{port}")
+            connections.connect(alias="default", host=host, port=port)
 
         self._setup_collection()
 
@@ -36,6 +50,19 @@ class NewsIndexer:
         #     log(f"Collection '{self.collection_name}' exists, dropping it for fresh start")
         #     utility.drop_collection(self.collection_name)
 
+        # Collections created before publish dates were tracked lack published_ts
+        # and Milvus cannot add fields in place; keep using them in legacy mode.
+        if utility.has_collection(self.collection_name):
+            collection = Collection(self.collection_name)
+            self.has_published_ts = any(f.name == "published_ts" for f in collection.schema.fields)
+            if not self.has_published_ts:
+                log(f"Collection '{self.collection_name}' has no published_ts field; "
+                    "publish dates will not be stored (drop the collection to migrate)")
+            log("Collection setup complete")
+            return
+
+        self.has_published_ts = True
+
         # Define schema
         fields = [
             FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
@@ -43,7 +70,8 @@ class NewsIndexer:
             FieldSchema(name="source", dtype=DataType.VARCHAR, max_length=500),
             FieldSchema(name="link", dtype=DataType.VARCHAR, max_length=1000),
             FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535),  # Full content
-            FieldSchema(name="timestamp", dtype=DataType.VARCHAR, max_length=50),
+            FieldSchema(name="timestamp", dtype=DataType.VARCHAR, max_length=50),  # Index time
+            FieldSchema(name="published_ts", dtype=DataType.INT64),  # Publish time (epoch seconds)
             FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=self.dim)
         ]
 
@@ -61,6 +89,10 @@ class NewsIndexer:
         log("Creating vector index")
         collection.create_index(field_name="embedding", index_params=index_params)
 
+        # Scalar index so date-window filters don't scan every row
+        log("Creating published_ts index")
+        collection.create_index(field_name="published_ts", index_params={"index_type": "STL_SORT"})
+
         log("Collection setup complete")
 
     def parse_articles(self, file_path="news.txt"):
@@ -78,6 +110,7 @@ class NewsIndexer:
 
             title_match = re.search(r"Title:\s*(.*)", block)
             source_match = re.search(r"Source:\s*(.*)", block)
+            published_match = re.search(r"^Published:[ \t]*(.*)$", block, re.M)
             content_match = re.search(r"Content:\s*(.*)", block, re.S)
 
             if not (title_match and content_match):
@@ -90,6 +123,7 @@ class NewsIndexer:
             articles.append({
                 "title": title_match.group(1).strip(),
                 "source": source_match.group(1).strip() if source_match else "",
+                "published": published_match.group(1).strip() if published_match else "",
                 "content": content
             })
 
@@ -158,15 +192,19 @@ class NewsIndexer:
         embeddings = self.embed_articles(new_articles)
 
         # Prepare data for insertion
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
         entities = [
             [a["title"] for a in new_articles],
             [a["source"] for a in new_articles],
             [a.get("link", a["source"]) for a in new_articles],  # Use source as fallback
             [a["content"][:65535] for a in new_articles],  # Truncate to max length
             [timestamp] * len(new_articles),
-            embeddings
         ]
+        if self.has_published_ts:
+            # Articles without a detectable publish date fall back to index time
+            entities.append([published_epoch(a.get("published"), now) for a in new_articles])
+        entities.append(embeddings)
 
         # Insert into collection
         collection = Collection(self.collection_name)
@@ -176,6 +214,13 @@ class NewsIndexer:
         log(f"Successfully indexed {len(new_articles)} new articles")
         log(f"Total articles in collection: {collection.num_entities}")
 
+    def export_links(self, file_path):
+        """Write all indexed links, one per line, for scraper.py --seen_links"""
+        links = self.get_existing_links()
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{link}\n" for link in sorted(links))
+        log(f"Wrote {len(links)} indexed links to {file_path}")
+
     def index_from_file(self, file_path="news.txt"):
         """Full pipeline: parse → embed → store"""
         articles = self.parse_articles(file_path)
@@ -185,13 +230,23 @@ class NewsIndexer:
         return 0
 
 def main():
+    parser = argparse.ArgumentParser(description="Index scraped news articles into Milvus")
+    parser.add_argument("--input", type=str, default="news.txt",
+                        help="Scraped articles file (default: news.txt)")
+    parser.add_argument("--links_file", type=str, default=None,
+                        help="Write every indexed link here so the scraper can stop at already-seen articles")
+    args = parser.parse_args()
+
     log("Starting RAG indexer")
 
     indexer = NewsIndexer()
-    count = indexer.index_from_file("news.txt")
+    count = indexer.index_from_file(args.input)
 
     log(f"Indexing complete! Stored {count} articles in Milvus")
     log("Articles are now searchable via semantic search")
 
+    if args.links_file:
+        indexer.export_links(args.links_file)
+
 if __name__ == "__main__":
     main()
@@ -14,20 +14,29 @@ def log(message: str):
     print(formatted)
 
 class NewsQuerier:
-    def __init__(self, host=None, port=None, collection_name="news_articles"):
+    def __init__(self, host=None, port=None, collection_name="news_articles", uri=None):
         # Use environment variables if provided, otherwise use defaults
         host = host or os.getenv("MILVUS_HOST", "localhost")
         port = port or os.getenv("MILVUS_PORT", "19530")
+        # MILVUS_URI (e.g. "./milvus_lite.db") takes precedence over host/port
+        uri = uri or os.getenv("MILVUS_URI")
         self.collection_name = collection_name
         self.embedding_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
 
-        log(f"Connecting to Milvus at {host}:{port}")
-        connections.connect(alias="default", host=host, port=port)
+        if uri:
+            log(f"Connecting to Milvus at {uri}")
+            connections.connect(alias="default", uri=uri)
+        else:
+            log(f"Connecting to Milvus at {host}:{port}")
+            connections.connect(alias="default", host=host, port=port)
 
         # Load collection
         self.collection = Collection(self.collection_name)
         self.collection.load()
 
+        # Legacy collections only have the index-time timestamp to filter on
+        self.has_published_ts = any(f.name == "published_ts" for f in self.collection.schema.fields)
+
         log(f"Loaded collection '{self.collection_name}' with {self.collection.num_entities} articles")
 
     def search(self, query, top_k=50, days_back=None, start_date=None, end_date=None):
@@ -53,7 +62,8 @@ class NewsQuerier:
             start_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
             log(f"Auto-filtering: last {days_back} days ({start_date} to {end_date})")
 
-        # Build timestamp filter expression if dates provided
+        # Build publish-time filter expression if dates provided
+        # (falls back to index time for collections without published_ts)
         filter_expr = None
         if start_date or end_date:
             conditions = []
@@ -61,14 +71,14 @@ class NewsQuerier:
                 # Ensure we have full timestamp format
                 if len(start_date) == 10:  # Just date, add time
                     start_date = f"{start_date} 00:00:00"
-                conditions.append(f'timestamp >= "{start_date}"')
+                conditions.append(self._date_condition(">=", start_date))
                 log(f"Filtering articles from: {start_date}")
 
             if end_date:
                 # Ensure we have full timestamp format
                 if len(end_date) == 10:  # Just date, add time
                     end_date = f"{end_date} 23:59:59"
-                conditions.append(f'timestamp <= "{end_date}"')
+                conditions.append(self._date_condition("<=", end_date))
                 log(f"Filtering articles until: {end_date}")
 
             filter_expr = " and ".join(conditions)
@@ -80,32 +90,45 @@ class NewsQuerier:
         # Search parameters
         search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
 
-        # Perform vector search with optional timestamp filter
+        output_fields = ["title", "source", "link", "content", "timestamp"]
+        if self.has_published_ts:
+            output_fields.append("published_ts")
+
+        # Perform vector search with optional date filter
         results = self.collection.search(
             data=[query_embedding],
             anns_field="embedding",
             param=search_params,
             limit=top_k,
-            expr=filter_expr,  # Add timestamp filter
-            output_fields=["title", "source", "link", "content", "timestamp"]
+            expr=filter_expr,  # Add date filter
+            output_fields=output_fields
         )
 
         # Extract articles
         articles = []
         for hits in results:
             for hit in hits:
+                published_ts = hit.entity.get("published_ts")
                 articles.append({
                     "title": hit.entity.get("title"),
                     "source": hit.entity.get("source"),
                     "link": hit.entity.get("link"),
                     "content": hit.entity.get("content"),
                     "timestamp": hit.entity.get("timestamp"),
+                    "published": datetime.fromtimestamp(published_ts).strftime("%Y-%m-%d %H:%M:%S") if published_ts else "",
                     "score": hit.distance  # L2 distance (lower = more similar)
                 })
 
         log(f"Found {len(articles)} relevant articles")
         return articles
 
+    def _date_condition(self, op, value):
+        """Filter clause on publish time (epoch) or, for legacy collections, index time."""
+        if self.has_published_ts:
+            epoch = int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp())
+            return f"published_ts {op} {epoch}"
+        return f'timestamp {op} "{value}"'
+
     def export_to_condensed(self, articles, output_file="news_condensed.txt", max_chars=2000):
         """
         Export retrieved articles to condensed format for Claude
@@ -129,6 +152,7 @@ class NewsQuerier:
                 f.write(f"**Title:** {article['title']}\n")
                 f.write(f"**Source:** {article['source']}\n")
                 f.write(f"**Link:** {article['link']}\n")
+                f.write(f"**Published:** {article.get('published') or 'unknown'}\n")
                 f.write(f"**Timestamp:** {article['timestamp']}\n")
                 f.write(f"**Content:** {content}\n")
                 f.write(f"**Relevance Score:** {article['score']:.4f}\n")
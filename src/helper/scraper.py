@@ -1,7 +1,13 @@
+import json
+import random
+import re
+import threading
+import time
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from datetime import datetime, date
+from urllib.parse import urljoin, urlparse, urlunparse, urlencode, parse_qsl
+from datetime import datetime, date, timedelta, timezone
+from content_extractor import ContentExtractor
 
 def log(message: str):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -16,50 +22,398 @@ headers = {
     )
 }
 
+# ============================================================================
+# POLITE FETCHING: per-host rate limit, retry with backoff, circuit breaker
+# ============================================================================
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host has failed too often and is skipped for the rest of the run."""
+
+
+class HostRateLimiter:
+    """
+    Per-host token bucket whose rate adapts to how the host is coping:
+    - 429/503 halves the rate (and honours Retry-After)
+    - other 5xx or slow responses (> slow_latency) cut it by 30%
+    - fast successes add a little back, up to max_rate
+    Also derives a per-host timeout from the observed latency (EWMA).
+    Thread-safe, so it keeps working once scraping is concurrent.
+    """
+
+    def __init__(self, rate=4.0, burst=4, min_rate=0.5, max_rate=10.0,
+                 slow_latency=5.0, min_timeout=5.0):
+        self.initial_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.slow_latency = slow_latency
+        self.min_timeout = min_timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = {
+                "rate": self.initial_rate,
+                "tokens": float(self.burst),
+                "updated": time.monotonic(),
+                "blocked_until": 0.0,
+                "latency": None,
+            }
+            self._hosts[host] = state
+        return state
+
+    def acquire(self, host):
+        """Block until a request to host is allowed."""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            elapsed = now - state["updated"]
+            state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate"])
+            state["updated"] = now
+            # Reserve a token even if it drives the bucket negative; the wait covers the debt
+            state["tokens"] -= 1
+            wait = max(0.0, -state["tokens"] / state["rate"], state["blocked_until"] - now)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, host, latency, status=None, retry_after=None):
+        """Adapt the host's rate from one response (status None = connection error/timeout)."""
+        with self._lock:
+            state = self._state(host)
+            if latency is not None:
+                prev = state["latency"]
+                state["latency"] = latency if prev is None else 0.7 * prev + 0.3 * latency
+
+            if status in (429, 503):
+                state["rate"] = max(self.min_rate, state["rate"] * 0.5)
+                if retry_after:
+                    state["blocked_until"] = max(state["blocked_until"], time.monotonic() + retry_after)
+            elif status is None or status >= 500 or (latency or 0) > self.slow_latency:
+                state["rate"] = max(self.min_rate, state["rate"] * 0.7)
+            else:
+                state["rate"] = min(self.max_rate, state["rate"] + 0.25)
+
+    def timeout_for(self, host, default):
+        """Timeout scaled to the host's observed latency, capped at the caller's default."""
+        with self._lock:
+            latency = self._state(host)["latency"]
+        if latency is None:
+            return default
+        return min(default, max(self.min_timeout, latency * 4))
+
+
+class CircuitBreaker:
+    """Skips a host for the rest of the run after `threshold` consecutive failed fetches."""
+
+    def __init__(self, threshold=3):
+        self.threshold = threshold
+        self._failures = {}
+        self._open = set()
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            return host not in self._open
+
+    def record_success(self, host):
+        with self._lock:
+            self._failures[host] = 0
+
+    def record_failure(self, host):
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] >= self.threshold and host not in self._open:
+                self._open.add(host)
+                log(f"⛔ Circuit open for {host} after {self._failures[host]} failed fetches, skipping for this run")
+
+
+session = requests.Session()
+session.headers.update(headers)
+rate_limiter = HostRateLimiter()
+circuit_breaker = CircuitBreaker()
+extractor = ContentExtractor()
+
+
+def _retry_after_seconds(resp):
+    value = resp.headers.get("Retry-After") if resp is not None else None
+    try:
+        return min(60.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def fetch(url, timeout=15, max_retries=3, backoff=1.0, max_backoff=20.0):
+    """
+    GET url politely: waits on the per-host limiter, retries connection errors,
+    429 and 5xx with full-jitter exponential backoff, and feeds the circuit
+    breaker. Raises CircuitOpenError if the host is already being skipped,
+    otherwise the last error once retries are exhausted.
+    """
+    host = urlparse(url).netloc
+    if not circuit_breaker.allow(host):
+        raise CircuitOpenError(f"{host} skipped after repeated failures")
+
+    last_error = None
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire(host)
+        started = time.monotonic()
+        try:
+            resp = session.get(url, timeout=rate_limiter.timeout_for(host, timeout))
+        except requests.RequestException as e:
+            rate_limiter.record(host, time.monotonic() - started, None)
+            last_error = e
+        else:
+            retry_after = _retry_after_seconds(resp)
+            rate_limiter.record(host, time.monotonic() - started, resp.status_code, retry_after)
+            if resp.status_code not in RETRYABLE_STATUS:
+                # Non-retryable 4xx means the host is up; the page itself is the problem
+                circuit_breaker.record_success(host)
+                resp.raise_for_status()
+                return resp
+            last_error = requests.HTTPError(f"{resp.status_code} for url: {url}", response=resp)
+
+        if attempt < max_retries:
+            delay = random.uniform(0, min(max_backoff, backoff * (2 ** attempt)))
+            log(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 1}/{max_retries}): {last_error}")
+            time.sleep(delay)
+
+    circuit_breaker.record_failure(host)
+    raise last_error
+
+# ============================================================================
+# PUBLISH DATE EXTRACTION
+# ============================================================================
+
+PUBLISHED_META = [
+    ("property", "article:published_time"),
+    ("property", "og:published_time"),
+    ("itemprop", "datePublished"),
+    ("name", "publishdate"),
+    ("name", "pubdate"),
+    ("name", "publish-date"),
+    ("name", "dc.date"),
+    ("name", "parsely-pub-date"),
+]
+
+BULAN = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "mei": 5, "may": 5, "jun": 6, "jul": 7,
+    "agu": 8, "agt": 8, "aug": 8, "sep": 9, "okt": 10, "oct": 10, "nov": 11, "des": 12, "dec": 12,
+}
+DATE_TEXT_RE = re.compile(r"(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\s+(\d{4})(?:[,\s|-]+(\d{1,2})[:.](\d{2}))?")
+DATE_NUMERIC_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})(?:[,\s|-]+(\d{1,2})[:.](\d{2}))?")
+RELATIVE_RE = re.compile(r"(\d+)\s*(menit|jam|hari)\s+(?:yang\s+)?lalu", re.I)
+WIB = timezone(timedelta(hours=7))
+
+
+def _to_local(dt):
+    """Naive local time; dates without an offset are what the sites print, i.e. WIB."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=WIB)
+    return dt.astimezone().replace(tzinfo=None)
+
+
+def parse_datetime(value):
+    """
+    Parse a published date string into a naive local datetime.
+    Handles ISO 8601, "YYYY/MM/DD HH:MM:SS", Indonesian "20 Oktober 2025 10:15"
+    and relative "2 jam yang lalu". Returns None if nothing matches.
+    """
+    if not value:
+        return None
+    value = value.strip()
+
+    iso = value.replace("/", "-").replace("Z", "+00:00")
+    try:
+        return _to_local(datetime.fromisoformat(iso))
+    except ValueError:
+        pass
+
+    # A relative label ("10 menit lalu") is the item's own age; a date next to it may be a headline's
+    match = RELATIVE_RE.search(value)
+    if match:
+        unit = {"menit": "minutes", "jam": "hours", "hari": "days"}[match.group(2).lower()]
+        return datetime.now().replace(microsecond=0) - timedelta(**{unit: int(match.group(1))})
+
+    match = DATE_TEXT_RE.search(value)
+    if match and match.group(2).lower() in BULAN:
+        day, month, year = int(match.group(1)), BULAN[match.group(2).lower()], int(match.group(3))
+        hour, minute = int(match.group(4) or 0), int(match.group(5) or 0)
+        try:
+            return _to_local(datetime(year, month, day, hour, minute))
+        except ValueError:
+            return None
+
+    match = DATE_NUMERIC_RE.search(value)
+    if match:
+        try:
+            return _to_local(datetime(int(match.group(3)), int(match.group(2)), int(match.group(1)),
+                                      int(match.group(4) or 0), int(match.group(5) or 0)))
+        except ValueError:
+            return None
+
+    return None
+
+
+def _json_ld_published(data):
+    """Find the first datePublished in a JSON-LD document (dicts, lists or @graph)."""
+    if isinstance(data, list):
+        for entry in data:
+            found = _json_ld_published(entry)
+            if found:
+                return found
+    elif isinstance(data, dict):
+        if data.get("datePublished"):
+            return data["datePublished"]
+        for key in ("@graph", "mainEntity"):
+            if key in data:
+                found = _json_ld_published(data[key])
+                if found:
+                    return found
+    return None
+
+
+def extract_published(soup):
+    """
+    Publish time of a detail page, trying meta tags, then JSON-LD, then <time>.
+    """
+    for attr, name in PUBLISHED_META:
+        tag = soup.find("meta", attrs={attr: name})
+        if tag and tag.get("content"):
+            parsed = parse_datetime(tag["content"])
+            if parsed:
+                return parsed
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            parsed = parse_datetime(_json_ld_published(json.loads(script.string or "")))
+        except (ValueError, TypeError):
+            continue
+        if parsed:
+            return parsed
+
+    for tag in soup.find_all("time"):
+        parsed = parse_datetime(tag.get("datetime") or tag.get_text(" ", strip=True))
+        if parsed:
+            return parsed
+
+    return None
+
+
+def extract_listing_date(item, date_tag=None):
+    """
+    Publish time shown on a listing item: the site's date element
+    (`date_tag`) or its <time>. Never the item's other text, whose headline
+    may carry a date of its own; without a date element this returns None
+    and the detail page decides.
+    """
+    tag = item.select_one(date_tag) if date_tag else None
+    tag = tag or item.find("time")
+    if not tag:
+        return None
+    return parse_datetime(tag.get("datetime") or tag.get_text(" ", strip=True))
+
+
 def get_sites():
+    """
+    News sources. Each site may define "pagination" rules, tried in order:
+      next:      CSS selector for the "next page" link
+      template:  URL with a {page} placeholder
+      param:     query parameter carrying the page number
+      max_pages: safety cap on listing pages per run (default 10)
+    "date_tag" selects a listing item's date element (default <time>), used
+    to skip items older than the run's cutoff without fetching them.
+    "content_tag" selects the article body; without it (or when it stops
+    matching) content_extractor.py finds and learns the body container.
+    Sites without "pagination" are crawled one listing page deep.
+    """
     return [
         {
             "url": "https://wartaekonomi.co.id/category-283/bursa",
             "item_tag": "div.articleListWrapper",
+            "content_tag": "div.articlePost-body",
+            "pagination": {"next": "a[rel=next], .pagination a.next", "param": "page"},
         },
         {
             "url": "https://market.bisnis.com/bursa-saham",
             "item_tag": "div.art--row",
+            "content_tag": "article.detailsContent",
+            "pagination": {"next": "a[rel=next], .pagination a.next", "param": "page"},
         },
         {
             "url": "https://www.cnbcindonesia.com/tag/saham",
             "item_tag": "div.nhl-list",
+            "content_tag": "div.detail-text",
+            "pagination": {"next": "a[rel=next]", "template": "https://www.cnbcindonesia.com/tag/saham/{page}"},
         },
         {
             "url": "https://www.idxchannel.com/indeks",
             "item_tag": "div.bt-con",
+            "content_tag": "div.article--content",
+            "pagination": {"next": "a[rel=next], .pagination a.next", "param": "page"},
         },
         {
             "url": "https://www.liputan6.com/saham",
             "item_tag": "article.articles--iridescent-list--item",
+            "content_tag": "div.article-content-body__item-content",
+            "pagination": {"next": "a[rel=next], .simple-pagination a.next", "param": "page"},
         },
         {
             "url": "https://insight.kontan.co.id/rubrik/171/Market",
             "item_tag": "div.card__item--horizon",
+            "content_tag": "div.tmpt-desk-kon",
+            "pagination": {"next": "a[rel=next], .pagination a.next"},
         },
     ]
 
 
-def scrape_site(config, max_item=50):
+def next_page_url(soup, url, pagination, page):
+    """URL of listing page number `page` (the one after `url`), or None if unknown."""
+    if pagination.get("next"):
+        tag = soup.select_one(pagination["next"])
+        if tag and tag.get("href"):
+            return urljoin(url, tag["href"])
+    if pagination.get("template"):
+        return pagination["template"].format(page=page)
+    if pagination.get("param"):
+        parsed = urlparse(url)
+        query = dict(parse_qsl(parsed.query))
+        query[pagination["param"]] = str(page)
+        return urlunparse(parsed._replace(query=urlencode(query)))
+    return None
+
+
+def scrape_site(config, max_item=50, since=None, old_run=3, seen_links=None, seen_run=5):
     """
     Scrape one site based on config.
-    Collects articles up to max_item limit.
+    Collects articles up to max_item limit, following the site's pagination
+    rules until one of these stops the crawl:
+    - old_run consecutive items published before `since` (listings are newest-first)
+    - seen_run consecutive items whose link is in `seen_links` (already indexed),
+      so incremental runs cost one listing page while backfills can go deep
     """
     results = []
     url = config["url"]
+    pagination = config.get("pagination") or {}
+    max_pages = pagination.get("max_pages", 10) if pagination else 1
+    seen_links = seen_links if seen_links is not None else set()
+    visited = set()
+    collected_links = set()
+    consecutive_old = 0
+    consecutive_seen = 0
+    stop_reason = None
+    page = 1
 
     while url and len(results) < max_item:
         log(f"Crawling {url}")
+        visited.add(url)
 
         try:
-            resp = requests.get(url, headers=headers, timeout=15)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            resp = fetch(url, timeout=15)
         except Exception as e:
             log(f"⚠️ Failed to fetch {url}: {e}")
             break
@@ -79,11 +433,34 @@ def scrape_site(config, max_item=50):
             title = title_tag.get_text(strip=True)
             link = urljoin(url, title_tag["href"])
 
-            # fetch detail content
+            # Repeated on this run's listing pages (shifted page, pinned block): not a sign of old news
+            if link in collected_links:
+                continue
+
+            # Already indexed
+            if link in seen_links:
+                consecutive_seen += 1
+                if consecutive_seen >= seen_run:
+                    stop_reason = f"{seen_run} already-indexed articles in a row"
+                    break
+                continue
+
+            # Skip the detail fetch entirely when the listing already shows it is too old
+            listed_at = extract_listing_date(item, config.get("date_tag"))
+            if since and listed_at and listed_at < since:
+                consecutive_old += 1
+                if consecutive_old >= old_run:
+                    stop_reason = f"articles older than {since:%Y-%m-%d %H:%M}"
+                    break
+                continue
+
+            # fetch detail content (the listing's date stands if the detail page fails)
+            published = listed_at
             try:
-                detail_resp = requests.get(link, headers=headers, timeout=30)
+                detail_resp = fetch(link, timeout=30)
                 detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-                content = " ".join(p.get_text(" ", strip=True) for p in detail_soup.find_all("p"))
+                published = extract_published(detail_soup) or listed_at
+                content = extractor.extract(detail_soup, link, config.get("content_tag"))
 
                 if not title:
                     # Extract title from the URL slug
@@ -92,26 +469,81 @@ def scrape_site(config, max_item=50):
                     slug = slug.split(".")[0]  # remove ".html" if present
                     title = slug.replace("-", " ").replace("_", " ").title()
 
+            except CircuitOpenError as e:
+                stop_reason = str(e)
+                break
             except Exception as e:
                 content = f"(could not fetch detail: {e})"
 
+            if since and published and published < since:
+                consecutive_old += 1
+                if consecutive_old >= old_run:
+                    stop_reason = f"articles older than {since:%Y-%m-%d %H:%M}"
+                    break
+                continue
+            consecutive_old = 0
+            consecutive_seen = 0
+
+            collected_links.add(link)
             results.append({
                 "title": title,
                 "link": link,
+                "published": published.strftime("%Y-%m-%d %H:%M:%S") if published else "",
                 "content": content
             })
 
-        # Stop pagination since we control total via max_item
-        url = None
+        if stop_reason:
+            log(f"Stopping {config['url']}: {stop_reason}")
+            break
+
+        page += 1
+        url = next_page_url(soup, url, pagination, page) if pagination and page <= max_pages else None
+        if url in visited:
+            url = None
 
     return results
 
+def scrape_sites(sites, max_items=100, days_back=None, seen_links=None):
+    """
+    Scrape every site in order, splitting max_items evenly across sites.
+    days_back uses the same window as rag_query.py: from midnight N days ago.
+    seen_links are links already in the index; they are never re-fetched.
+    """
+    items_per_site = max(1, max_items // len(sites))
+    since = None
+    if days_back is not None:
+        since = datetime.combine(date.today() - timedelta(days=days_back), datetime.min.time())
+        log(f"Only keeping articles published since {since:%Y-%m-%d %H:%M}")
+
+    log(f"Scraping up to {max_items} total articles ({items_per_site} per site)")
+
+    all_results = []
+    for site in sites:
+        if len(all_results) >= max_items:
+            break
+        remaining = max_items - len(all_results)
+        max_for_site = min(items_per_site, remaining)
+        all_results.extend(scrape_site(site, max_item=max_for_site, since=since, seen_links=seen_links))
+
+    return all_results
+
+def load_seen_links(filename):
+    """Links already indexed, as written by rag_indexer.py --links_file (one per line)."""
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            links = {line.strip() for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+    log(f"Loaded {len(links)} already-indexed links from {filename}")
+    return links
+
 def save_to_txt(articles, filename="news.txt"):
     with open(filename, "a", encoding="utf-8") as f:
         for art in articles:
             f.write("### Article Start\n")
             f.write(f"Title: {art.get('title','')}\n")
             f.write(f"Source: {art.get('link','')}\n")
+            f.write(f"Published: {art.get('published','')}\n")
             f.write("Content:\n")
             f.write(art.get("content", "") + "\n")
             f.write("### Article End\n\n")
@@ -125,22 +557,23 @@ if __name__ == "__main__":
                         help="Maximum total number of articles to scrape (default: 100)")
     parser.add_argument("--output", type=str, default="news.txt",
                         help="Output file path (default: news.txt)")
+    parser.add_argument("--days_back", type=int, default=None,
+                        help="Only keep articles published in the last N days and stop crawling past them")
+    parser.add_argument("--seen_links", type=str, default=None,
+                        help="File of already-indexed links; they are skipped and a run of them stops a site")
+    parser.add_argument("--host_rate", type=float, default=4.0,
+                        help="Initial requests/second per host; adapts to latency and 429/5xx (default: 4)")
+    parser.add_argument("--templates", type=str, default=None,
+                        help="Learned content templates file (default: content_templates.json next to content_extractor.py)")
 
     args = parser.parse_args()
+    rate_limiter = HostRateLimiter(rate=args.host_rate, max_rate=max(args.host_rate, 10.0))
+    if args.templates:
+        extractor = ContentExtractor(templates_file=args.templates)
 
-    # Calculate items per site
-    sites = get_sites()
-    items_per_site = max(1, args.max_items // len(sites))
-
-    log(f"Scraping up to {args.max_items} total articles ({items_per_site} per site)")
-
-    all_results = []
-    for site in sites:
-        if len(all_results) >= args.max_items:
-            break
-        remaining = args.max_items - len(all_results)
-        max_for_site = min(items_per_site, remaining)
-        all_results.extend(scrape_site(site, max_item=max_for_site))
+    seen_links = load_seen_links(args.seen_links) if args.seen_links else None
+    all_results = scrape_sites(get_sites(), max_items=args.max_items, days_back=args.days_back,
+                               seen_links=seen_links)
 
     save_to_txt(all_results, filename=args.output)
     log(f"Collected {len(all_results)} articles -> {args.output}")
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+Backtest: replay the screening strategies over years of history
+
+The screeners judge one symbol on its latest bar. Asking "what would they
+have picked on every past day" one call per day and symbol takes hours, so
+the backtest evaluates each strategy's filters for every bar of every
+symbol at once, as (bars x symbols) boolean signal matrices over the same
+right-aligned arrays panel_indicators uses, then simulates the trades the
+screens suggest with their ATR (or chart-level) stop and target.
+
+Indicators are computed once over the whole history and shared by every
+strategy and parameter set. The series that depend on where the screen's
+download starts are windowed exactly like a screen run on that day: the
+OBV/ADL/VPT slopes use flows summed from the first bar of the strategy's
+period. EMA, RSI, MACD and ATR run over the full history; a screen seeds
+them at its period start, which differs by a fraction of a percent once
+the 60+ warm-up bars of a 3-month window have passed.
+
+Trades: a signal on bar t enters at the next open (PRE-OPEN, BPJS, day
+trade; the screens run the evening or morning before) or at bar t's close
+(BSJP buys into the close) and is held for `hold` bars. Each bar first
+checks a gap through the stop or target at the open, then the stop, then
+the target, so a bar touching both counts as a loss; what is left is sold
+at the close of the last bar. Signals whose entry is already beyond a level
+are skipped.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bar_store import OHLCV_FIELDS, PERIOD_OFFSETS
+from market_data import OHLCVPanel
+from panel_indicators import LOOKBACK, PHASES, right_align, score_arrays
+
+logger = logging.getLogger("idx-stock-api")
+
+STRATEGIES = ("preopen", "bpjs", "bsjp", "day_trade")
+
+# Where a signal on bar t is bought
+ENTRY = {"preopen": "next_open", "bpjs": "next_open", "bsjp": "close", "day_trade": "next_open"}
+
+# Bars the screeners require in their history
+MIN_BARS = {"preopen": 40, "bpjs": 50, "bsjp": 50, "day_trade": 50}
+
+MARKUP, ACCUMULATION = PHASES.index("MARKUP"), PHASES.index("ACCUMULATION")
+
+
+def _shift(x: np.ndarray, rows: int = 1) -> np.ndarray:
+    shifted = np.full_like(x, np.nan)
+    shifted[rows:] = x[:-rows]
+    return shifted
+
+
+def _frame_op(x: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(x, copy=False)
+
+
+class BacktestFeatures:
+    """
+    Right-aligned OHLCV for a panel (see panel_indicators.right_align()) and
+    every indicator the strategies read, each computed once on first use.
+    Arrays are (bars, symbols); row -1 is every symbol's latest bar and NaN
+    rows only precede a symbol's history.
+    """
+
+    def __init__(self, panel: OHLCVPanel, symbols: Optional[Iterable[str]] = None):
+        self.symbols = list(dict.fromkeys(symbols if symbols is not None else panel.symbols))
+        aligned, self.lengths = right_align(panel, self.symbols)
+        self.open, self.high, self.low, self.close, self.volume = (aligned[:, :, OHLCV_FIELDS.index(f)] for f in OHLCV_FIELDS)
+        self.traded = ~np.isnan(self.close)
+
+        # Each bar's date, packed the same way (the smallest int64 on padding rows)
+        frame = panel.frame.sort_index()
+        self.tz = frame.index.tz
+        traded = frame.xs("Close", axis=1, level=1).reindex(columns=self.symbols).notna().to_numpy()
+        order = np.argsort(traded, axis=0, kind="stable")
+        self.dates = np.where(self.traded, frame.index.asi8[order], np.iinfo(np.int64).min)
+        self._cache: Dict[tuple, Any] = {}
+
+    def _get(self, key: tuple, compute):
+        if key not in self._cache:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self._cache[key] = compute()
+        return self._cache[key]
+
+    def timestamps(self, rows: np.ndarray, cols: np.ndarray) -> pd.DatetimeIndex:
+        """Dates of the bars at (rows, cols), in the panel's timezone"""
+        index = pd.to_datetime(self.dates[rows, cols], utc=True)
+        return index.tz_convert(self.tz) if self.tz is not None else index.tz_localize(None)
+
+    def to_frame(self, values: np.ndarray) -> pd.DataFrame:
+        """A (bars, symbols) array as a (dates, symbols) frame"""
+        rows, cols = np.nonzero(self.traded)
+        index = self.timestamps(rows, cols)
+        flat = pd.Series(values[rows, cols], index=pd.MultiIndex.from_arrays([index, np.asarray(self.symbols)[cols]]))
+        return flat.unstack().reindex(columns=self.symbols).sort_index()
+
+    # Window and price context
+
+    def window_start(self, period: str) -> np.ndarray:
+        """Row of the first bar a screen run on each bar with this period would download"""
+        def compute():
+            if period not in PERIOD_OFFSETS:
+                return np.broadcast_to(np.argmax(self.traded, axis=0), self.traded.shape).copy()
+            rows, cols = np.nonzero(self.traded)
+            index = self.timestamps(rows, cols)
+            cutoff = np.full(self.traded.shape, np.iinfo(np.int64).min)
+            cutoff[rows, cols] = (index - PERIOD_OFFSETS[period]).asi8
+            start = np.zeros(self.traded.shape, dtype=np.int64)
+            for j in range(len(self.symbols)):
+                start[:, j] = np.searchsorted(self.dates[:, j], cutoff[:, j], side="right")
+            return start
+        return self._get(("window_start", period), compute)
+
+    def window_bars(self, period: str) -> np.ndarray:
+        """Bars in that download (0 on padding rows)"""
+        rows = np.arange(self.traded.shape[0])[:, None]
+        return self._get(("window_bars", period), lambda: np.where(self.traded, rows - self.window_start(period) + 1, 0))
+
+    def closing_strength(self) -> np.ndarray:
+        return self._get(("closing_strength",), lambda: np.where(self.high > 0, self.close / self.high * 100, 0.0))
+
+    # Indicators (ta definitions, over the full history)
+
+    def volume_avg(self, window: int = 20) -> np.ndarray:
+        return self._get(("volume_avg", window), lambda: _frame_op(self.volume).rolling(window).mean().to_numpy())
+
+    def sma(self, window: int) -> np.ndarray:
+        return self._get(("sma", window), lambda: _frame_op(self.close).rolling(window).mean().to_numpy())
+
+    def ema(self, window: int) -> np.ndarray:
+        return self._get(("ema", window), lambda: _frame_op(self.close).ewm(span=window, min_periods=window, adjust=False).mean().to_numpy())
+
+    def rolling_high(self, window: int = 20) -> np.ndarray:
+        return self._get(("rolling_high", window), lambda: _frame_op(self.high).rolling(window).max().to_numpy())
+
+    def rolling_low(self, window: int = 20) -> np.ndarray:
+        return self._get(("rolling_low", window), lambda: _frame_op(self.low).rolling(window).min().to_numpy())
+
+    def rsi(self, window: int = 14) -> np.ndarray:
+        def compute():
+            diff = self.close - _shift(self.close)
+            # A symbol's first bar has no change (0, as in ta); padding stays NaN
+            up = np.where(self.traded, np.where(diff > 0, diff, 0.0), np.nan)
+            down = np.where(self.traded, np.where(diff < 0, -diff, 0.0), np.nan)
+            ema_up = _frame_op(up).ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+            ema_down = _frame_op(down).ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+            return np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+        return self._get(("rsi", window), compute)
+
+    def macd(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(macd, signal) with the 12/26/9 windows"""
+        def compute():
+            close = _frame_op(self.close)
+            macd = (close.ewm(span=12, min_periods=12, adjust=False).mean() - close.ewm(span=26, min_periods=26, adjust=False).mean())
+            return macd.to_numpy(), macd.ewm(span=9, min_periods=9, adjust=False).mean().to_numpy()
+        return self._get(("macd",), compute)
+
+    def atr(self, window: int = 14) -> np.ndarray:
+        """ta's AverageTrueRange: 0 until the seed bar, then Wilder's recursion"""
+        def compute():
+            prev_close = _shift(self.close)
+            true_range = np.fmax(np.fmax(self.high - self.low, np.abs(self.high - prev_close)), np.abs(self.low - prev_close))
+            seed = _frame_op(true_range).rolling(window).mean().to_numpy()
+            seed_row = np.argmax(self.traded, axis=0) + window - 1
+            atr = np.zeros(true_range.shape)
+            for t in range(true_range.shape[0]):
+                previous = atr[t - 1] if t else 0.0
+                atr[t] = np.where(seed_row == t, seed[t], np.where(seed_row < t, (previous * (window - 1) + true_range[t]) / float(window), 0.0))
+            return np.where(self.traded, atr, np.nan)
+        return self._get(("atr", window), compute)
+
+    def mfi(self, window: int = 14) -> np.ndarray:
+        def compute():
+            typical = (self.high + self.low + self.close) / 3.0
+            prev_typical = _shift(typical)
+            flow = typical * self.volume * np.where(typical > prev_typical, 1, np.where(typical < prev_typical, -1, 0))
+            positive = _frame_op(np.where(flow >= 0.0, flow, np.where(np.isnan(flow), np.nan, 0.0))).rolling(window).sum().to_numpy()
+            negative = np.abs(_frame_op(np.where(flow < 0.0, flow, np.where(np.isnan(flow), np.nan, 0.0))).rolling(window).sum().to_numpy())
+            return 100 - 100 / (1 + positive / negative)
+        return self._get(("mfi", window), compute)
+
+    def _flow_slope(self, terms: np.ndarray, period: str, first_term: Optional[np.ndarray] = None, skip_first: bool = False) -> np.ndarray:
+        """
+        _slope() of a cumulative flow summed from each bar's window start: the
+        numerator is window-independent, the base value is the flow since the
+        window's first bar (which ta counts as first_term, or not at all)
+        """
+        T = terms.shape[0]
+        cumulative = np.vstack([np.zeros((1, terms.shape[1])), np.nancumsum(terms, axis=0)])  # row k: sum of rows < k
+        start = self.window_start(period)
+        base_row = np.arange(T)[:, None] - (LOOKBACK - 1)
+        valid = base_row >= start + (1 if skip_first else 0)
+        base_row = np.clip(base_row, 0, T - 1)
+        first = start + (1 if skip_first else 0)
+        base = np.take_along_axis(cumulative, base_row + 1, axis=0) - np.take_along_axis(cumulative, np.clip(first, 0, T), axis=0)
+        if first_term is not None:
+            base = base + np.take_along_axis(first_term - np.nan_to_num(terms), np.clip(start, 0, T - 1), axis=0)
+        change = cumulative[1:] - np.take_along_axis(cumulative, base_row + 1, axis=0)
+        slope = change / np.where(np.abs(base) > 1e-9, np.abs(base), 1.0)
+        return np.where(valid & self.traded, slope, np.nan)
+
+    def bandarmology(self, period: str = "3mo") -> Dict[str, np.ndarray]:
+        """
+        calculate_bandarmology()'s score, phase and flags on every bar, for a
+        screen downloading `period`. Bars whose window is too short or has no
+        volume get score 0 and phase -1
+        """
+        def compute():
+            close, high, low, volume = self.close, self.high, self.low, self.volume
+            prev_close = _shift(close)
+
+            obv_terms = np.where(close < prev_close, -volume, volume)
+            obv_slope = self._flow_slope(obv_terms, period, first_term=volume)
+            clv = ((close - low) - (high - close)) / (high - low)
+            adl_slope = self._flow_slope(np.where(np.isnan(clv), 0.0, clv) * volume, period)
+            vpt_slope = self._flow_slope((close / prev_close - 1) * volume, period, skip_first=True)
+
+            mfi = self.mfi(14)
+            latest_mfi = np.where(np.isnan(mfi), 50.0, mfi)
+            base = _shift(latest_mfi, LOOKBACK - 1)
+            mfi_slope = (latest_mfi - base) / np.where(np.abs(base) > 1e-9, np.abs(base), 1.0)
+
+            vol_avg20 = self.volume_avg(20)
+            vol_ratio = volume / np.where(vol_avg20 == 0, 1e-6, vol_avg20)
+            avg_ok = vol_avg20 > 0
+            latest_vol_ratio = np.where(~np.isnan(vol_ratio) & avg_ok, vol_ratio, 1.0)
+            recent = _frame_op(vol_ratio).rolling(5, min_periods=1).mean().to_numpy()
+            recent_vol_ratio = np.where(~np.isnan(recent) & avg_ok, recent, 1.0)
+
+            ema20 = self.ema(20)
+            ema20_now = np.where(np.isnan(ema20), close, ema20)
+            sma50 = self.sma(50)
+            bars = self.window_bars(period)
+            above_sma50 = ~((bars >= 50) & ~np.isnan(sma50)) | (close > sma50)
+
+            atr14 = self.atr(14)
+            range_mean = _frame_op(high - low).rolling(14, min_periods=1).mean().to_numpy()
+            atr_now = np.where(~np.isnan(atr14) & (atr14 > 0), atr14, np.where(range_mean > 0, range_mean, close * 0.02))
+
+            scored = score_arrays(
+                self.open, high, low, close, self.rolling_high(20), ema20_now, above_sma50, atr_now,
+                obv_slope, adl_slope, vpt_slope, latest_vol_ratio, recent_vol_ratio, latest_mfi, mfi_slope,
+            )
+            # INSUFFICIENT_DATA / INVALID_DATA
+            cumulative_volume = np.vstack([np.zeros((1, volume.shape[1])), np.nancumsum(volume, axis=0)])
+            start = self.window_start(period)
+            window_volume = cumulative_volume[1:] - np.take_along_axis(cumulative_volume, start, axis=0)
+            usable = (bars >= 40) & (window_volume > 0)
+            return {
+                "score": np.where(usable, scored["score"], 0),
+                "phase": np.where(usable, scored["phase"], -1),
+                "compression": usable & scored["compression"],
+                "absorption": usable & scored["absorption"],
+                "latest_vol_ratio": np.round(latest_vol_ratio, 2),
+            }
+        return self._get(("bandarmology", period), compute)
+
+
+# ============================================================================
+# STRATEGY SIGNALS
+# ============================================================================
+# Each strategy is split into its threshold-free rules (which bars can be a
+# candidate at all, the values its thresholds test, and the trade levels)
+# and the threshold test itself, so a parameter sweep can evaluate many
+# thresholds over candidates computed once (see param_sweep.py)
+
+Inputs = Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray, np.ndarray]
+
+
+def preopen_inputs(f: BacktestFeatures, period: str, enable_bandarmology: bool = True, band_period: str = "3mo") -> Inputs:
+    """_evaluate_preopen() without its thresholds: (candidates, values, stop, quick 3% target)"""
+    base = (f.window_bars(period) >= MIN_BARS["preopen"]) & (f.closing_strength() >= 98)
+    values = {"avg_volume": f.volume_avg(20)}
+    if enable_bandarmology:
+        band = f.bandarmology(band_period)
+        base &= np.isin(band["phase"], [ACCUMULATION, MARKUP])
+        values["score"] = band["score"]
+    atr = f.atr(14)
+    return base, values, f.close - atr * 1.5, f.close * 1.03
+
+
+def bpjs_inputs(f: BacktestFeatures, period: str, enable_bandarmology: bool = True, band_period: str = "3mo") -> Inputs:
+    """_evaluate_bpjs() without its thresholds: (candidates, values, stop, target)"""
+    macd, macd_signal = f.macd()
+    base = (f.window_bars(period) >= MIN_BARS["bpjs"]) & ~(f.rsi(14) >= 70) & ~(macd <= macd_signal)
+    values = {"avg_volume": f.volume_avg(20)}
+    if enable_bandarmology:
+        band = f.bandarmology(band_period)
+        base &= np.isin(band["phase"], [MARKUP, ACCUMULATION]) & ~(band["latest_vol_ratio"] < 1.5)
+        values["score"] = band["score"]
+    atr = f.atr(14)
+    return base, values, f.close - atr * 1.0, f.close + atr * 1.5
+
+
+def bsjp_inputs(f: BacktestFeatures, period: str, enable_bandarmology: bool = True, band_period: str = "3mo") -> Inputs:
+    """_evaluate_bsjp() without its thresholds: (candidates, values, stop, target)"""
+    base = (f.window_bars(period) >= MIN_BARS["bsjp"]) & ~(f.rsi(14) >= 65) & ~(f.closing_strength() < 99)
+    values = {"avg_volume": f.volume_avg(20)}
+    if enable_bandarmology:
+        band = f.bandarmology(band_period)
+        base &= (band["phase"] == ACCUMULATION) & (band["compression"] | band["absorption"])
+        values["score"] = band["score"]
+    atr = f.atr(14)
+    return base, values, f.close - atr * 2.0, f.close + atr * 3.0
+
+
+def day_trade_inputs(f: BacktestFeatures, period: str) -> Inputs:
+    """_evaluate_day_trade() with calculate_chart_based_levels(), without its thresholds: (candidates, values, stop, target)"""
+    close = f.close
+    macd, macd_signal = f.macd()
+    vol_avg = f.volume_avg(20)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_ratio = np.where(vol_avg > 0, f.volume / vol_avg, 1.0)
+
+        ma20 = np.where(np.isnan(f.sma(20)), close, f.sma(20))
+        ma50 = np.where(np.isnan(f.sma(50)), close, f.sma(50))
+        swing_high, swing_low = f.rolling_high(20), f.rolling_low(20)
+        below = np.stack([np.where(ma < close, ma, np.nan) for ma in (ma20, ma50, swing_low)])
+        above = np.stack([np.where(ma > close, ma, np.nan) for ma in (ma20, ma50, swing_high)])
+        support = np.where(np.isnan(below).all(axis=0), close * 0.98, np.nanmax(np.where(np.isnan(below), -np.inf, below), axis=0))
+        resistance = np.where(np.isnan(above).all(axis=0), swing_high, np.nanmin(np.where(np.isnan(above), np.inf, above), axis=0))
+        stop, target = np.round(support * 0.995), np.round(resistance)
+
+        risk, reward = close - stop, target - close
+        base = (f.window_bars(period) >= MIN_BARS["day_trade"]) & (reward > 0) & (risk > 0) & (reward / risk >= 1.0)
+        values = {
+            "rsi": f.rsi(14),
+            "macd_gap": macd - macd_signal,
+            "volume_ratio": vol_ratio,
+            "risk_pct": np.where(close > 0, risk / close * 100, 0.0),
+        }
+    return base, values, stop, target
+
+
+def preopen_passes(values: Dict[str, np.ndarray], min_score: int = 70, min_avg_volume: int = 1000000) -> np.ndarray:
+    passes = values["avg_volume"] >= min_avg_volume
+    if "score" in values:
+        passes = passes & (values["score"] >= min_score)
+    return passes
+
+
+def day_trade_passes(values: Dict[str, np.ndarray], rsi_threshold: float = 78, macd_threshold: float = -20,
+                     volume_threshold: float = 0.5, risk_threshold: float = 6) -> np.ndarray:
+    # Written as negations so missing values pass, as in _evaluate_day_trade()
+    with np.errstate(invalid="ignore"):
+        return (~(values["rsi"] > rsi_threshold) & ~(values["macd_gap"] < macd_threshold)
+                & ~(values["volume_ratio"] < volume_threshold) & ~(values["risk_pct"] > risk_threshold))
+
+
+# Per strategy: (inputs, threshold test, the test's defaults)
+STRATEGY_RULES = {
+    "preopen": (preopen_inputs, preopen_passes, {"min_score": 70, "min_avg_volume": 1000000}),
+    "bpjs": (bpjs_inputs, preopen_passes, {"min_score": 65, "min_avg_volume": 1000000}),
+    "bsjp": (bsjp_inputs, preopen_passes, {"min_score": 60, "min_avg_volume": 1000000}),
+    "day_trade": (day_trade_inputs, day_trade_passes, {"rsi_threshold": 78, "macd_threshold": -20, "volume_threshold": 0.5, "risk_threshold": 6}),
+}
+
+# Settings that change the candidates rather than the thresholds
+INPUT_SETTINGS = ("enable_bandarmology", "band_period")
+
+
+def split_settings(strategy: str, settings: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """A strategy's settings as (inputs arguments, thresholds with defaults filled in)"""
+    inputs = {k: v for k, v in settings.items() if k in INPUT_SETTINGS}
+    thresholds = {**STRATEGY_RULES[strategy][2], **{k: v for k, v in settings.items() if k not in INPUT_SETTINGS}}
+    return inputs, thresholds
+
+
+def strategy_signals(f: BacktestFeatures, strategy: str, period: str, **settings) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """A screen evaluated on every bar: (signal, stop, target)"""
+    inputs, passes, _ = STRATEGY_RULES[strategy]
+    input_settings, thresholds = split_settings(strategy, settings)
+    base, values, stop, target = inputs(f, period, **input_settings)
+    return base & passes(values, **thresholds), stop, target
+
+
+# ============================================================================
+# TRADE SIMULATION
+# ============================================================================
+
+OUTCOMES = ("time", "target", "stop")
+
+
+def simulate_arrays(f: BacktestFeatures, signal: np.ndarray, stop: np.ndarray, target: np.ndarray,
+                    entry: str = "next_open", hold: int = 1, cost_pct: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    One trade per signal with the ATR/chart levels of its signal bar, as
+    flat arrays: signal row and column, exit row, prices, outcome (an index
+    into OUTCOMES) and return (% after cost_pct, and in multiples of the
+    initial risk)
+    """
+    T = signal.shape[0]
+    # Every held bar (signal row + 1 .. + hold) must exist
+    rows, cols = np.nonzero(signal[:max(T - hold, 0)] & f.traded[:max(T - hold, 0)])
+
+    entry_price = f.open[rows + 1, cols] if entry == "next_open" else f.close[rows, cols]
+    stop, target = stop[rows, cols], target[rows, cols]
+    with np.errstate(invalid="ignore"):
+        keep = (entry_price > stop) & (entry_price < target) & ~np.isnan(entry_price)
+    rows, cols, entry_price, stop, target = rows[keep], cols[keep], entry_price[keep], stop[keep], target[keep]
+
+    exit_price = np.full(len(rows), np.nan)
+    exit_row = np.zeros(len(rows), dtype=np.int64)
+    outcome = np.zeros(len(rows), dtype=np.int8)
+    target_code, stop_code = OUTCOMES.index("target"), OUTCOMES.index("stop")
+    for k in range(hold):
+        r = rows + 1 + k
+        o, h, low = f.open[r, cols], f.high[r, cols], f.low[r, cols]
+        if entry == "close" or k > 0:
+            # Gaps through a level fill at the open
+            for hit, code in (((o <= stop), stop_code), ((o >= target), target_code)):
+                hit &= np.isnan(exit_price)
+                exit_price[hit], exit_row[hit], outcome[hit] = o[hit], r[hit], code
+        for hit, level, code in (((low <= stop), stop, stop_code), ((h >= target), target, target_code)):
+            hit &= np.isnan(exit_price)
+            exit_price[hit], exit_row[hit], outcome[hit] = level[hit], r[hit], code
+        if k == hold - 1:
+            left = np.isnan(exit_price)
+            exit_price[left], exit_row[left] = f.close[r, cols][left], r[left]
+
+    return_pct = (exit_price / entry_price - 1) * 100 - cost_pct
+    return {
+        "row": rows,
+        "col": cols,
+        "exit_row": exit_row,
+        "entry": entry_price,
+        "stop": stop,
+        "target": target,
+        "exit": exit_price,
+        "outcome": outcome,
+        "return_pct": return_pct,
+        "r_multiple": return_pct / ((entry_price - stop) / entry_price * 100),
+    }
+
+
+def simulate(f: BacktestFeatures, signal: np.ndarray, stop: np.ndarray, target: np.ndarray,
+             entry: str = "next_open", hold: int = 1, cost_pct: float = 0.0) -> pd.DataFrame:
+    """simulate_arrays() as a frame of symbol, signal/exit dates, prices, outcome and returns"""
+    trades = simulate_arrays(f, signal, stop, target, entry=entry, hold=hold, cost_pct=cost_pct)
+    rows, cols = trades["row"], trades["col"]
+    return pd.DataFrame({
+        "symbol": np.asarray(f.symbols, dtype=object)[cols],
+        "signal_date": f.timestamps(rows, cols),
+        "exit_date": f.timestamps(trades["exit_row"], cols),
+        **{k: trades[k] for k in ("entry", "stop", "target", "exit")},
+        "outcome": np.asarray(OUTCOMES, dtype=object)[trades["outcome"]],
+        "return_pct": trades["return_pct"],
+        "r_multiple": trades["r_multiple"],
+    })
+
+
+def _number(value: float, digits: int = 2) -> Optional[float]:
+    return round(float(value), digits) if value is not None and np.isfinite(value) else None
+
+
+def trade_metrics(return_pct: np.ndarray, r_multiple: np.ndarray, outcome: np.ndarray, exit_day: np.ndarray,
+                  days: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Hit rate, expectancy and drawdown of a set of trades. exit_day orders
+    the exit dates (e.g. epoch nanoseconds); with days given it is already
+    a day number below days, which saves sorting the dates on every call.
+    """
+    if len(return_pct) == 0:
+        return {"trades": 0}
+    wins, losses = return_pct[return_pct > 0], return_pct[return_pct <= 0]
+
+    # Equal-weight the trades closed each day and compound the days
+    if days is None:
+        _, exit_day = np.unique(exit_day, return_inverse=True)
+    counts = np.bincount(exit_day, minlength=days or 0)
+    sums = np.bincount(exit_day, weights=return_pct, minlength=days or 0)
+    daily = sums[counts > 0] / counts[counts > 0] / 100
+    equity = np.cumprod(1 + daily)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+
+    return {
+        "trades": int(len(return_pct)),
+        "hit_rate_pct": _number(len(wins) / len(return_pct) * 100, 1),
+        "target_rate_pct": _number(np.mean(outcome == OUTCOMES.index("target")) * 100, 1),
+        "stop_rate_pct": _number(np.mean(outcome == OUTCOMES.index("stop")) * 100, 1),
+        "avg_win_pct": _number(wins.mean()) if len(wins) else None,
+        "avg_loss_pct": _number(losses.mean()) if len(losses) else None,
+        "expectancy_pct": _number(return_pct.mean(), 3),
+        "expectancy_r": _number(r_multiple.mean(), 3),
+        "profit_factor": _number(wins.sum() / -losses.sum()) if losses.sum() < 0 else None,
+        "max_drawdown_pct": _number(drawdown.min() * 100),
+        "total_return_pct": _number((equity[-1] - 1) * 100),
+    }
+
+
+def summarize(trades: pd.DataFrame) -> Dict[str, Any]:
+    """trade_metrics() of a simulate() frame, with the symbols and dates it covers"""
+    if trades.empty:
+        return {"trades": 0}
+    metrics = trade_metrics(
+        trades["return_pct"].to_numpy(), trades["r_multiple"].to_numpy(),
+        pd.Categorical(trades["outcome"], categories=OUTCOMES).codes, pd.DatetimeIndex(trades["exit_date"]).asi8,
+    )
+    return {
+        "trades": metrics.pop("trades"),
+        "symbols": int(trades["symbol"].nunique()),
+        "first_signal": trades["signal_date"].min().date().isoformat(),
+        "last_signal": trades["signal_date"].max().date().isoformat(),
+        **metrics,
+    }
+
+
+def _trade_records(trades: pd.DataFrame) -> List[Dict[str, Any]]:
+    records = []
+    for trade in trades.itertuples(index=False):
+        records.append({
+            "symbol": trade.symbol,
+            "signal_date": trade.signal_date.date().isoformat(),
+            "exit_date": trade.exit_date.date().isoformat(),
+            "entry": round(float(trade.entry), 2),
+            "stop": round(float(trade.stop), 2),
+            "target": round(float(trade.target), 2),
+            "exit": round(float(trade.exit), 2),
+            "outcome": trade.outcome,
+            "return_pct": round(float(trade.return_pct), 2),
+        })
+    return records
+
+
+def run_backtest(panel: OHLCVPanel, settings: Dict[str, Dict[str, Any]], periods: Optional[Dict[str, str]] = None,
+                 symbols: Optional[Iterable[str]] = None, hold: int = 1, cost_pct: float = 0.0, recent: int = 0,
+                 features: Optional[BacktestFeatures] = None) -> Dict[str, Any]:
+    """
+    Backtest each strategy in settings (strategy -> its signal function's
+    keyword arguments) over the whole panel. periods gives the history each
+    screen downloads (default 3mo), recent the number of latest trades to
+    list; features can be shared between runs.
+    """
+    f = features if features is not None else BacktestFeatures(panel, symbols)
+    periods = periods or {}
+    strategies = {}
+    for name, params in settings.items():
+        signal, stop, target = strategy_signals(f, name, periods.get(name, "3mo"), **params)
+        trades = simulate(f, signal, stop, target, entry=ENTRY[name], hold=hold, cost_pct=cost_pct)
+        strategies[name] = {"signals": int(signal.sum()), **summarize(trades)}
+        if recent:
+            strategies[name]["recent_trades"] = _trade_records(trades.sort_values("signal_date").tail(recent))
+        logger.info(f"Backtest {name}: {int(signal.sum())} signals, {len(trades)} trades")
+
+    dates = f.timestamps(*np.nonzero(f.traded))
+    return {
+        "symbols": len(f.symbols),
+        "bars": int(f.lengths.max()) if len(f.symbols) else 0,
+        "from": dates.min().date().isoformat() if len(dates) else None,
+        "to": dates.max().date().isoformat() if len(dates) else None,
+        "hold_bars": hold,
+        "cost_pct": cost_pct,
+        "strategies": strategies,
+    }
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Bar Store: local OHLCV files with incremental tail refresh
+
+One file pair per (symbol, interval) under BAR_STORE_DIR:
+    <interval>/<TICKER>.npy    float64 rows of [ts, Open, High, Low, Close, Volume]
+    <interval>/<TICKER>.json   {"tz", "since", "refreshed"}
+The .npy is opened memory-mapped, so serving a period= query reads only the
+rows it returns. `since` records how far back the stored bars are complete
+and `refreshed` when the tail was last checked against Yahoo.
+
+market_data.load_panel() asks plan() what each symbol needs:
+- "fresh": serve from disk
+- "tail":  download from the last stored bars onward and append
+- "full":  nothing stored (or not far enough back): download the whole period
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("idx-stock-api")
+
+OHLCV_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", "data/bars")
+BAR_STORE_TTL = int(os.getenv("BAR_STORE_TTL", "900"))  # seconds before the tail is re-checked
+
+# Trailing windows matching yfinance's `period` argument
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Relative change in an already-stored close that means Yahoo re-adjusted
+# the series (dividend or split) and the stored history must be replaced
+ADJUSTMENT_TOLERANCE = 0.005
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """Earliest timestamp a yfinance `period` covers (None for "max")."""
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    if period == "max":
+        return None
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    if period in PERIOD_OFFSETS:
+        return now - PERIOD_OFFSETS[period]
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def trim_to_period(hist: pd.DataFrame, period: Optional[str]) -> pd.DataFrame:
+    """Bars within `period` of the last bar, the window yfinance would return."""
+    if not period or period == "max" or hist.empty:
+        return hist
+    if period == "ytd":
+        return hist[hist.index >= hist.index[-1].normalize().replace(month=1, day=1)]
+    if period in PERIOD_OFFSETS:
+        return hist[hist.index > hist.index[-1] - PERIOD_OFFSETS[period]]
+    return hist
+
+
+class BarStore:
+    def __init__(self, root: str = BAR_STORE_DIR, ttl: int = BAR_STORE_TTL):
+        self.root = root
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _paths(self, ticker: str, interval: str) -> Tuple[str, str]:
+        directory = os.path.join(self.root, interval)
+        return os.path.join(directory, f"{ticker}.npy"), os.path.join(directory, f"{ticker}.json")
+
+    def _read(self, ticker: str, interval: str) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        bars_path, meta_path = self._paths(ticker, interval)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            bars = np.load(bars_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None, {}
+        return bars, meta
+
+    def _write(self, ticker: str, interval: str, bars: np.ndarray, meta: Dict[str, Any]):
+        bars_path, meta_path = self._paths(ticker, interval)
+        os.makedirs(os.path.dirname(bars_path), exist_ok=True)
+        # Write-then-rename so readers never see a half-written file
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(bars_path + suffix, "wb") as f:
+            np.save(f, bars)
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with self._lock:
+            os.replace(bars_path + suffix, bars_path)
+            os.replace(meta_path + suffix, meta_path)
+
+    def plan(self, ticker: str, period: str, interval: str = "1d") -> Tuple[str, Optional[pd.Timestamp]]:
+        """("fresh", None), ("tail", start) or ("full", None) for this request."""
+        bars, meta = self._read(ticker, interval)
+        if bars is None or len(bars) == 0:
+            return "full", None
+
+        start = period_start(period)
+        since = meta.get("since")
+        if since != "max" and (start is None or since is None or since > start.timestamp()):
+            return "full", None
+
+        if time.time() - meta.get("refreshed", 0) < self.ttl:
+            return "fresh", None
+
+        # Re-download the last two stored bars: the last may have been partial,
+        # the one before is complete and reveals a re-adjusted series
+        tail_start = pd.Timestamp(bars[max(0, len(bars) - 2), 0], unit="s", tz="UTC")
+        return "tail", tail_start.tz_convert(meta.get("tz") or "UTC").normalize()
+
+    def replace(self, ticker: str, interval: str, frame: pd.DataFrame, period: str):
+        """Store a full download that covers `period`."""
+        start = period_start(period)
+        meta = {
+            "tz": str(frame.index.tz) if frame.index.tz else None,
+            "since": "max" if start is None else start.timestamp(),
+            "refreshed": time.time(),
+        }
+        self._write(ticker, interval, _to_array(frame), meta)
+
+    def append(self, ticker: str, interval: str, frame: pd.DataFrame) -> bool:
+        """
+        Merge a tail download into the stored bars. Returns False when the
+        overlap shows Yahoo re-adjusted the history (the caller should
+        re-download the full period instead).
+        """
+        bars, meta = self._read(ticker, interval)
+        if bars is None:
+            return False
+        new = _to_array(frame)
+        if len(new):
+            first_ts = new[0, 0]
+            keep = bars[bars[:, 0] < first_ts]
+            overlap = bars[bars[:, 0] == first_ts]
+            if len(overlap) and len(new) > 1:
+                stored_close, fetched_close = overlap[0, 4], new[0, 4]
+                if stored_close > 0 and abs(fetched_close - stored_close) / stored_close > ADJUSTMENT_TOLERANCE:
+                    return False
+            bars = np.vstack([keep, new])
+        meta["refreshed"] = time.time()
+        self._write(ticker, interval, np.asarray(bars), meta)
+        return True
+
+    def history(self, ticker: str, period: Optional[str] = None, interval: str = "1d") -> pd.DataFrame:
+        """Stored bars for `period` (trailing from the last bar), like Ticker.history()."""
+        bars, meta = self._read(ticker, interval)
+        if bars is None or len(bars) == 0:
+            return pd.DataFrame(columns=OHLCV_FIELDS)
+
+        # Slice the memory map before copying: only the requested rows are read
+        start = period_start(period, pd.Timestamp(bars[-1, 0], unit="s", tz="UTC")) if period else None
+        if start is not None:
+            bars = bars[np.searchsorted(bars[:, 0], start.timestamp(), side="right"):]
+        index = pd.to_datetime(np.asarray(bars[:, 0]), unit="s", utc=True)
+        if meta.get("tz"):
+            index = index.tz_convert(meta["tz"])
+        frame = pd.DataFrame(np.array(bars[:, 1:]), index=index, columns=OHLCV_FIELDS)
+        frame.index.name = "Date"
+        return frame
+
+
+def _to_array(frame: pd.DataFrame) -> np.ndarray:
+    frame = frame.dropna(subset=["Close"])
+    index = frame.index if frame.index.tz is not None else frame.index.tz_localize("UTC")
+    ts = index.tz_convert("UTC").asi8 / 1e9
+    return np.column_stack([ts, frame[OHLCV_FIELDS].to_numpy(dtype=np.float64)])
+
+
+# Shared store; set BAR_STORE_DIR="" to always download
+bar_store = BarStore() if BAR_STORE_DIR else None
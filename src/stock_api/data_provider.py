@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Data Provider: where the stock API gets bars and Ticker.info from
+
+Every Yahoo call in the API goes through the provider returned by
+get_provider(), which offers three operations: one symbol's history, one
+symbol's info, and a batched multi-ticker download. Implementations:
+- YFinanceProvider: Yahoo Finance through yfinance (the default)
+- ReplayProvider:   recorded fixtures on disk with an optional artificial
+                    latency, so endpoints and screeners run the same way on
+                    an offline box and benchmarks are reproducible
+- RecordingProvider: wraps another provider and saves what it returns as
+                    replay fixtures
+
+Fixtures use the bar store layout (<interval>/<TICKER>.npy + .json) plus
+info/<TICKER>.json. A replayed period= window trails the last recorded bar,
+so a fixture replays the same bars whenever it is read.
+
+MARKET_DATA_PROVIDER selects "yfinance" or "replay"; RECORD_DIR, when set,
+records everything the selected provider returns.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import yfinance as yf
+
+from bar_store import OHLCV_FIELDS, BarStore
+
+logger = logging.getLogger("idx-stock-api")
+
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+REPLAY_DIR = os.getenv("REPLAY_DIR", "data/replay")
+REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))  # per request; a batch pays it once per wave of threads
+RECORD_DIR = os.getenv("RECORD_DIR", "")
+
+
+class MarketDataProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def history(self, ticker: str, period: str = "1mo", interval: str = "1d", start: Optional[str] = None) -> pd.DataFrame:
+        """OHLCV for one ticker, like Ticker.history() (start= overrides period=)"""
+
+    @abstractmethod
+    def info(self, ticker: str) -> Dict[str, Any]:
+        """Ticker.info for one ticker ({} when unknown)"""
+
+    @abstractmethod
+    def download(self, tickers: List[str], interval: str = "1d", threads: int = 8, **window) -> Dict[str, pd.DataFrame]:
+        """
+        OHLCV for many tickers in one batched request (window is period= or
+        start=). Tickers with no data are left out.
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def __init__(self):
+        # yf.download collects results in module-level state, so two concurrent
+        # calls would clobber each other's tickers
+        self._download_lock = threading.Lock()
+
+    def history(self, ticker: str, period: str = "1mo", interval: str = "1d", start: Optional[str] = None) -> pd.DataFrame:
+        window = {"start": start} if start is not None else {"period": period}
+        return yf.Ticker(ticker).history(interval=interval, **window)
+
+    def info(self, ticker: str) -> Dict[str, Any]:
+        return yf.Ticker(ticker).info or {}
+
+    def download(self, tickers: List[str], interval: str = "1d", threads: int = 8, **window) -> Dict[str, pd.DataFrame]:
+        with self._download_lock:
+            data = yf.download(
+                tickers,
+                interval=interval,
+                group_by="ticker",
+                auto_adjust=True,  # same prices as Ticker.history()
+                actions=False,
+                threads=threads,
+                ignore_tz=False,
+                progress=False,
+                **window,
+            )
+
+        frames = {}
+        if data is None or data.empty:
+            return frames
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                frame = data[ticker]
+            else:
+                frame = data  # single-ticker downloads come back without the ticker level
+            frame = frame.reindex(columns=OHLCV_FIELDS).dropna(subset=["Close"])
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+class ReplayProvider(MarketDataProvider):
+    name = "replay"
+
+    def __init__(self, root: str = REPLAY_DIR, latency_ms: float = REPLAY_LATENCY_MS):
+        self.root = root
+        self.latency_ms = latency_ms
+        self._bars = BarStore(root)
+
+    def _wait(self, requests: int = 1):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0 * requests)
+
+    def _bars_for(self, ticker: str, interval: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        if start is not None:
+            hist = self._bars.history(ticker, interval=interval)
+            return hist[hist.index >= pd.Timestamp(start, tz=hist.index.tz)] if not hist.empty else hist
+        return self._bars.history(ticker, None if period == "max" else period, interval)
+
+    def history(self, ticker: str, period: str = "1mo", interval: str = "1d", start: Optional[str] = None) -> pd.DataFrame:
+        self._wait()
+        return self._bars_for(ticker, interval, period, start)
+
+    def info(self, ticker: str) -> Dict[str, Any]:
+        self._wait()
+        try:
+            with open(os.path.join(self.root, "info", f"{ticker}.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def download(self, tickers: List[str], interval: str = "1d", threads: int = 8, **window) -> Dict[str, pd.DataFrame]:
+        self._wait(math.ceil(len(tickers) / max(1, threads)))
+        frames = {}
+        for ticker in tickers:
+            frame = self._bars_for(ticker, interval, window.get("period"), window.get("start"))
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+class RecordingProvider(MarketDataProvider):
+    def __init__(self, inner: MarketDataProvider, root: str = RECORD_DIR):
+        self.inner = inner
+        self.root = root
+        self.name = f"{inner.name}+record"
+        self._bars = BarStore(root)
+        self._lock = threading.Lock()
+
+    def _record_bars(self, ticker: str, interval: str, frame: pd.DataFrame):
+        frame = frame.reindex(columns=OHLCV_FIELDS).dropna(subset=["Close"])
+        if frame.empty:
+            return
+        with self._lock:
+            stored = self._bars.history(ticker, interval=interval)
+            if not stored.empty:
+                # Newly returned bars win where they overlap the recorded ones
+                frame = pd.concat([stored[stored.index < frame.index[0]], frame])
+            self._bars.replace(ticker, interval, frame, "max")
+
+    def history(self, ticker: str, period: str = "1mo", interval: str = "1d", start: Optional[str] = None) -> pd.DataFrame:
+        hist = self.inner.history(ticker, period=period, interval=interval, start=start)
+        self._record_bars(ticker, interval, hist)
+        return hist
+
+    def info(self, ticker: str) -> Dict[str, Any]:
+        info = self.inner.info(ticker)
+        if info:
+            path = os.path.join(self.root, "info", f"{ticker}.json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(path + suffix, "w", encoding="utf-8") as f:
+                json.dump(info, f, default=str)
+            os.replace(path + suffix, path)
+        return info
+
+    def download(self, tickers: List[str], interval: str = "1d", threads: int = 8, **window) -> Dict[str, pd.DataFrame]:
+        frames = self.inner.download(tickers, interval=interval, threads=threads, **window)
+        for ticker, frame in frames.items():
+            self._record_bars(ticker, interval, frame)
+        return frames
+
+
+def make_provider(name: str = MARKET_DATA_PROVIDER, record_dir: str = RECORD_DIR) -> MarketDataProvider:
+    """The provider for MARKET_DATA_PROVIDER, recording to record_dir when set"""
+    if name == "yfinance":
+        provider: MarketDataProvider = YFinanceProvider()
+    elif name == "replay":
+        provider = ReplayProvider()
+    else:
+        raise ValueError(f"Unknown market data provider: {name}")
+    if record_dir:
+        provider = RecordingProvider(provider, record_dir)
+    logger.info(f"Market data provider: {provider.name}")
+    return provider
+
+
+_provider = make_provider()
+
+
+def get_provider() -> MarketDataProvider:
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    """Swap the provider used by every endpoint and screener (benchmarks, replays)"""
+    global _provider
+    _provider = provider
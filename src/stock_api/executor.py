@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Executor: run blocking data and compute work off the event loop
+
+The endpoints are `async def`, so any yfinance call, indicator calculation
+or subprocess made directly in them blocks every other request on the
+worker. run_blocking() moves that work to a bounded thread pool and caps how
+many calls of each endpoint group run at once: a burst of screens queues
+behind its own limit instead of taking all the threads that price lookups
+and health checks need.
+
+The limit is enforced twice: the event loop queues calls without taking a
+thread, and a thread-side slot per group (group_slot()) caps what actually
+runs, a budget background threads such as the screen jobs share.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+logger = logging.getLogger("idx-stock-api")
+
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "16"))
+
+# Concurrent calls allowed per endpoint group (the rest wait their turn)
+GROUP_LIMITS = {
+    "screen": int(os.getenv("SCREEN_CONCURRENCY", "2")),  # whole-universe screens
+    "stock": int(os.getenv("STOCK_CONCURRENCY", "8")),    # single-symbol data + indicators
+    "market": int(os.getenv("MARKET_CONCURRENCY", "4")),  # global markets
+    "news": 1,                                            # the pipeline runs one at a time anyway
+}
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_slots = {group: threading.BoundedSemaphore(limit) for group, limit in GROUP_LIMITS.items()}
+
+
+def _semaphore(group: str) -> asyncio.Semaphore:
+    if group not in _semaphores:
+        _semaphores[group] = asyncio.Semaphore(GROUP_LIMITS[group])
+    return _semaphores[group]
+
+
+@contextmanager
+def group_slot(group: str) -> Iterator[None]:
+    """Hold one of the group's running slots (blocks the calling thread until one is free)"""
+    slot = _slots[group]
+    if not slot.acquire(blocking=False):
+        logger.info(f"{group} concurrency limit ({GROUP_LIMITS[group]}) reached, waiting for a slot")
+        slot.acquire()
+    try:
+        yield
+    finally:
+        slot.release()
+
+
+def _in_slot(group: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    with group_slot(group):
+        return fn(*args, **kwargs)
+
+
+async def run_blocking(group: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run fn(*args, **kwargs) in the worker pool under the group's concurrency limit."""
+    semaphore = _semaphore(group)
+    if semaphore.locked():
+        logger.info(f"{group} concurrency limit ({GROUP_LIMITS[group]}) reached, queueing {fn.__name__}")
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, functools.partial(_in_slot, group, fn, *args, **kwargs))
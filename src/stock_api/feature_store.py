@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Feature Store: compute each indicator series once per symbol and bar set
+
+The technicals endpoint, the Mandiri report, bandarmology, the chart-level
+and pattern helpers and the screeners all build the same ta indicators
+(RSI, MACD, SMA/EMA, ATR, Bollinger Bands, volume averages) from the same
+bars; the day-trade path alone computed MACD three times per symbol.
+features(hist, symbol) returns a view whose indicator methods memoize their
+series in a shared store, so whichever caller asks first pays for it.
+
+Entries are keyed by symbol, a fingerprint of the bars (first/last
+timestamp, length, first/last close and last volume) and the feature spec.
+The first bar is part of the key because EMA, ATR and the cumulative flow
+indicators depend on where the series starts; the last close and volume
+catch the intraday bar being updated under the same timestamp. Entries are
+evicted least-recently-used once the store exceeds its memory budget.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import pandas as pd
+from ta.momentum import RSIIndicator
+from ta.trend import MACD, EMAIndicator, SMAIndicator
+from ta.volatility import AverageTrueRange, BollingerBands
+from ta.volume import AccDistIndexIndicator, MFIIndicator, OnBalanceVolumeIndicator, VolumePriceTrendIndicator
+
+from market_data import ensure_idx_ticker
+
+FEATURE_STORE_MB = float(os.getenv("FEATURE_STORE_MB", "64"))
+
+# Bookkeeping per entry on top of the series values (key, Series object, index reference)
+ENTRY_OVERHEAD = 600
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=False, deep=False))
+    return 64
+
+
+class FeatureStore:
+    def __init__(self, budget_mb: float = FEATURE_STORE_MB):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (nbytes, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, computing and storing it on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Computed outside the lock; a concurrent miss just computes it twice
+        value = compute()
+        size = _nbytes(value) + ENTRY_OVERHEAD
+        with self._lock:
+            if key not in self._entries and size <= self.budget:
+                self._entries[key] = (size, value)
+                self._bytes += size
+                while self._bytes > self.budget:
+                    _, (evicted, _) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "mb": round(self._bytes / 1024 / 1024, 2),
+                "budget_mb": round(self.budget / 1024 / 1024, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+def bars_fingerprint(hist: pd.DataFrame) -> Optional[tuple]:
+    """Identity of a bar set for cache keys (None for empty frames)"""
+    if hist.empty:
+        return None
+    close = hist["Close"]
+    volume = hist["Volume"] if "Volume" in hist else None
+    return (
+        hist.index[0], hist.index[-1], len(hist),
+        float(close.iloc[0]), float(close.iloc[-1]),
+        float(volume.iloc[-1]) if volume is not None else None,
+    )
+
+
+class Features:
+    """
+    Indicator series for one symbol's bars, memoized in a FeatureStore.
+    Returned series are shared between callers and must not be modified in
+    place. Without a symbol nothing is cached.
+    """
+
+    def __init__(self, hist: pd.DataFrame, symbol: Optional[str] = None, store: Optional[FeatureStore] = None):
+        self.hist = hist
+        self._store = store
+        fingerprint = bars_fingerprint(hist) if symbol and store is not None else None
+        self._base = (ensure_idx_ticker(symbol), fingerprint) if fingerprint is not None else None
+
+    def _get(self, spec: tuple, compute: Callable[[], Any]) -> Any:
+        if self._base is None:
+            return compute()
+        return self._store.get(self._base + spec, compute)
+
+    def rsi(self, window: int = 14) -> pd.Series:
+        return self._get(("rsi", window), lambda: RSIIndicator(close=self.hist["Close"], window=window).rsi())
+
+    def macd(self) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """(macd, signal, histogram) with the default 12/26/9 windows"""
+        def compute():
+            indicator = MACD(close=self.hist["Close"])
+            return indicator.macd(), indicator.macd_signal(), indicator.macd_diff()
+        return self._get(("macd", 12, 26, 9), compute)
+
+    def sma(self, window: int) -> pd.Series:
+        return self._get(("sma", window), lambda: SMAIndicator(close=self.hist["Close"], window=window).sma_indicator())
+
+    def ema(self, window: int) -> pd.Series:
+        return self._get(("ema", window), lambda: EMAIndicator(close=self.hist["Close"], window=window).ema_indicator())
+
+    def bollinger(self, window: int = 20, window_dev: int = 2) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """(upper, middle, lower) bands"""
+        def compute():
+            bb = BollingerBands(close=self.hist["Close"], window=window, window_dev=window_dev)
+            return bb.bollinger_hband(), bb.bollinger_mavg(), bb.bollinger_lband()
+        return self._get(("bollinger", window, window_dev), compute)
+
+    def atr(self, window: int = 14) -> pd.Series:
+        return self._get(("atr", window), lambda: AverageTrueRange(
+            high=self.hist["High"], low=self.hist["Low"], close=self.hist["Close"], window=window).average_true_range())
+
+    def volume_avg(self, window: int = 20) -> pd.Series:
+        return self._get(("volume_avg", window), lambda: self.hist["Volume"].rolling(window).mean())
+
+    def rolling_high(self, window: int = 20) -> pd.Series:
+        return self._get(("rolling_high", window), lambda: self.hist["High"].rolling(window).max())
+
+    def rolling_low(self, window: int = 20) -> pd.Series:
+        return self._get(("rolling_low", window), lambda: self.hist["Low"].rolling(window).min())
+
+    def obv(self) -> pd.Series:
+        return self._get(("obv",), lambda: OnBalanceVolumeIndicator(close=self.hist["Close"], volume=self.hist["Volume"]).on_balance_volume())
+
+    def adl(self) -> pd.Series:
+        return self._get(("adl",), lambda: AccDistIndexIndicator(
+            high=self.hist["High"], low=self.hist["Low"], close=self.hist["Close"], volume=self.hist["Volume"]).acc_dist_index())
+
+    def vpt(self) -> pd.Series:
+        return self._get(("vpt",), lambda: VolumePriceTrendIndicator(close=self.hist["Close"], volume=self.hist["Volume"]).volume_price_trend())
+
+    def mfi(self, window: int = 14) -> pd.Series:
+        return self._get(("mfi", window), lambda: MFIIndicator(
+            high=self.hist["High"], low=self.hist["Low"], close=self.hist["Close"], volume=self.hist["Volume"], window=window).money_flow_index())
+
+
+# Shared store used by the API and the screeners
+feature_store = FeatureStore()
+
+
+def features(hist: pd.DataFrame, symbol: Optional[str] = None) -> Features:
+    """Memoized indicators for a symbol's bars from the shared store"""
+    return Features(hist, symbol, feature_store)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Global Markets: cached, batched snapshot of the overseas markets IDX follows
+
+The pre-open screen reads the overnight moves of Wall Street, Asia,
+commodities and the dollar. Every tracked market is fetched in one batched
+download, and each move is kept until the market can have a new bar: the
+US close does not change during IDX hours, so it is served from memory until
+the next US session opens, while a market that is trading (Nikkei, Hang Seng
+in the morning) is re-read every GLOBAL_MARKETS_TTL seconds. Only the expired
+markets are downloaded again, still in one batch.
+
+Adding a market is one GLOBAL_MARKETS entry; it costs no extra request.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from market_data import download_bars
+
+logger = logging.getLogger("idx-stock-api")
+
+# Seconds a move is re-used while its market is trading
+GLOBAL_MARKETS_TTL = int(os.getenv("GLOBAL_MARKETS_TTL", "900"))
+# Seconds before a market that returned no data is tried again
+FAILURE_TTL = 60
+
+WIB = "Asia/Jakarta"
+
+# Tracked markets. group/key place the move in the check_global_markets()
+# result (a market without a key is the whole group); hours is the WIB
+# (open, close) window in which its daily bar moves, None for around the
+# clock on weekdays; sentiment is POSITIVE above +threshold % and NEGATIVE
+# below -threshold %, reversed for inverse markets
+GLOBAL_MARKETS = {
+    "sp500": {"ticker": "^GSPC", "name": "S&P500", "group": "us_market", "key": None,
+              "threshold": 0.5, "hours": ((20, 30), (4, 0))},
+    "nikkei": {"ticker": "^N225", "name": "Nikkei 225", "group": "asia_markets", "key": "nikkei",
+               "threshold": 0.0, "hours": ((7, 0), (13, 30))},
+    "hang_seng": {"ticker": "^HSI", "name": "Hang Seng", "group": "asia_markets", "key": "hang_seng",
+                  "threshold": 0.0, "hours": ((8, 30), (15, 0))},
+    # Coal and nickel have no liquid Yahoo series; a broad commodity ETF stands in
+    "commodities": {"ticker": "DBC", "name": "Invesco DB Commodity Index", "group": "commodities", "key": "general",
+                    "threshold": 1.0, "hours": ((20, 30), (4, 0))},
+    # A stronger dollar pulls foreign money out of IDR assets
+    "dxy": {"ticker": "DX-Y.NYB", "name": "US Dollar Index", "group": "currency", "key": "dxy",
+            "threshold": 0.3, "inverse": True, "hours": None},
+}
+
+GROUPS = ("us_market", "asia_markets", "commodities", "currency")
+
+
+def _at(day: pd.Timestamp, clock: Tuple[int, int]) -> pd.Timestamp:
+    return day + pd.Timedelta(hours=clock[0], minutes=clock[1])
+
+
+def in_session(hours: Optional[Tuple[Tuple[int, int], Tuple[int, int]]], at: pd.Timestamp) -> bool:
+    """Whether a market with these WIB hours is trading at `at`"""
+    if hours is None:
+        return at.weekday() < 5
+    open_, close = hours
+    today = at.normalize()
+    for day in (today, today - pd.Timedelta(days=1)):  # sessions can run past midnight
+        start = _at(day, open_)
+        end = _at(day + pd.Timedelta(days=1) if close <= open_ else day, close)
+        if day.weekday() < 5 and start <= at < end:
+            return True
+    return False
+
+
+def next_open(hours: Optional[Tuple[Tuple[int, int], Tuple[int, int]]], at: pd.Timestamp) -> pd.Timestamp:
+    """Start of the market's first session after `at`"""
+    open_ = hours[0] if hours is not None else (0, 0)
+    day = at.normalize()
+    while day.weekday() >= 5 or _at(day, open_) <= at:
+        day += pd.Timedelta(days=1)
+    return _at(day, open_)
+
+
+def expires_at(hours: Optional[Tuple[Tuple[int, int], Tuple[int, int]]], fetched_at: pd.Timestamp, ttl: int = GLOBAL_MARKETS_TTL) -> pd.Timestamp:
+    """
+    When a move read at fetched_at may be out of date: after ttl while the
+    market trades (or just closed and Yahoo may still settle the bar), else
+    at its next open
+    """
+    if in_session(hours, fetched_at) or in_session(hours, fetched_at - pd.Timedelta(seconds=ttl)):
+        return fetched_at + pd.Timedelta(seconds=ttl)
+    return next_open(hours, fetched_at)
+
+
+def _sentiment(change_pct: float, threshold: float, inverse: bool = False) -> str:
+    if inverse:
+        change_pct = -change_pct
+    if threshold == 0:
+        return "POSITIVE" if change_pct > 0 else "NEGATIVE"
+    return "POSITIVE" if change_pct > threshold else "NEGATIVE" if change_pct < -threshold else "NEUTRAL"
+
+
+class GlobalMarketsCache:
+    def __init__(self, markets: Optional[Dict[str, Dict[str, Any]]] = None, ttl: int = GLOBAL_MARKETS_TTL):
+        self.markets = markets or GLOBAL_MARKETS
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[pd.Timestamp, Optional[float]]] = {}  # market -> (expires_at, change_pct)
+        self._lock = threading.Lock()  # one refresh at a time; waiting callers reuse its result
+        self.fetches = 0
+
+    def changes(self) -> Dict[str, Optional[float]]:
+        """Latest daily % change per market (None when unavailable)"""
+        with self._lock:
+            now = pd.Timestamp.now(tz=WIB)
+            expired = [m for m in self.markets if m not in self._entries or now >= self._entries[m][0]]
+            if expired:
+                self._refresh(expired, now)
+            return {m: self._entries[m][1] for m in self.markets}
+
+    def _refresh(self, expired, now: pd.Timestamp):
+        tickers = {self.markets[m]["ticker"]: m for m in expired}
+        try:
+            frames = download_bars(list(tickers), period="5d")
+        except Exception as e:
+            logger.warning(f"Failed to fetch global markets: {e}")
+            frames = {}
+        self.fetches += 1
+
+        for ticker, market in tickers.items():
+            hist = frames.get(ticker)
+            if hist is None or len(hist) < 2:
+                logger.warning(f"Failed to fetch {self.markets[market]['name']} data")
+                self._entries[market] = (now + pd.Timedelta(seconds=FAILURE_TTL), None)
+                continue
+            latest = hist.iloc[-1]["Close"]
+            prev = hist.iloc[-2]["Close"]
+            change_pct = ((latest - prev) / prev) * 100
+            self._entries[market] = (expires_at(self.markets[market].get("hours"), now, self.ttl), float(change_pct))
+        logger.info(f"Fetched {len(tickers)} global markets in one batch")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-market moves and sentiment grouped as check_global_markets() returns them"""
+        result: Dict[str, Any] = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M WIB"),
+            **{group: {} for group in GROUPS},
+            "overall_sentiment": "NEUTRAL"
+        }
+
+        positive_signals = 0
+        total_signals = 0
+        for market, change_pct in self.changes().items():
+            spec = self.markets[market]
+            if change_pct is None:
+                if spec["key"] is None:
+                    result[spec["group"]] = {"error": "Data unavailable"}
+                continue
+            entry = {
+                "change_pct": round(change_pct, 2),
+                "sentiment": _sentiment(change_pct, spec["threshold"], spec.get("inverse", False))
+            }
+            if spec["key"] is None:
+                result[spec["group"]] = {"index": spec["name"], **entry}
+            else:
+                result.setdefault(spec["group"], {})[spec["key"]] = entry
+            total_signals += 1
+            if entry["sentiment"] == "POSITIVE":
+                positive_signals += 1
+
+        if total_signals > 0:
+            positive_ratio = positive_signals / total_signals
+            if positive_ratio >= 0.6:
+                result["overall_sentiment"] = "POSITIVE"
+            elif positive_ratio <= 0.4:
+                result["overall_sentiment"] = "NEGATIVE"
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            "markets": len(self.markets),
+            "fetches": self.fetches,
+            "expires": {m: expiry.isoformat() for m, (expiry, _) in entries.items()},
+        }
+
+
+# Shared snapshot used by the API endpoints and the pre-open screen
+global_markets = GlobalMarketsCache()
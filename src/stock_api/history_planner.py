@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+History Planner: fetch exactly the daily bars a set of computations needs
+
+Every screener and indicator has a minimum number of bars below which it
+returns nothing (or silently degrades, like MA200 in detect_pattern_label).
+plan_period() turns the largest requirement among the requested
+computations into the smallest yfinance period that reliably covers it,
+so one download can be shared by all of them.
+"""
+
+from typing import Iterable
+
+# Minimum daily bars per computation (gate checks and indicator windows)
+MIN_BARS = {
+    # Indicators
+    "rsi": 15,                    # RSI(14) needs one extra bar for the first change
+    "atr": 15,                    # ATR(14), same
+    "ema12": 12,
+    "sma20": 20,
+    "bollinger": 20,
+    "volume_avg20": 20,
+    "macd": 35,                   # EMA26 + 9-bar signal line
+    "sma50": 50,
+    # Analyses
+    "bandarmology": 50,           # gate is 40 bars, SMA50 structure needs 50
+    "chart_levels": 50,           # calculate_chart_based_levels() MA50
+    "pattern_label": 201,         # detect_pattern_label() MA200 plus the previous bar for crossovers
+    # Screener gates
+    "screen_preopen": 40,
+    "screen_bpjs": 50,
+    "screen_bsjp": 50,
+    "screen_day_trade": 50,
+}
+
+# Trading days each period is guaranteed to hold on IDX, allowing for
+# holidays and collective leave (about 240 trading days a year)
+PERIOD_BARS = [
+    ("5d", 3),
+    ("1mo", 17),
+    ("3mo", 55),
+    ("6mo", 112),
+    ("1y", 230),
+    ("2y", 465),
+    ("5y", 1170),
+]
+
+
+def required_bars(computations: Iterable[str]) -> int:
+    """Largest minimum-bar requirement among the computations."""
+    bars = 0
+    for name in computations:
+        if name not in MIN_BARS:
+            raise ValueError(f"Unknown computation: {name}")
+        bars = max(bars, MIN_BARS[name])
+    return bars
+
+
+def period_for_bars(bars: int) -> str:
+    """Smallest yfinance period expected to contain at least `bars` daily bars."""
+    for period, guaranteed in PERIOD_BARS:
+        if guaranteed >= bars:
+            return period
+    return "max"
+
+
+def plan_period(*computations: str) -> str:
+    """Period to download so every listed computation has enough bars."""
+    return period_for_bars(required_bars(computations))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Info Cache: shared in-memory cache for yfinance Ticker.info
+
+Ticker.info is one of the slowest Yahoo calls and most of it changes at most
+daily. Entries are kept in a size-bounded LRU and are fresh for as long as
+the *requested* fields allow (price-derived fields expire quickly, company
+data slowly). Concurrent misses for the same symbol share one fetch.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from data_provider import get_provider
+from market_data import ensure_idx_ticker
+
+logger = logging.getLogger("idx-stock-api")
+
+INFO_CACHE_SIZE = int(os.getenv("INFO_CACHE_SIZE", "512"))
+
+# Seconds each info field stays fresh; fields not listed use DEFAULT_INFO_TTL
+FIELD_TTLS = {
+    # Move with the price
+    "marketCap": 15 * 60,
+    "trailingPE": 15 * 60,
+    "priceToBook": 15 * 60,
+    "dividendYield": 15 * 60,
+    # Change with reports or rarely
+    "trailingEps": 24 * 3600,
+    "totalRevenue": 24 * 3600,
+    "profitMargins": 24 * 3600,
+    "returnOnEquity": 24 * 3600,
+    "debtToEquity": 24 * 3600,
+    "currentRatio": 24 * 3600,
+    "beta": 24 * 3600,
+    "currency": 7 * 24 * 3600,
+}
+DEFAULT_INFO_TTL = 6 * 3600
+
+
+class InfoCache:
+    def __init__(self, maxsize: int = INFO_CACHE_SIZE, field_ttls: Optional[Dict[str, int]] = None):
+        self.maxsize = maxsize
+        self.field_ttls = field_ttls or FIELD_TTLS
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # ticker -> (fetched_at, info)
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _ttl(self, fields: Optional[Iterable[str]]) -> float:
+        if not fields:
+            return min(self.field_ttls.values(), default=DEFAULT_INFO_TTL)
+        return min(self.field_ttls.get(f, DEFAULT_INFO_TTL) for f in fields)
+
+    def get(self, symbol: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Ticker.info for a symbol, fetched only if the cached copy is older than
+        the shortest TTL among `fields` (all fields when omitted).
+        """
+        ticker = ensure_idx_ticker(symbol)
+        ttl = self._ttl(fields)
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(ticker)
+                if entry and time.time() - entry[0] < ttl:
+                    self._entries.move_to_end(ticker)
+                    return entry[1]
+                event = self._inflight.get(ticker)
+                if event is None:
+                    event = self._inflight[ticker] = threading.Event()
+                    break
+            # Another request is already fetching this symbol; use its result
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(ticker)
+            if entry and time.time() - entry[0] < ttl:
+                return entry[1]
+            # The other fetch failed or is already too old for us: try ourselves
+
+        try:
+            info = get_provider().info(ticker)
+            with self._lock:
+                self._entries[ticker] = (time.time(), info)
+                self._entries.move_to_end(ticker)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            return info
+        finally:
+            with self._lock:
+                self._inflight.pop(ticker, None)
+            event.set()
+
+    def prewarm(self, symbols: Iterable[str], workers: int = 4):
+        """Fill the cache for a universe in the background."""
+        symbols = list(symbols)
+
+        def _warm(symbol):
+            try:
+                self.get(symbol)
+            except Exception as e:
+                logger.warning(f"Could not prewarm info for {symbol}: {e}")
+
+        def _run():
+            started = time.time()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_warm, symbols))
+            logger.info(f"Prewarmed info cache for {len(symbols)} symbols in {time.time() - started:.1f}s")
+
+        threading.Thread(target=_run, daemon=True, name="info-prewarm").start()
+
+
+# Shared cache used by the API endpoints
+info_cache = InfoCache()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Market Data: batched OHLCV loading for the screeners
+
+Instead of one yf.Ticker(...).history() call per symbol (plus a sleep to stay
+under Yahoo's rate limit), the whole universe is fetched with the provider's
+batched download (yf.download by default, see data_provider.py) in a few
+threaded multi-ticker batches and returned as one OHLCVPanel: a single frame
+on a shared date index with (symbol, field) columns.
+
+Downloads go through the local bar store (bar_store.py) when it is enabled:
+symbols already on disk only fetch the bars since their last stored one.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+from bar_store import PERIOD_OFFSETS, BarStore, OHLCV_FIELDS, bar_store, trim_to_period
+from data_provider import get_provider
+
+logger = logging.getLogger("idx-stock-api")
+
+# Tickers per batched download and concurrent requests within a batch
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("YF_DOWNLOAD_CHUNK_SIZE", "100"))
+DOWNLOAD_THREADS = int(os.getenv("YF_DOWNLOAD_THREADS", "8"))
+
+
+def ensure_idx_ticker(symbol: str) -> str:
+    """Ensure ticker has .JK suffix for Indonesian stocks"""
+    symbol = symbol.upper().strip()
+    if not symbol.endswith(".JK"):
+        symbol = f"{symbol}.JK"
+    return symbol
+
+
+class OHLCVPanel:
+    """
+    OHLCV for many symbols aligned on one date index.
+    `frame` has (symbol, field) columns; a symbol's rows are NaN on dates it
+    did not trade. history() returns the same shape as Ticker.history().
+    """
+
+    def __init__(self, frame: pd.DataFrame, period: str, interval: str = "1d"):
+        self.frame = frame
+        self.period = period
+        self.interval = interval
+        self.symbols: List[str] = list(dict.fromkeys(frame.columns.get_level_values(0)))
+        self._symbol_set = set(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._symbol_set
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def history(self, symbol: str, period: Optional[str] = None) -> pd.DataFrame:
+        """
+        One symbol's bars (dates it did not trade dropped). `period` trims to
+        a trailing window, so a screener sees the same bars from a longer
+        shared panel as it would from its own download.
+        """
+        if symbol not in self:
+            return pd.DataFrame(columns=OHLCV_FIELDS)
+        hist = self.frame[symbol].dropna(subset=["Close"])
+        if period and period != self.period:
+            hist = trim_to_period(hist, period)
+        return hist.copy()
+
+    def trimmed(self, period: str) -> "OHLCVPanel":
+        """
+        The panel cut to each symbol's trailing `period`: history(symbol) of
+        the result equals history(symbol, period) of this panel.
+        """
+        if period == self.period or period == "max" or self.frame.empty:
+            return self
+        if period not in PERIOD_OFFSETS:
+            frames = {s: self.history(s, period) for s in self.symbols}
+            return OHLCVPanel(pd.concat(frames, axis=1).sort_index(), period=period, interval=self.interval)
+
+        frame = self.frame.sort_index()
+        close = frame.xs("Close", axis=1, level=1).reindex(columns=self.symbols)
+        traded = close.notna().to_numpy()
+        last = frame.index[len(frame.index) - 1 - traded[::-1].argmax(axis=0)]  # each symbol's last bar
+        keep = frame.index.asi8[:, None] > (last - PERIOD_OFFSETS[period]).asi8[None, :]
+        column_symbols = pd.Index(self.symbols).get_indexer(frame.columns.get_level_values(0))
+        frame = frame.where(keep[:, column_symbols])
+        return OHLCVPanel(frame[frame.notna().any(axis=1)], period=period, interval=self.interval)
+
+
+def _download(tickers: List[str], interval: str, chunk_size: int, threads: int, **window) -> Dict[str, pd.DataFrame]:
+    """
+    Batched download (window is period= or start=). Tickers that come back
+    empty get one more batched attempt.
+    """
+    pending = list(tickers)
+    frames: Dict[str, pd.DataFrame] = {}
+
+    for attempt in range(2):
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                frames.update(get_provider().download(chunk, interval=interval, threads=threads, **window))
+            except Exception as e:
+                logger.warning(f"Batch download failed for {len(chunk)} tickers: {e}")
+        pending = [t for t in pending if t not in frames]
+        if not pending:
+            break
+        if attempt == 0:
+            logger.info(f"Retrying {len(pending)} tickers with no data")
+    return frames
+
+
+def download_bars(tickers: Iterable[str], period: str = "5d", interval: str = "1d") -> Dict[str, pd.DataFrame]:
+    """
+    Batched download of any Yahoo tickers as given (indices, futures, FX),
+    bypassing the bar store. Tickers with no data are left out.
+    """
+    return _download(list(dict.fromkeys(tickers)), interval, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_THREADS, period=period)
+
+
+def _load_via_store(store: BarStore, tickers: List[str], period: str, interval: str,
+                    chunk_size: int, threads: int) -> Dict[str, pd.DataFrame]:
+    plans = {t: store.plan(t, period, interval) for t in tickers}
+    full = [t for t, (kind, _) in plans.items() if kind == "full"]
+    tail = {t: start for t, (kind, start) in plans.items() if kind == "tail"}
+
+    if tail:
+        # One batch from the oldest tail start; overlapping bars are replaced on append
+        start = min(tail.values()).strftime("%Y-%m-%d")
+        fetched = _download(list(tail), interval, chunk_size, threads, start=start)
+        stale = 0
+        for ticker in tail:
+            if ticker not in fetched:
+                stale += 1  # keep serving the stored bars
+            elif not store.append(ticker, interval, fetched[ticker]):
+                logger.info(f"{ticker} history was re-adjusted, re-downloading {period}")
+                full.append(ticker)
+        if stale:
+            logger.warning(f"Tail refresh failed for {stale} tickers, serving stored bars")
+
+    if full:
+        fetched = _download(full, interval, chunk_size, threads, period=period)
+        for ticker, frame in fetched.items():
+            store.replace(ticker, interval, frame, period)
+
+    logger.info(f"Bar store: {len(plans) - len(full) - len(tail)} fresh, {len(tail)} tail, {len(full)} full downloads")
+    frames = {}
+    for ticker in tickers:
+        hist = store.history(ticker, period, interval)
+        if not hist.empty:
+            frames[ticker] = hist
+    return frames
+
+
+def load_panel(
+    symbols: Iterable[str],
+    period: str = "3mo",
+    interval: str = "1d",
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    threads: int = DOWNLOAD_THREADS,
+    store: Optional[BarStore] = bar_store,
+) -> OHLCVPanel:
+    """
+    Load OHLCV for every symbol and align them into one panel, reading the
+    bar store when enabled and downloading in batches otherwise. Symbols with
+    no data are left out of the panel (history() returns an empty frame).
+    """
+    symbols = list(dict.fromkeys(symbols))
+    tickers = {ensure_idx_ticker(s): s for s in symbols}
+
+    if store is not None:
+        frames = _load_via_store(store, list(tickers), period, interval, chunk_size, threads)
+    else:
+        frames = _download(list(tickers), interval, chunk_size, threads, period=period)
+
+    missing = [t for t in tickers if t not in frames]
+    if missing:
+        logger.warning(f"No {period} data for {len(missing)} tickers: {', '.join(sorted(missing))}")
+
+    if frames:
+        frame = pd.concat({tickers[t]: f for t, f in frames.items()}, axis=1).sort_index()
+    else:
+        frame = pd.DataFrame(columns=pd.MultiIndex.from_product([[], OHLCV_FIELDS]))
+    logger.info(f"Loaded {period} {interval} bars for {len(frames)}/{len(symbols)} symbols")
+    return OHLCVPanel(frame, period=period, interval=interval)
+
+
+def load_history(symbol: str, period: str = "3mo", interval: str = "1d") -> pd.DataFrame:
+    """Single-symbol OHLCV through the same store/batch path as the screeners."""
+    return load_panel([symbol], period=period, interval=interval).history(symbol)
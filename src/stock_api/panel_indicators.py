@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Panel Indicators: calculate_bandarmology for a whole universe at once
+
+calculate_bandarmology() runs the ta indicator classes and the scoring in
+Python for one symbol at a time; MFI alone calls a Python lambda for every
+rolling window. bandarmology_arrays() computes the same indicators, score
+and phase for every symbol in one pass over (dates x symbols) arrays, and
+panel_bandarmology() wraps the result in the same dicts.
+
+The arithmetic follows ta/pandas operation for operation (cumulative sums
+in date order, 14-bar window sums, the ATR recursion, pandas' own rolling
+and ewm kernels), so the output is identical to the per-symbol function,
+not merely close. benchmarks/stock_api/bandarmology_regression.py checks
+that on a synthetic fixture with gaps, flat bars and short histories.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_store import OHLCV_FIELDS
+from market_data import OHLCVPanel
+
+MIN_BARS = 40
+LOOKBACK = 10  # slope window, as in _slope()
+
+# Entry setup and guidance per phase
+PHASE_SETUPS = {
+    "ACCUMULATION": ("BUY_STOP_BREAKOUT", "Place buy-stop slightly above 20-day high when volume>1.5x avg; confirmation if OBV keeps rising."),
+    "MARKUP": ("BUY_PULLBACK_TO_EMA20", "Enter on shallow pullback to EMA20 with shrinking volume; avoid if OBV/ADL roll over."),
+    "DISTRIBUTION": ("AVOID_OR_TAKE_PROFIT", "Weak flow / distribution risk; avoid new longs or trail stops tighter."),
+    "MARKDOWN": ("WAIT", "Wait for compression + volume thrust and OBV turn."),
+}
+PHASES = ["MARKUP", "ACCUMULATION", "DISTRIBUTION", "MARKDOWN"]
+MFI_STATES = ["ACCUMULATING", "RELOADING_FROM_OVERSOLD", "DISTRIBUTION_RISK", "NEUTRAL"]
+
+
+def _empty_result(phase: str, guidance: str) -> dict:
+    return {"score": 0, "phase": phase, "signals": {}, "levels": {}, "setup": {"type": "WAIT", "guidance": guidance}, "risk": {"atr": 0, "atr_pct": 0, "suggested_stop_atr": 1.5, "suggested_tp_atr": 3.0}}
+
+
+def right_align(panel: OHLCVPanel, symbols: Iterable[str]):
+    """
+    Pack each symbol's traded bars (non-NaN Close) at the bottom of a
+    (dates, symbols, fields) array, in date order. The last row is then every
+    symbol's latest bar and NaN rows only ever precede a symbol's history.
+    Returns the array and the number of bars per symbol.
+    """
+    symbols = list(symbols)
+    frame = panel.frame.sort_index()
+    columns = pd.MultiIndex.from_product([symbols, OHLCV_FIELDS])
+    dense = frame.reindex(columns=columns).to_numpy(dtype=np.float64, na_value=np.nan)
+    dense = dense.reshape(len(frame.index), len(symbols), len(OHLCV_FIELDS))
+
+    traded = ~np.isnan(dense[:, :, OHLCV_FIELDS.index("Close")])
+    order = np.argsort(traded, axis=0, kind="stable")
+    aligned = np.take_along_axis(dense, order[:, :, None], axis=0)
+    aligned[~np.take_along_axis(traded, order, axis=0)] = np.nan
+    return aligned, traded.sum(axis=0)
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    shifted = np.empty_like(x)
+    shifted[0] = np.nan
+    shifted[1:] = x[:-1]
+    return shifted
+
+
+def _cumsum_skipna(x: np.ndarray) -> np.ndarray:
+    """pandas cumsum: NaN entries stay NaN and are skipped by the running sum"""
+    result = np.nancumsum(x, axis=0)
+    result[np.isnan(x)] = np.nan
+    return result
+
+
+def _window_sums(x: np.ndarray, window: int, rows: int) -> np.ndarray:
+    """
+    Sums of the `window` values ending at each of the last `rows` rows, as
+    (rows, symbols). Each window is summed as its own contiguous array so
+    NumPy adds in the same order as np.sum inside rolling().apply().
+    """
+    T = x.shape[0]
+    windows = np.stack([x[T - rows + k - window + 1:T - rows + k + 1].T for k in range(rows)], axis=1)
+    return np.ascontiguousarray(windows).sum(axis=-1).T
+
+
+def _slope(series: np.ndarray) -> np.ndarray:
+    a, b = series[-LOOKBACK], series[-1]
+    denom = np.where(np.abs(a) > 1e-9, np.abs(a), 1.0)
+    return (b - a) / denom
+
+
+def _atr_last(high, low, close, lengths, window=14):
+    """AverageTrueRange(window).average_true_range().iloc[-1] per symbol"""
+    T, S = close.shape
+    prev_close = _shift(close)
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+    start = T - lengths
+    seed_row = start + window - 1
+    seeded = lengths >= window
+    seed_rows = np.clip(start, 0, T - window)[:, None] + np.arange(window)
+    seed = np.ascontiguousarray(np.take_along_axis(true_range, seed_rows.T, axis=0).T).sum(axis=1) / window
+
+    atr = np.zeros(S)
+    for t in range(int(seed_row[seeded].min()) if seeded.any() else T, T):
+        atr = np.where(seed_row == t, seed, np.where(seed_row < t, (atr * (window - 1) + true_range[t]) / float(window), atr))
+    return np.where(seeded, atr, np.nan)
+
+
+def bandarmology_arrays(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                        volume: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    calculate_bandarmology() features, score and phase for every column of
+    right-aligned (dates, symbols) OHLCV arrays (see right_align()). Columns
+    with fewer than MIN_BARS bars get values but should not be used.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev_close = _shift(close)
+
+        # Flow: OBV / ADL / VPT
+        obv = _cumsum_skipna(np.where(np.isnan(volume), np.nan, np.where(close < prev_close, -volume, volume)))
+        clv = ((close - low) - (high - close)) / (high - low)
+        clv = np.where(np.isnan(clv), 0.0, clv)
+        adl = _cumsum_skipna(clv * volume)
+        vpt = _cumsum_skipna((close / prev_close - 1) * volume)
+        obv_slope, adl_slope, vpt_slope = _slope(obv), _slope(adl), _slope(vpt)
+
+        # MFI(14) over the slope window
+        typical = (high + low + close) / 3.0
+        prev_typical = _shift(typical)
+        up_down = np.where(typical > prev_typical, 1, np.where(typical < prev_typical, -1, 0))
+        flow = typical * volume * up_down
+        rows = LOOKBACK + 13
+        has_nan = _window_sums(np.isnan(flow[-rows:]).astype(np.float64), 14, LOOKBACK) > 0
+        positive = _window_sums(np.where(flow >= 0.0, flow, 0.0)[-rows:], 14, LOOKBACK)
+        negative = np.abs(_window_sums(np.where(flow < 0.0, flow, 0.0)[-rows:], 14, LOOKBACK))
+        mfi = 100 - (100 / (1 + positive / negative))
+        mfi[has_nan] = np.nan
+        latest_mfi = np.where(np.isnan(mfi[-1]), 50.0, mfi[-1])
+        # mfi.bfill().fillna(50): the slope start takes the next valid value
+        next_valid = pd.DataFrame(mfi).bfill().to_numpy()
+        mfi_filled = np.where(np.isnan(next_valid), 50.0, next_valid)
+        mfi_slope = _slope(mfi_filled)
+
+        # Volume pressure
+        vol_avg20 = pd.DataFrame(volume).rolling(20).mean().to_numpy()[-5:]
+        vol_ratio = volume[-5:] / np.where(vol_avg20 == 0, 1e-6, vol_avg20)
+        avg_ok = vol_avg20[-1] > 0
+        latest_vol_ratio = np.where(~np.isnan(vol_ratio[-1]) & avg_ok, vol_ratio[-1], 1.0)
+        recent = np.ascontiguousarray(vol_ratio.T)
+        recent_count = (~np.isnan(recent)).sum(axis=1)
+        recent_mean = np.nansum(recent, axis=1) / recent_count
+        recent_vol_ratio = np.where(~np.isnan(recent_mean) & avg_ok, recent_mean, 1.0)
+
+        # Price / volatility context
+        last_close = close[-1]
+        high_20 = high[-20:].max(axis=0)
+        low_20 = low[-20:].min(axis=0)
+        ema20 = pd.DataFrame(close).ewm(span=20, min_periods=20, adjust=False).mean().to_numpy()[-1]
+        ema20_now = np.where(np.isnan(ema20), last_close, ema20)
+        sma50 = pd.DataFrame(close).rolling(50).mean().to_numpy()[-1]
+        has_sma50 = (lengths >= 50) & ~np.isnan(sma50)
+
+        atr14 = _atr_last(high, low, close, lengths)
+        recent_range = np.ascontiguousarray((high - low)[-14:].T)
+        range_count = (~np.isnan(recent_range)).sum(axis=1)
+        range_mean = np.nansum(recent_range, axis=1) / range_count
+        atr_now = np.where(~np.isnan(atr14) & (atr14 > 0), atr14,
+                           np.where(range_mean > 0, range_mean, last_close * 0.02))
+
+        is_above_sma50 = ~has_sma50 | (last_close > sma50)
+
+    scored = score_arrays(
+        open_[-1], high[-1], low[-1], last_close, high_20, ema20_now, is_above_sma50, atr_now,
+        obv_slope, adl_slope, vpt_slope, latest_vol_ratio, recent_vol_ratio, latest_mfi, mfi_slope,
+    )
+    return {
+        "obv_slope": obv_slope, "adl_slope": adl_slope, "vpt_slope": vpt_slope,
+        "latest_vol_ratio": latest_vol_ratio, "recent_vol_ratio": recent_vol_ratio,
+        "mfi": latest_mfi, "mfi_slope": mfi_slope,
+        "above_sma50": is_above_sma50, "atr": atr_now,
+        "high_20": high_20, "low_20": low_20, "ema20": ema20_now, "close": last_close,
+        **scored,
+    }
+
+
+def score_arrays(open_, high, low, close, high_20, ema20_now, above_sma50, atr_now,
+                 obv_slope, adl_slope, vpt_slope, latest_vol_ratio, recent_vol_ratio, latest_mfi, mfi_slope) -> Dict[str, np.ndarray]:
+    """
+    score_bandarmology()'s flags, score and phase (an index into PHASES)
+    elementwise: for the latest bar of every symbol, or for every bar of a
+    (dates, symbols) history at once
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        last_range = high - low
+        body_ratio = np.abs(close - open_) / np.where(last_range == 0, 1e-6, last_range)
+        body_ratio = np.where(np.isnan(body_ratio), 0.0, body_ratio)
+        is_absorption = (body_ratio <= 0.3) & (latest_vol_ratio >= 1.5)
+        atr_pct = np.where(close > 0, atr_now / close, 0.0)
+        last_range = np.where(np.isnan(last_range), 0.0, last_range)
+        is_compression = (atr_now > 0) & (last_range <= 0.6 * atr_now)
+
+        is_breakout_now = (close > high_20) & (latest_vol_ratio >= 1.5)
+        is_above_ema20 = close > ema20_now
+
+    # Score components (weights sum to 100)
+    flow_sub = np.zeros(np.shape(close), dtype=np.int64)
+    for s in (obv_slope, adl_slope, vpt_slope):
+        flow_sub += np.where(s > 0, 12, np.where(s > -0.02, 6, 0))
+    flow_sub = np.minimum(flow_sub, 35)
+
+    vol_sub = np.where(latest_vol_ratio >= 2.0, 12, np.where(latest_vol_ratio >= 1.5, 8, np.where(recent_vol_ratio >= 1.2, 5, 0)))
+
+    mfi_state = np.select(
+        [(latest_mfi >= 40) & (latest_mfi <= 65) & (mfi_slope > 0), (latest_mfi < 35) & (mfi_slope > 0), (latest_mfi > 70) & (mfi_slope < 0)],
+        [0, 1, 2], default=3,
+    )
+    mfi_sub = np.array([15, 10, 3, 7])[mfi_state]
+
+    struct_sub = np.minimum(7 * is_above_ema20 + 5 * above_sma50 + 4 * is_compression + 4 * is_absorption, 20)
+    trig_sub = np.where(is_breakout_now, 10, 0)
+    score = np.minimum(flow_sub + vol_sub + mfi_sub + struct_sub + trig_sub, 100)
+
+    # Phase detection (Wyckoff-ish), in PHASES order
+    phase = np.select(
+        [
+            is_breakout_now & (flow_sub >= 24) & (latest_vol_ratio >= 1.5),
+            (flow_sub >= 20) & (latest_mfi >= 40) & (latest_mfi <= 65) & (is_above_ema20 | is_compression | is_absorption),
+            ((latest_mfi > 70) & (mfi_slope < 0)) | ((flow_sub <= 12) & ~is_above_ema20),
+        ],
+        [0, 1, 2], default=3,
+    )
+
+    return {
+        "score": score, "phase": phase, "mfi_state": mfi_state,
+        "above_ema20": is_above_ema20, "compression": is_compression, "absorption": is_absorption,
+        "breakout_now": is_breakout_now, "atr_pct": atr_pct,
+    }
+
+
+def _result(f: Dict[str, np.ndarray], j: int) -> dict:
+    """The calculate_bandarmology() dict for column j"""
+    phase = PHASES[f["phase"][j]]
+    setup, entry_note = PHASE_SETUPS[phase]
+    atr_now = float(f["atr"][j])
+    return {
+        "score": int(f["score"][j]),
+        "phase": phase,
+        "signals": {
+            "flow": {
+                "obv_slope": round(float(f["obv_slope"][j]), 4),
+                "adl_slope": round(float(f["adl_slope"][j]), 4),
+                "vpt_slope": round(float(f["vpt_slope"][j]), 4)
+            },
+            "volume": {
+                "latest_vol_ratio": round(float(f["latest_vol_ratio"][j]), 2),
+                "recent_vol_ratio": round(float(f["recent_vol_ratio"][j]), 2)
+            },
+            "mfi": {"value": round(float(f["mfi"][j]), 2), "trend": round(float(f["mfi_slope"][j]), 4), "state": MFI_STATES[f["mfi_state"][j]]},
+            "structure": {
+                "above_ema20": bool(f["above_ema20"][j]),
+                "above_sma50": bool(f["above_sma50"][j]),
+                "compression": bool(f["compression"][j]),
+                "absorption": bool(f["absorption"][j])
+            },
+            "trigger": {"breakout_now": bool(f["breakout_now"][j])},
+        },
+        "setup": {
+            "type": setup,
+            "guidance": entry_note
+        },
+        "risk": {
+            "atr": round(atr_now, 4),
+            "atr_pct": round(float(f["atr_pct"][j]) * 100, 2),
+            "suggested_stop_atr": 1.5,
+            "suggested_tp_atr": 3.0
+        },
+        "levels": {
+            "breakout": round(float(f["high_20"][j]), 4),
+            "support_ema20": round(float(f["ema20"][j]), 4),
+            "recent_low_20": round(float(f["low_20"][j]), 4),
+            "price": round(float(f["close"][j]), 4)
+        }
+    }
+
+
+def panel_bandarmology(panel: OHLCVPanel, symbols: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+    """calculate_bandarmology(panel.history(symbol)) for every symbol, computed in one pass"""
+    symbols = list(dict.fromkeys(symbols if symbols is not None else panel.symbols))
+    if not symbols:
+        return {}
+    aligned, lengths = right_align(panel, symbols)
+
+    results = {}
+    if aligned.shape[0] >= MIN_BARS:
+        fields = [aligned[:, :, OHLCV_FIELDS.index(name)] for name in OHLCV_FIELDS]
+        features = bandarmology_arrays(*fields, lengths=lengths)
+        volume_sum = np.nansum(fields[OHLCV_FIELDS.index("Volume")], axis=0)
+
+    for j, symbol in enumerate(symbols):
+        if lengths[j] < MIN_BARS:
+            results[symbol] = _empty_result("INSUFFICIENT_DATA", "Insufficient data for analysis")
+        elif volume_sum[j] == 0:
+            results[symbol] = _empty_result("INVALID_DATA", "Invalid or missing price/volume data")
+        else:
+            results[symbol] = _result(features, j)
+    return results
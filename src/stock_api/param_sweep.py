@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep: grid search of the screening thresholds on the backtest
+
+The day trade thresholds and the min_score defaults were picked by hand.
+The sweep backtests every combination of a grid (SWEEP_GRIDS, thousands of
+combinations) over years of bars and ranks them.
+
+Nothing is recomputed per combination: the thresholds only decide which of
+a strategy's candidate bars become trades, never a trade's levels or exit,
+so each strategy's candidates are simulated once (backtest.py) into a flat
+table holding every value its thresholds test and every candidate's
+result. A combination is then one boolean mask over that table plus the
+trade metrics of the selected rows. The grid is split into chunks and
+evaluated on SWEEP_WORKERS processes, each receiving the table once.
+
+The best combinations are saved as named modes (screen_modes.py), which
+the screen endpoints accept like mandiri and strict:
+  python src/stock_api/param_sweep.py --period 5y --save_modes 3
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backtest import ENTRY, STRATEGY_RULES, BacktestFeatures, simulate_arrays, split_settings, trade_metrics
+from screen_modes import save_modes
+
+logger = logging.getLogger("idx-stock-api")
+
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", str(os.cpu_count() or 1)))
+# Combinations per task sent to a worker
+SWEEP_CHUNK = 64
+
+# Threshold values tried per strategy; the grid is every combination
+SWEEP_GRIDS = {
+    "day_trade": {
+        "rsi_threshold": [60, 65, 70, 75, 78, 80, 85],
+        "macd_threshold": [-40, -30, -20, -10, -5, 0],
+        "volume_threshold": [0.3, 0.5, 0.8, 1.0, 1.2, 1.5, 2.0],
+        "risk_threshold": [2, 3, 4, 5, 6, 8],
+    },
+    "preopen": {
+        "min_score": list(range(40, 100, 5)),
+        "min_avg_volume": [250000, 500000, 1000000, 2000000, 5000000, 10000000],
+    },
+    "bpjs": {
+        "min_score": list(range(40, 100, 5)),
+        "min_avg_volume": [250000, 500000, 1000000, 2000000, 5000000, 10000000],
+    },
+    "bsjp": {
+        "min_score": list(range(40, 100, 5)),
+        "min_avg_volume": [250000, 500000, 1000000, 2000000, 5000000, 10000000],
+    },
+}
+
+# Metrics a sweep can rank by (higher is better)
+OBJECTIVES = ("expectancy_pct", "expectancy_r", "profit_factor", "total_return_pct", "hit_rate_pct")
+
+# Combinations with fewer trades are not ranked
+SWEEP_MIN_TRADES = 100
+
+
+def grid_combinations(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def candidate_table(f: BacktestFeatures, strategy: str, period: str, hold: int = 1, cost_pct: float = 0.0,
+                    **input_settings) -> Dict[str, Any]:
+    """
+    Every candidate bar of a strategy simulated once: the values its
+    thresholds test and the trade it makes, as flat arrays
+    """
+    inputs = STRATEGY_RULES[strategy][0]
+    base, values, stop, target = inputs(f, period, **input_settings)
+    trades = simulate_arrays(f, base, stop, target, entry=ENTRY[strategy], hold=hold, cost_pct=cost_pct)
+    rows, cols = trades["row"], trades["col"]
+    days, exit_day = np.unique(f.dates[trades["exit_row"], cols], return_inverse=True)
+    return {
+        "strategy": strategy,
+        "values": {name: value[rows, cols] for name, value in values.items()},
+        "return_pct": trades["return_pct"],
+        "r_multiple": trades["r_multiple"],
+        "outcome": trades["outcome"],
+        "exit_day": exit_day,
+        "days": len(days),
+    }
+
+
+def evaluate(table: Dict[str, Any], combinations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """trade_metrics() of each combination's trades"""
+    passes = STRATEGY_RULES[table["strategy"]][1]
+    results = []
+    for params in combinations:
+        selected = passes(table["values"], **params)
+        results.append({"params": params, **trade_metrics(
+            table["return_pct"][selected], table["r_multiple"][selected], table["outcome"][selected],
+            table["exit_day"][selected], days=table["days"],
+        )})
+    return results
+
+
+_worker_table: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(table: Dict[str, Any]):
+    global _worker_table
+    _worker_table = table
+
+
+def _evaluate_chunk(combinations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return evaluate(_worker_table, combinations)
+
+
+def sweep(f: BacktestFeatures, strategy: str, period: str, grid: Optional[Dict[str, Iterable[Any]]] = None,
+          hold: int = 1, cost_pct: float = 0.0, workers: int = SWEEP_WORKERS, **input_settings) -> List[Dict[str, Any]]:
+    """Metrics for every combination of the strategy's grid (SWEEP_GRIDS by default), in grid order"""
+    grid = grid or SWEEP_GRIDS[strategy]
+    table = candidate_table(f, strategy, period, hold=hold, cost_pct=cost_pct, **input_settings)
+    if "score" not in table["values"]:
+        # Without bandarmology min_score filters nothing
+        grid = {k: v for k, v in grid.items() if k != "min_score"}
+    combinations = grid_combinations(grid)
+    logger.info(f"Sweeping {len(combinations)} {strategy} combinations over {len(table['return_pct'])} candidate trades")
+
+    chunks = [combinations[i:i + SWEEP_CHUNK] for i in range(0, len(combinations), SWEEP_CHUNK)]
+    if workers <= 1 or len(chunks) <= 1:
+        return evaluate(table, combinations)
+    # spawn, as in screen_engine: callers may have live threads
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(table,)) as pool:
+        return [result for chunk in pool.map(_evaluate_chunk, chunks) for result in chunk]
+
+
+def rank(results: List[Dict[str, Any]], objective: str = "expectancy_pct", min_trades: int = SWEEP_MIN_TRADES) -> List[Dict[str, Any]]:
+    """Combinations with at least min_trades trades, best objective first (ties: more trades)"""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    eligible = [r for r in results if r["trades"] >= min_trades and r.get(objective) is not None]
+    return sorted(eligible, key=lambda r: (r[objective], r["trades"]), reverse=True)
+
+
+def winning_modes(ranked: List[Dict[str, Any]], count: int, prefix: str = "sweep", **context) -> Dict[str, Dict[str, Any]]:
+    """The top `count` combinations as screen modes named <prefix>1, <prefix>2, ..."""
+    created = datetime.now().isoformat(timespec="seconds")
+    return {
+        f"{prefix}{i + 1}": {
+            "settings": result["params"],
+            "backtest": {**context, **{k: v for k, v in result.items() if k != "params"}},
+            "created": created,
+        }
+        for i, result in enumerate(ranked[:count])
+    }
+
+
+def format_table(ranked: List[Dict[str, Any]], top: int = 20) -> str:
+    """Plain-text ranking of the best combinations"""
+    if not ranked:
+        return "No combination has enough trades"
+    names = list(ranked[0]["params"])
+    header = " ".join(f"{n:>16}" for n in names)
+    lines = [f"{'#':>3} {header} {'trades':>7} {'hit%':>6} {'exp%':>7} {'expR':>6} {'PF':>5} {'maxDD%':>7} {'total%':>8}"]
+    for i, r in enumerate(ranked[:top]):
+        params = " ".join(f"{r['params'][n]:>16}" for n in names)
+        lines.append(
+            f"{i + 1:>3} {params} {r['trades']:>7} {r['hit_rate_pct']:>6} {r['expectancy_pct']:>7} {r['expectancy_r']:>6} "
+            f"{r['profit_factor'] if r['profit_factor'] is not None else '-':>5} {r['max_drawdown_pct']:>7} {r['total_return_pct']:>8}"
+        )
+    return "\n".join(lines)
+
+
+# Settings the sweep holds fixed per strategy (the endpoint defaults)
+SWEEP_INPUTS = {
+    "preopen": {"enable_bandarmology": True},
+    "bpjs": {"enable_bandarmology": True},
+    "bsjp": {"enable_bandarmology": False},
+    "day_trade": {},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid search of the screening thresholds on the backtest")
+    parser.add_argument("--index", type=str, default=None, help="Stock index (LQ45, IDX30, BOTH; default BOTH)")
+    parser.add_argument("--period", type=str, default="5y", help="History to backtest over")
+    parser.add_argument("--strategies", type=str, default="day_trade,preopen,bpjs,bsjp", help="Comma-separated strategies")
+    parser.add_argument("--objective", type=str, default="expectancy_pct", choices=OBJECTIVES, help="Metric to rank by")
+    parser.add_argument("--min_trades", type=int, default=SWEEP_MIN_TRADES, help="Fewest trades for a combination to be ranked")
+    parser.add_argument("--hold", type=int, default=1, help="Bars each trade is held at most")
+    parser.add_argument("--cost_pct", type=float, default=0.0, help="Round-trip cost per trade in percent")
+    parser.add_argument("--workers", type=int, default=SWEEP_WORKERS, help="Worker processes")
+    parser.add_argument("--top", type=int, default=20, help="Rows of the ranked table to print")
+    parser.add_argument("--save_modes", type=int, default=0, help="Save the best N combinations per strategy as named modes")
+    parser.add_argument("--mode_prefix", type=str, default="sweep", help="Name prefix of saved modes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(message)s", stream=sys.stderr)
+    import stock_api_server as api
+    from market_data import load_panel
+
+    strategies = args.strategies.split(",")
+    unknown = [s for s in strategies if s not in SWEEP_GRIDS]
+    if unknown:
+        parser.error(f"Unknown strategies: {', '.join(unknown)}")
+
+    stocks = api.get_all_idx_stocks(args.index)
+    panel = load_panel(stocks, period=args.period)
+    f = BacktestFeatures(panel, stocks)
+    for strategy in strategies:
+        inputs = SWEEP_INPUTS[strategy]
+        period = api.plan_screen_period(strategy, **inputs)
+        results = sweep(f, strategy, period, hold=args.hold, cost_pct=args.cost_pct, workers=args.workers, **inputs)
+        ranked = rank(results, args.objective, args.min_trades)
+        print(f"\n{strategy}: {len(results)} combinations, {len(ranked)} with at least {args.min_trades} trades, by {args.objective}")
+        print(format_table(ranked, args.top))
+        if args.save_modes and ranked:
+            save_modes(strategy, winning_modes(
+                ranked, args.save_modes, args.mode_prefix, objective=args.objective, period=args.period,
+                universe=len(stocks), hold=args.hold, cost_pct=args.cost_pct, **split_settings(strategy, inputs)[0],
+            ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
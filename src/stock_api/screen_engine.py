@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Screen Engine: evaluate a screener across the universe on all CPU cores
+
+The per-symbol work in the screeners (ta indicators, bandarmology) is pure
+Python/pandas and holds the GIL, so threads do not help. For large universes
+evaluate_universe() copies the panel's OHLCV once into a shared-memory block,
+splits the symbols into contiguous shards and has a pool of worker processes
+rebuild each symbol's history straight from that block; only the shard
+bounds go out and only the candidates come back. Results are merged in
+symbol order, so the caller's sort-and-limit sees exactly the list the
+serial loop would have produced.
+
+Small universes (LQ45, IDX30) stay on the serial loop, where process
+overhead would outweigh the gain.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bar_store import OHLCV_FIELDS
+from market_data import OHLCVPanel
+
+logger = logging.getLogger("idx-stock-api")
+
+# Worker processes (0 disables the pool) and the universe size worth using it for
+SCREEN_WORKERS = int(os.getenv("SCREEN_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_SCREEN_MIN_SYMBOLS = int(os.getenv("PARALLEL_SCREEN_MIN_SYMBOLS", "150"))
+# Shards per worker; more shards balance uneven per-symbol cost
+SHARDS_PER_WORKER = 4
+
+Evaluator = Callable[..., Optional[Dict[str, Any]]]
+PerSymbol = Dict[str, Dict[str, Any]]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the API process has live threads, which fork would copy mid-lock
+            _pool = ProcessPoolExecutor(max_workers=SCREEN_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"Started screening pool with {SCREEN_WORKERS} workers")
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the worker processes (they are restarted on the next large screen)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def use_parallel(n_symbols: int) -> bool:
+    return SCREEN_WORKERS > 1 and n_symbols >= PARALLEL_SCREEN_MIN_SYMBOLS
+
+
+def _evaluate_one(evaluator: Evaluator, label: str, symbol: str, hist: pd.DataFrame, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    try:
+        return evaluator(symbol, hist, **params)
+    except Exception as e:
+        logger.warning(f"Error screening {symbol} for {label}: {e}")
+        return None
+
+
+def _evaluate_shard(evaluator: Evaluator, label: str, params: Dict[str, Any], shm_name: str, shape: Tuple[int, int, int],
+                    index_ns: np.ndarray, tz: Optional[str], index_name: Optional[str], symbols: List[Tuple[int, str]],
+                    per_symbol: PerSymbol) -> List[Dict[str, Any]]:
+    """Worker side: rebuild each symbol's history from shared memory and evaluate it"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        index = pd.DatetimeIndex(index_ns, tz="UTC").tz_convert(tz) if tz else pd.DatetimeIndex(index_ns)
+        index.name = index_name
+
+        close = OHLCV_FIELDS.index("Close")
+
+        candidates = []
+        for row, symbol in symbols:
+            traded = ~np.isnan(values[row, :, close])
+            # Boolean indexing copies, so the frame does not keep the buffer alive
+            hist = pd.DataFrame(values[row][traded], index=index[traded], columns=OHLCV_FIELDS)
+            candidate = _evaluate_one(evaluator, label, symbol, hist, {**params, **per_symbol.get(symbol, {})})
+            if candidate:
+                candidates.append(candidate)
+        del values  # release the buffer before closing
+        return candidates
+    finally:
+        shm.close()
+
+
+def _evaluate_serial(evaluator: Evaluator, label: str, panel: OHLCVPanel, symbols: List[str], params: Dict[str, Any],
+                     per_symbol: PerSymbol) -> List[Dict[str, Any]]:
+    candidates = []
+    for symbol in symbols:
+        try:
+            hist = panel.history(symbol)
+        except Exception as e:
+            logger.warning(f"Error screening {symbol} for {label}: {e}")
+            continue
+        candidate = _evaluate_one(evaluator, label, symbol, hist, {**params, **per_symbol.get(symbol, {})})
+        if candidate:
+            candidates.append(candidate)
+    return candidates
+
+
+def _evaluate_parallel(evaluator: Evaluator, label: str, panel: OHLCVPanel, symbols: List[str], params: Dict[str, Any],
+                       per_symbol: PerSymbol) -> List[Dict[str, Any]]:
+    frame = panel.frame.sort_index()
+    unique = list(dict.fromkeys(symbols))
+    columns = pd.MultiIndex.from_product([unique, OHLCV_FIELDS])
+    # (dates, symbols * fields) -> (symbols, dates, fields), one contiguous block per symbol
+    dense = frame.reindex(columns=columns).to_numpy(dtype=np.float64, na_value=np.nan)
+    dense = dense.reshape(len(frame.index), len(unique), len(OHLCV_FIELDS)).transpose(1, 0, 2)
+
+    index = pd.DatetimeIndex(frame.index)
+    tz = str(index.tz) if index.tz is not None else None
+    index_ns = index.asi8.copy()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(dense.nbytes, 1))
+    try:
+        shared = np.ndarray(dense.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = dense
+        del shared
+
+        row_of = {symbol: row for row, symbol in enumerate(unique)}
+        rows = [(row_of[symbol], symbol) for symbol in symbols]
+        shard_count = max(1, min(len(rows), SCREEN_WORKERS * SHARDS_PER_WORKER))
+        shard_size = -(-len(rows) // shard_count)
+        shards = [rows[i:i + shard_size] for i in range(0, len(rows), shard_size)]
+
+        pool = _get_pool()
+        futures = [
+            pool.submit(_evaluate_shard, evaluator, label, params, shm.name, dense.shape, index_ns, tz, index.name, shard,
+                        {symbol: per_symbol[symbol] for _, symbol in shard if symbol in per_symbol})
+            for shard in shards
+        ]
+        # Shards are contiguous, so concatenating in order keeps symbol order
+        candidates = []
+        for future in futures:
+            candidates.extend(future.result())
+        return candidates
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def evaluate_universe(evaluator: Evaluator, label: str, panel: OHLCVPanel, symbols: List[str],
+                      per_symbol: Optional[PerSymbol] = None, **params) -> List[Dict[str, Any]]:
+    """
+    Run evaluator(symbol, hist, **params) for every symbol and return the
+    non-empty candidates in symbol order. per_symbol adds keyword arguments
+    for individual symbols (e.g. a precomputed bandarmology result). Uses the
+    process pool for large universes and falls back to the serial loop if the
+    pool fails.
+    """
+    per_symbol = per_symbol or {}
+    if use_parallel(len(symbols)):
+        try:
+            return _evaluate_parallel(evaluator, label, panel, symbols, params, per_symbol)
+        except BrokenProcessPool as e:
+            logger.error(f"Screening pool crashed ({e}), restarting it and screening serially")
+            shutdown_pool()
+        except Exception as e:
+            logger.error(f"Parallel {label} screening failed ({e}), screening serially")
+    return _evaluate_serial(evaluator, label, panel, symbols, params, per_symbol)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Screen Jobs: whole-universe screens run in the background
+
+A screen over the full exchange can outlast an HTTP request. With
+"job": true a screen endpoint starts a job instead and answers at once with
+its ID; /api/screen/jobs/{id} reports its progress (symbols screened of the
+universe, candidates so far, ETA) and, once done, the response the
+endpoint would have returned.
+
+Jobs are keyed by the request (endpoint, parameters, resolved settings)
+and the date of the session whose bars they read (data_date()):
+- an identical request while the job runs attaches to it instead of
+  starting a second scan
+- an identical request after it finished gets its result straight away,
+  job or not, until the result expires: SCREEN_JOB_TTL after it finished,
+  or earlier when new bars can exist (screen_scheduler.valid_until())
+
+Jobs run on SCREEN_JOB_WORKERS threads and, like every screen, within the
+executor's "screen" limit (SCREEN_CONCURRENCY): a job waits as "queued"
+until a screen slot is free, so jobs never add scans on top of that cap.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from executor import group_slot
+from screen_scheduler import MARKET_OPEN, now_wib, valid_until
+
+logger = logging.getLogger("idx-stock-api")
+
+SCREEN_JOB_WORKERS = int(os.getenv("SCREEN_JOB_WORKERS", "2"))
+# Seconds a finished job's result is kept (at most until new bars can exist)
+SCREEN_JOB_TTL = int(os.getenv("SCREEN_JOB_TTL", "3600"))
+# Symbols per progress step (at least PARALLEL_SCREEN_MIN_SYMBOLS keeps the process pool in use)
+SCREEN_JOB_STEP = int(os.getenv("SCREEN_JOB_STEP", "200"))
+
+# A job's work: fn(emit, cancelled) -> the endpoint's response
+JobFn = Callable[[Callable[[Dict[str, Any]], None], threading.Event], Dict[str, Any]]
+
+
+def data_date(now: pd.Timestamp) -> str:
+    """The session whose bars a screen run at now reads: today once it opened, else the last weekday before"""
+    day = now.normalize()
+    if not (day.weekday() < 5 and (now.hour, now.minute) >= MARKET_OPEN):
+        day -= pd.Timedelta(days=1)
+        while day.weekday() >= 5:
+            day -= pd.Timedelta(days=1)
+    return day.date().isoformat()
+
+
+class ScreenJobs:
+    def __init__(self, workers: int = SCREEN_JOB_WORKERS, ttl: int = SCREEN_JOB_TTL):
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="screen-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[str, str] = {}
+
+    @staticmethod
+    def _key(kind: str, params: Dict[str, Any], now: pd.Timestamp) -> str:
+        return json.dumps([kind, params, data_date(now)], sort_keys=True, default=str)
+
+    def _purge(self, now: pd.Timestamp):
+        for job_id, job in list(self._jobs.items()):
+            if job["expires"] is not None and job["expires"] <= now:
+                del self._jobs[job_id]
+                if self._by_key.get(job["key"]) == job_id:
+                    del self._by_key[job["key"]]
+
+    def _live(self, key: str, now: pd.Timestamp) -> Optional[Dict[str, Any]]:
+        """The job for key that is queued, running or done (not failed or cancelled)"""
+        self._purge(now)
+        job = self._jobs.get(self._by_key.get(key, ""))
+        return job if job is not None and job["status"] in ("queued", "running", "done") else None
+
+    def submit(self, kind: str, params: Dict[str, Any], fn: JobFn) -> Tuple[Dict[str, Any], str]:
+        """
+        (job view, how): the job for this request, "started" now, "attached"
+        to an identical running one or "cached" from one that finished
+        """
+        now = now_wib()
+        key = self._key(kind, params, now)
+        with self._lock:
+            job = self._live(key, now)
+            if job is not None:
+                return self._view(job, job["status"] == "done"), "cached" if job["status"] == "done" else "attached"
+            job = {
+                "job_id": uuid.uuid4().hex[:12],
+                "kind": kind,
+                "params": params,
+                "data_date": data_date(now),
+                "status": "queued",
+                "progress": None,
+                "created": now,
+                "started": None,
+                "finished": None,
+                "expires": None,
+                "error": None,
+                "result": None,
+                "key": key,
+                "cancelled": threading.Event(),
+            }
+            self._jobs[job["job_id"]] = job
+            self._by_key[key] = job["job_id"]
+        self._pool.submit(self._run, job, fn)
+        logger.info(f"Started {kind} job {job['job_id']}")
+        return self._view(job), "started"
+
+    def _run(self, job: Dict[str, Any], fn: JobFn):
+        # Queued until one of the screen slots endpoints also take is free
+        with group_slot("screen"):
+            self._run_slotted(job, fn)
+
+    def _run_slotted(self, job: Dict[str, Any], fn: JobFn):
+        if job["cancelled"].is_set():
+            self._finish(job, "cancelled")
+            return
+        with self._lock:
+            job["status"], job["started"] = "running", now_wib()
+
+        def emit(event: Dict[str, Any]):
+            if event["event"] == "progress":
+                job["progress"] = {k: v for k, v in event.items() if k != "event"}
+
+        try:
+            result = fn(emit, job["cancelled"])
+        except Exception as e:
+            logger.error(f"{job['kind']} job {job['job_id']} failed: {e}")
+            self._finish(job, "failed", error=str(e))
+            return
+        self._finish(job, "cancelled" if job["cancelled"].is_set() else "done", result=result)
+
+    def _finish(self, job: Dict[str, Any], status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        now = now_wib()
+        expires = now + pd.Timedelta(seconds=self.ttl)
+        if status == "done":
+            expires = min(expires, valid_until(job["started"] or now))
+        with self._lock:
+            job.update(status=status, finished=now, expires=expires, result=result, error=error)
+        logger.info(f"{job['kind']} job {job['job_id']} {status}")
+
+    def cached(self, kind: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The result of a finished identical job, if it has not expired"""
+        now = now_wib()
+        with self._lock:
+            job = self._live(self._key(kind, params, now), now)
+            return job["result"] if job is not None and job["status"] == "done" else None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._purge(now_wib())
+            job = self._jobs.get(job_id)
+            return self._view(job, with_result=True) if job is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._purge(now_wib())
+            return [self._view(job) for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Ask a queued or running job to stop (it ends at its next step); None when unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] in ("queued", "running"):
+                job["cancelled"].set()
+                # Identical requests start afresh instead of attaching to it
+                if self._by_key.get(job["key"]) == job_id:
+                    del self._by_key[job["key"]]
+            return self._view(job)
+
+    def _view(self, job: Dict[str, Any], with_result: bool = False) -> Dict[str, Any]:
+        view = {k: job[k] for k in ("job_id", "kind", "params", "data_date", "status", "progress", "error")}
+        for k in ("created", "started", "finished", "expires"):
+            view[k] = job[k].isoformat() if job[k] is not None else None
+        if with_result and job["status"] == "done":
+            view["result"] = job["result"]
+        return view
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "failed", "cancelled")}
+
+    def shutdown(self):
+        with self._lock:
+            for job in self._jobs.values():
+                job["cancelled"].set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared job table used by the screen endpoints
+screen_jobs = ScreenJobs()
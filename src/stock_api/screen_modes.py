@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Screen Modes: named threshold sets for the screeners
+
+The day trade screen has always had two named modes, mandiri and strict.
+Modes found by the parameter sweep (param_sweep.py) are saved next to them
+in SCREEN_MODES_FILE, for the day trade thresholds and for the PRE-OPEN,
+BPJS and BSJP min_score/min_avg_volume, and can be requested by name like
+the built-in ones. The file is re-read when it changes, so a sweep's modes
+are served without restarting the API.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("idx-stock-api")
+
+SCREEN_MODES_FILE = os.getenv("SCREEN_MODES_FILE", "data/screen_modes.json")
+
+# Built-in modes; saved modes cannot replace these
+BUILTIN_MODES: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "day_trade": {
+        "mandiri": {
+            "rsi_threshold": 78,  # More lenient
+            "macd_threshold": -20,  # More lenient
+            "volume_threshold": 0.5,  # More lenient
+            "risk_threshold": 6,  # More lenient
+        },
+        "strict": {"rsi_threshold": 75, "macd_threshold": -10, "volume_threshold": 0.8, "risk_threshold": 5},
+    },
+    "preopen": {},
+    "bpjs": {},
+    "bsjp": {},
+}
+
+_lock = threading.Lock()
+_loaded: Dict[str, Any] = {"mtime": None, "modes": {}}
+
+
+def _saved_modes(path: str = SCREEN_MODES_FILE) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """strategy -> mode -> {"settings", "backtest", "created"} from the modes file ({} when missing)"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    with _lock:
+        if _loaded["mtime"] != (path, mtime):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    _loaded["modes"] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read screen modes from {path}: {e}")
+                _loaded["modes"] = {}
+            _loaded["mtime"] = (path, mtime)
+        return _loaded["modes"]
+
+
+def mode_settings(strategy: str, name: str) -> Dict[str, Any]:
+    """A named mode's screener settings; KeyError when the strategy has no such mode"""
+    if name in BUILTIN_MODES.get(strategy, {}):
+        return dict(BUILTIN_MODES[strategy][name])
+    return dict(_saved_modes().get(strategy, {})[name]["settings"])
+
+
+def list_modes() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Every mode per strategy, with the backtest a saved mode was chosen on"""
+    saved = _saved_modes()
+    modes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for strategy, builtin in BUILTIN_MODES.items():
+        modes[strategy] = {name: {"settings": settings, "source": "builtin"} for name, settings in builtin.items()}
+        for name, mode in saved.get(strategy, {}).items():
+            if name not in builtin:
+                modes[strategy][name] = {**mode, "source": "sweep"}
+    return modes
+
+
+def save_modes(strategy: str, modes: Dict[str, Dict[str, Any]], path: Optional[str] = None):
+    """
+    Add or replace saved modes for a strategy (name -> {"settings",
+    "backtest", "created"}); other strategies' modes are kept
+    """
+    path = path or SCREEN_MODES_FILE
+    clashes = [name for name in modes if name in BUILTIN_MODES.get(strategy, {})]
+    if clashes:
+        raise ValueError(f"Cannot replace built-in {strategy} modes: {', '.join(clashes)}")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    saved.setdefault(strategy, {}).update(modes)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(path + suffix, "w", encoding="utf-8") as f:
+        json.dump(saved, f, indent=2)
+    os.replace(path + suffix, path)
+    logger.info(f"Saved {len(modes)} {strategy} modes to {path}")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Screen Scheduler: materialize screen results before they are needed
+
+Pre-open orders go in between 08:45 and 08:58 WIB, the worst time to be
+waiting on Yahoo. ScreenScheduler runs a refresh job at fixed WIB times on
+weekdays (by default after the close and before the pre-open) and keeps its
+result as a snapshot with an as-of timestamp. The server's job refreshes the
+bar store, the feature store and every strategy's candidates, and the
+screening endpoints answer from the snapshot when it covers the request.
+
+A snapshot is served until new bars can exist: outside trading hours until
+the next session opens; a snapshot taken during a session for BAR_STORE_TTL,
+the interval at which the bar store re-checks the tail anyway.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from bar_store import BAR_STORE_TTL
+
+logger = logging.getLogger("idx-stock-api")
+
+# Comma-separated WIB times (HH:MM) to refresh on weekdays; empty disables the scheduler
+SCREEN_SCHEDULE = os.getenv("SCREEN_SCHEDULE", "16:15,08:15")
+
+WIB = "Asia/Jakarta"
+MARKET_OPEN = (9, 0)
+MARKET_CLOSE = (16, 0)
+
+
+def now_wib() -> pd.Timestamp:
+    return pd.Timestamp.now(tz=WIB)
+
+
+def parse_schedule(spec: str) -> List[Tuple[int, int]]:
+    """[(hour, minute), ...] from "HH:MM,HH:MM" """
+    times = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        hour, minute = (int(x) for x in item.split(":"))
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"Invalid schedule time: {item}")
+        times.append((hour, minute))
+    return sorted(set(times))
+
+
+def next_run(now: pd.Timestamp, times: List[Tuple[int, int]]) -> Optional[pd.Timestamp]:
+    """First weekday time from the schedule strictly after now"""
+    if not times:
+        return None
+    day = now.normalize()
+    while True:
+        if day.weekday() < 5:
+            for hour, minute in times:
+                at = day + pd.Timedelta(hours=hour, minutes=minute)
+                if at > now:
+                    return at
+        day += pd.Timedelta(days=1)
+
+
+def valid_until(as_of: pd.Timestamp, session_ttl: int = BAR_STORE_TTL) -> pd.Timestamp:
+    """When a snapshot taken at as_of may be missing bars"""
+    clock = (as_of.hour, as_of.minute)
+    if as_of.weekday() < 5 and MARKET_OPEN <= clock < MARKET_CLOSE:
+        return as_of + pd.Timedelta(seconds=session_ttl)
+    day = as_of.normalize()
+    if as_of.weekday() >= 5 or clock >= MARKET_CLOSE:
+        day += pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day += pd.Timedelta(days=1)
+    return day + pd.Timedelta(hours=MARKET_OPEN[0], minutes=MARKET_OPEN[1])
+
+
+class ScreenScheduler:
+    def __init__(self, job: Callable[[], Any], schedule: str = SCREEN_SCHEDULE, session_ttl: int = BAR_STORE_TTL):
+        self.job = job
+        self.times = parse_schedule(schedule)
+        self.session_ttl = session_ttl
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._running = threading.Lock()  # one refresh at a time
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        """Run the job at the scheduled times in a background thread"""
+        if not self.times or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="screen-scheduler")
+        self._thread.start()
+        logger.info(f"Screen scheduler started, next refresh at {next_run(now_wib(), self.times)}")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = now_wib()
+            if self._stop.wait((next_run(now, self.times) - now).total_seconds()):
+                break
+            self.refresh()
+
+    def refresh(self) -> bool:
+        """Run the job now; False if it failed or a refresh was already running"""
+        if not self._running.acquire(blocking=False):
+            return False
+        try:
+            as_of = now_wib()
+            started = time.time()
+            try:
+                data = self.job()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Scheduled screen refresh failed: {e}")
+                return False
+            self.last_duration = time.time() - started
+            self.last_error = None
+            with self._lock:
+                self._snapshot = {"as_of": as_of, "valid_until": valid_until(as_of, self.session_ttl), "data": data}
+            logger.info(f"Materialized screen snapshot as of {as_of.isoformat()} in {self.last_duration:.1f}s")
+            return True
+        finally:
+            self._running.release()
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """The latest snapshot ({"as_of", "valid_until", "data"}) while it is current, else None"""
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None or now_wib() >= snapshot["valid_until"]:
+            return None
+        return snapshot
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = self._snapshot
+        upcoming = next_run(now_wib(), self.times)
+        return {
+            "schedule": [f"{h:02d}:{m:02d}" for h, m in self.times],
+            "next_run": upcoming.isoformat() if upcoming is not None else None,
+            "running": self._running.locked(),
+            "as_of": snapshot["as_of"].isoformat() if snapshot else None,
+            "valid_until": snapshot["valid_until"].isoformat() if snapshot else None,
+            "current": self.snapshot() is not None,
+            "last_duration_s": round(self.last_duration, 1) if self.last_duration is not None else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Screen Stream: results of a long screen as they are found
+
+A screen over the whole exchange answers only once every symbol has been
+loaded and evaluated, long enough for the MCP client (120 s) or a browser
+to give up. A streamed screen works through the universe in steps, a few
+symbols first so the first candidates arrive within a second, then growing
+to full download batches, and sends an event per candidate, a progress
+event after each step and a final ranked summary.
+
+The blocking screen runs in the executor's pool and hands its events to
+the response through a queue. When the client disconnects, the screen
+stops after the step it is on.
+
+Events go out as NDJSON (one JSON object per line), or as server-sent
+events when the request accepts text/event-stream.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from executor import run_blocking
+from market_data import DOWNLOAD_CHUNK_SIZE
+
+logger = logging.getLogger("idx-stock-api")
+
+# Symbols in the first step; each step doubles up to a download batch
+STREAM_FIRST_STEP = int(os.getenv("STREAM_FIRST_STEP", "8"))
+
+Emit = Callable[[Dict[str, Any]], None]
+
+
+def steps(symbols: List[str], first: int = STREAM_FIRST_STEP, largest: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[List[str]]:
+    """symbols in consecutive slices of first, 2*first, ... up to largest"""
+    size, start = max(1, first), 0
+    while start < len(symbols):
+        yield symbols[start:start + size]
+        start += size
+        size = min(size * 2, max(largest, 1))
+
+
+async def stream_events(group: str, fn: Callable[..., Any], *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run fn(*args, emit=..., cancelled=..., **kwargs) under run_blocking()
+    and yield every event it emits as it emits it. fn's return value is
+    yielded last as {"event": "result", "result": ...}; an exception ends
+    the stream with {"event": "error", "detail": ...}. Closing the iterator
+    (the client went away) sets cancelled for fn to stop at.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def emit(event: Dict[str, Any]):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def run():
+        try:
+            result = await run_blocking(group, fn, *args, emit=emit, cancelled=cancelled, **kwargs)
+            queue.put_nowait({"event": "result", "result": result})
+        except Exception as e:
+            logger.error(f"Streamed {fn.__name__} failed: {e}")
+            queue.put_nowait({"event": "error", "detail": str(e)})
+
+    task = asyncio.ensure_future(run())
+    try:
+        while True:
+            event = await queue.get()
+            yield event
+            if event["event"] in ("result", "error"):
+                return
+    finally:
+        if not task.done():
+            cancelled.set()
+            logger.info(f"Stream closed early, cancelling {fn.__name__}")
+
+
+def encode(event: Dict[str, Any], sse: bool) -> str:
+    data = json.dumps(jsonable_encoder(event), default=str)
+    return f"event: {event['event']}\ndata: {data}\n\n" if sse else data + "\n"
+
+
+def stream_response(request: Request, events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """events as NDJSON, or as server-sent events when the client accepts them"""
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def body():
+        async for event in events:
+            yield encode(event, sse)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
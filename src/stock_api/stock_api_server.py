@@ -9,8 +9,9 @@ import logging
 from datetime import datetime
 import subprocess
 import sys
+import threading
 import time
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Tuple
 from pathlib import Path
 
 from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Header
@@ -21,17 +22,25 @@ import uvicorn
 from typing import Optional as OptionalType
 
 # Import all dependencies
-import yfinance as yf
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import MACD, SMAIndicator, EMAIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import (
-    OnBalanceVolumeIndicator,
-    AccDistIndexIndicator,
-    MFIIndicator,
-    VolumePriceTrendIndicator
-)
+
+from bar_store import trim_to_period
+from data_provider import get_provider
+from market_data import DOWNLOAD_CHUNK_SIZE, OHLCVPanel, ensure_idx_ticker, load_history, load_panel
+from info_cache import info_cache
+from history_planner import plan_period
+from executor import run_blocking
+from screen_engine import evaluate_universe, shutdown_pool
+from panel_indicators import PHASE_SETUPS, panel_bandarmology
+from feature_store import feature_store, features
+from streaming_indicators import STREAMING_INDICATORS, IndicatorSet, indicator_store
+from screen_scheduler import ScreenScheduler, now_wib
+from global_markets import global_markets
+from backtest import run_backtest
+from screen_modes import list_modes, mode_settings
+from symbol_master import SECTOR_INDICES, symbol_master
+from screen_stream import STREAM_FIRST_STEP, Emit, stream_events, stream_response, steps
+from screen_jobs import SCREEN_JOB_STEP, screen_jobs
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -202,14 +211,6 @@ def run_pipeline(params: GetNewsRequest):
 # HELPER FUNCTIONS
 # ============================================================================
 
-def ensure_idx_ticker(symbol: str) -> str:
-    """Ensure ticker has .JK suffix for Indonesian stocks"""
-    symbol = symbol.upper().strip()
-    if not symbol.endswith(".JK"):
-        symbol = f"{symbol}.JK"
-    return symbol
-
-
 def _slope(series: pd.Series, lookback: int = 10) -> float:
     """Simple slope (last - first) / abs(first) over a window; robust to const."""
     if len(series) < lookback:
@@ -219,11 +220,50 @@ def _slope(series: pd.Series, lookback: int = 10) -> float:
     return (b - a) / denom
 
 
+def calculate_technical_indicators(history: pd.DataFrame, symbol: Optional[str] = None) -> Dict[str, Any]:
+    """Latest RSI, MACD, moving averages and Bollinger Bands for an OHLCV frame"""
+    close = history['Close']
+    f = features(history, symbol)
+
+    rsi = f.rsi(14)
+    macd, macd_signal, macd_diff = f.macd()
+    sma_20 = f.sma(20)
+    sma_50 = f.sma(50)
+    ema_12 = f.ema(12)
+    bb_upper, bb_middle, bb_lower = f.bollinger(20, 2)
+
+    latest_price = float(close.iloc[-1])
+
+    return {
+        "current_price": latest_price,
+        "rsi": float(rsi.iloc[-1]) if not rsi.empty else None,
+        "macd": {
+            "macd": float(macd.iloc[-1]),
+            "signal": float(macd_signal.iloc[-1]),
+            "histogram": float(macd_diff.iloc[-1]),
+        },
+        "moving_averages": {
+            "sma_20": float(sma_20.iloc[-1]),
+            "sma_50": float(sma_50.iloc[-1]),
+            "ema_12": float(ema_12.iloc[-1]),
+        },
+        "bollinger_bands": {
+            "upper": float(bb_upper.iloc[-1]),
+            "middle": float(bb_middle.iloc[-1]),
+            "lower": float(bb_lower.iloc[-1]),
+        },
+    }
+
+
 # ============================================================================
 # BANDARMOLOGY (Smart-Money) LOGIC
 # ============================================================================
 
-def calculate_bandarmology(hist: pd.DataFrame) -> dict:
+def _bandarmology_unavailable(phase: str, guidance: str) -> dict:
+    return {"score": 0, "phase": phase, "signals": {}, "levels": {}, "setup": {"type": "WAIT", "guidance": guidance}, "risk": {"atr": 0, "atr_pct": 0, "suggested_stop_atr": 1.5, "suggested_tp_atr": 3.0}}
+
+
+def calculate_bandarmology(hist: pd.DataFrame, symbol: Optional[str] = None) -> dict:
     """
     Bandarmology-style proxy using public Yahoo Finance OHLCV:
     - OBV / ADL / VPT trend (smart-money flow)
@@ -234,31 +274,32 @@ def calculate_bandarmology(hist: pd.DataFrame) -> dict:
     Returns a 0-100 score, detected phase (Wyckoff-like), and actionable levels.
     """
     if hist.empty or len(hist) < 40:
-        return {"score": 0, "phase": "INSUFFICIENT_DATA", "signals": {}, "levels": {}, "setup": {"type": "WAIT", "guidance": "Insufficient data for analysis"}, "risk": {"atr": 0, "atr_pct": 0, "suggested_stop_atr": 1.5, "suggested_tp_atr": 3.0}}
+        return _bandarmology_unavailable("INSUFFICIENT_DATA", "Insufficient data for analysis")
 
     df = hist.copy()
 
     # Validate data quality
     if df["Volume"].sum() == 0 or df["Close"].isna().all():
-        return {"score": 0, "phase": "INVALID_DATA", "signals": {}, "levels": {}, "setup": {"type": "WAIT", "guidance": "Invalid or missing price/volume data"}, "risk": {"atr": 0, "atr_pct": 0, "suggested_stop_atr": 1.5, "suggested_tp_atr": 3.0}}
+        return _bandarmology_unavailable("INVALID_DATA", "Invalid or missing price/volume data")
 
     # Indicators with error handling
+    f = features(df, symbol)
     try:
-        obv = OnBalanceVolumeIndicator(close=df["Close"], volume=df["Volume"]).on_balance_volume()
-        adl = AccDistIndexIndicator(high=df["High"], low=df["Low"], close=df["Close"], volume=df["Volume"]).acc_dist_index()
-        vpt = VolumePriceTrendIndicator(close=df["Close"], volume=df["Volume"]).volume_price_trend()
-        mfi = MFIIndicator(high=df["High"], low=df["Low"], close=df["Close"], volume=df["Volume"], window=14).money_flow_index()
-        atr14 = AverageTrueRange(high=df["High"], low=df["Low"], close=df["Close"], window=14).average_true_range()
+        obv = f.obv()
+        adl = f.adl()
+        vpt = f.vpt()
+        mfi = f.mfi(14)
+        atr14 = f.atr(14)
     except Exception as e:
         logger.error(f"Error calculating bandarmology indicators: {e}")
-        return {"score": 0, "phase": "CALCULATION_ERROR", "signals": {}, "levels": {}, "setup": {"type": "WAIT", "guidance": f"Error calculating indicators: {str(e)}"}, "risk": {"atr": 0, "atr_pct": 0, "suggested_stop_atr": 1.5, "suggested_tp_atr": 3.0}}
+        return _bandarmology_unavailable("CALCULATION_ERROR", f"Error calculating indicators: {str(e)}")
 
     # Moving averages for trend context
-    ema20 = EMAIndicator(close=df["Close"], window=20).ema_indicator()
-    sma50 = SMAIndicator(close=df["Close"], window=50).sma_indicator() if len(df) >= 50 else None
+    ema20 = f.ema(20)
+    sma50 = f.sma(50) if len(df) >= 50 else None
 
     # Volume stats with safeguards against division by zero
-    vol_avg20 = df["Volume"].rolling(20).mean()
+    vol_avg20 = f.volume_avg(20)
     # Add epsilon to avoid division by zero
     vol_avg20_safe = vol_avg20.replace(0, 1e-6)
     vol_ratio = df["Volume"] / vol_avg20_safe
@@ -276,8 +317,8 @@ def calculate_bandarmology(hist: pd.DataFrame) -> dict:
 
     # Price/volatility context with robust handling
     close = float(df["Close"].iloc[-1])
-    high_20 = float(df["High"].rolling(20).max().iloc[-1])
-    low_20  = float(df["Low"].rolling(20).min().iloc[-1])
+    high_20 = float(f.rolling_high(20).iloc[-1])
+    low_20  = float(f.rolling_low(20).iloc[-1])
     ema20_now = float(ema20.iloc[-1]) if not pd.isna(ema20.iloc[-1]) else close
     sma50_now = float(sma50.iloc[-1]) if sma50 is not None and not pd.isna(sma50.iloc[-1]) else None
 
@@ -295,14 +336,36 @@ def calculate_bandarmology(hist: pd.DataFrame) -> dict:
     # Prevent division by zero in body ratio calculation
     rng_safe = rng.replace(0, 1e-6)
     body_ratio = (body / rng_safe).fillna(0)
+    latest_body_ratio = float(body_ratio.iloc[-1]) if not pd.isna(body_ratio.iloc[-1]) else 0.5
+    last_range = float(rng.iloc[-1]) if not pd.isna(rng.iloc[-1]) else 0.0
+
+    return score_bandarmology(
+        close=close, high_20=high_20, low_20=low_20, ema20_now=ema20_now, sma50_now=sma50_now, atr_now=atr_now,
+        latest_vol_ratio=latest_vol_ratio, recent_vol_ratio=recent_vol_ratio,
+        obv_slope=obv_slope, adl_slope=adl_slope, vpt_slope=vpt_slope,
+        latest_mfi=latest_mfi, mfi_slope=mfi_slope, latest_body_ratio=latest_body_ratio, last_range=last_range,
+    )
+
+
+def bandarmology_from_state(state: IndicatorSet) -> dict:
+    """calculate_bandarmology() from streaming indicator state instead of a bar history"""
+    if state.count < 40:
+        return _bandarmology_unavailable("INSUFFICIENT_DATA", "Insufficient data for analysis")
+    if not state.volume_seen:
+        return _bandarmology_unavailable("INVALID_DATA", "Invalid or missing price/volume data")
+    return score_bandarmology(**state.bandarmology_inputs())
+
 
+def score_bandarmology(close: float, high_20: float, low_20: float, ema20_now: float, sma50_now: Optional[float],
+                       atr_now: float, latest_vol_ratio: float, recent_vol_ratio: float,
+                       obv_slope: float, adl_slope: float, vpt_slope: float, latest_mfi: float, mfi_slope: float,
+                       latest_body_ratio: float, last_range: float) -> dict:
+    """Score, phase, setup and levels from the latest-bar bandarmology quantities"""
     # Absorption: small body relative to range + high volume
-    latest_body_ratio = float(body_ratio.iloc[-1]) if not pd.isna(body_ratio.iloc[-1]) else 0.5
     is_absorption = (latest_body_ratio <= 0.3) and (latest_vol_ratio >= 1.5)
 
     # ATR as percentage of price
     atr_pct = atr_now / close if close > 0 else 0.0
-    last_range = float(rng.iloc[-1]) if not pd.isna(rng.iloc[-1]) else 0.0
 
     # Compression: narrow range compared to ATR
     is_compression = (last_range <= 0.6 * atr_now) if atr_now > 0 else False
@@ -405,18 +468,7 @@ def calculate_bandarmology(hist: pd.DataFrame) -> dict:
     takeprofit_buffer = 3.0 * atr_now  # 2R target if SL = 1.5 ATR → TP ≈ 3 ATR
 
     # Best-practice entry suggestions
-    if phase == "ACCUMULATION":
-        setup = "BUY_STOP_BREAKOUT"
-        entry_note = "Place buy-stop slightly above 20-day high when volume>1.5x avg; confirmation if OBV keeps rising."
-    elif phase == "MARKUP":
-        setup = "BUY_PULLBACK_TO_EMA20"
-        entry_note = "Enter on shallow pullback to EMA20 with shrinking volume; avoid if OBV/ADL roll over."
-    elif phase == "DISTRIBUTION":
-        setup = "AVOID_OR_TAKE_PROFIT"
-        entry_note = "Weak flow / distribution risk; avoid new longs or trail stops tighter."
-    else:
-        setup = "WAIT"
-        entry_note = "Wait for compression + volume thrust and OBV turn."
+    setup, entry_note = PHASE_SETUPS[phase]
 
     return {
         "score": score,
@@ -446,45 +498,30 @@ def format_mandiri_style_report(symbol: str, period: str = "6mo") -> str:
     Generate Mandiri Sekuritas-style analysis report
     Combines technical indicators, bandarmology, and price data into narrative format
     """
-    ticker = ensure_idx_ticker(symbol)
-    stock = yf.Ticker(ticker)
-
     # Get all data
-    hist = stock.history(period=period)
+    hist = load_history(symbol, period=period)
     if hist.empty or len(hist) < 50:
         return f"Insufficient data for {symbol}"
 
-    info = stock.info
-
     # Calculate technical indicators
+    f = features(hist, symbol)
     # RSI
-    rsi_indicator = RSIIndicator(close=hist['Close'], window=14)
-    hist['RSI'] = rsi_indicator.rsi()
+    hist['RSI'] = f.rsi(14)
 
     # MACD
-    macd_indicator = MACD(close=hist['Close'])
-    hist['MACD'] = macd_indicator.macd()
-    hist['MACD_signal'] = macd_indicator.macd_signal()
-    hist['MACD_hist'] = macd_indicator.macd_diff()
+    hist['MACD'], hist['MACD_signal'], hist['MACD_hist'] = f.macd()
 
     # Moving Averages
-    sma_20 = SMAIndicator(close=hist['Close'], window=20)
-    sma_50 = SMAIndicator(close=hist['Close'], window=50)
-    sma_200 = SMAIndicator(close=hist['Close'], window=200) if len(hist) >= 200 else None
-    ema_20 = EMAIndicator(close=hist['Close'], window=20)
-    hist['SMA_20'] = sma_20.sma_indicator()
-    hist['SMA_50'] = sma_50.sma_indicator()
-    hist['SMA_200'] = sma_200.sma_indicator() if sma_200 is not None else None
-    hist['EMA_20'] = ema_20.ema_indicator()
+    hist['SMA_20'] = f.sma(20)
+    hist['SMA_50'] = f.sma(50)
+    hist['SMA_200'] = f.sma(200) if len(hist) >= 200 else None
+    hist['EMA_20'] = f.ema(20)
 
     # Bollinger Bands
-    bb_indicator = BollingerBands(close=hist['Close'], window=20, window_dev=2)
-    hist['BB_upper'] = bb_indicator.bollinger_hband()
-    hist['BB_middle'] = bb_indicator.bollinger_mavg()
-    hist['BB_lower'] = bb_indicator.bollinger_lband()
+    hist['BB_upper'], hist['BB_middle'], hist['BB_lower'] = f.bollinger(20, 2)
 
     # Get Bandarmology
-    band = calculate_bandarmology(hist)
+    band = calculate_bandarmology(hist, symbol)
 
     # Latest values
     latest = hist.iloc[-1]
@@ -649,95 +686,11 @@ def check_global_markets() -> Dict[str, Any]:
     - US Market (S&P500)
     - Key Asian markets (Nikkei, Hang Seng)
     - Commodities (Coal, Nickel via proxies)
+    - US Dollar Index
+    Served from the shared snapshot (global_markets.py), which fetches every
+    market in one batch and keeps each move until its market trades again.
     """
-    result = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M WIB"),
-        "us_market": {},
-        "asia_markets": {},
-        "commodities": {},
-        "overall_sentiment": "NEUTRAL"
-    }
-
-    try:
-        # US Market - S&P500
-        sp500 = yf.Ticker("^GSPC")
-        sp500_hist = sp500.history(period="5d")
-        if not sp500_hist.empty and len(sp500_hist) >= 2:
-            latest = sp500_hist.iloc[-1]['Close']
-            prev = sp500_hist.iloc[-2]['Close']
-            change_pct = ((latest - prev) / prev) * 100
-
-            result["us_market"] = {
-                "index": "S&P500",
-                "change_pct": round(change_pct, 2),
-                "sentiment": "POSITIVE" if change_pct > 0.5 else "NEGATIVE" if change_pct < -0.5 else "NEUTRAL"
-            }
-    except Exception as e:
-        logger.warning(f"Failed to fetch US market data: {e}")
-        result["us_market"] = {"error": "Data unavailable"}
-
-    try:
-        # Nikkei 225
-        nikkei = yf.Ticker("^N225")
-        nikkei_hist = nikkei.history(period="5d")
-        if not nikkei_hist.empty and len(nikkei_hist) >= 2:
-            latest = nikkei_hist.iloc[-1]['Close']
-            prev = nikkei_hist.iloc[-2]['Close']
-            change_pct = ((latest - prev) / prev) * 100
-
-            result["asia_markets"]["nikkei"] = {
-                "change_pct": round(change_pct, 2),
-                "sentiment": "POSITIVE" if change_pct > 0 else "NEGATIVE"
-            }
-    except Exception as e:
-        logger.warning(f"Failed to fetch Nikkei data: {e}")
-
-    try:
-        # Coal proxy - ARCH Coal or use generic commodity index
-        # For simplicity, we'll use broad commodity ETF as proxy
-        commodity = yf.Ticker("DBC")  # Invesco DB Commodity Index
-        comm_hist = commodity.history(period="5d")
-        if not comm_hist.empty and len(comm_hist) >= 2:
-            latest = comm_hist.iloc[-1]['Close']
-            prev = comm_hist.iloc[-2]['Close']
-            change_pct = ((latest - prev) / prev) * 100
-
-            result["commodities"]["general"] = {
-                "change_pct": round(change_pct, 2),
-                "sentiment": "POSITIVE" if change_pct > 1 else "NEGATIVE" if change_pct < -1 else "NEUTRAL"
-            }
-    except Exception as e:
-        logger.warning(f"Failed to fetch commodity data: {e}")
-
-    # Determine overall sentiment
-    positive_signals = 0
-    total_signals = 0
-
-    if "sentiment" in result["us_market"]:
-        total_signals += 1
-        if result["us_market"]["sentiment"] == "POSITIVE":
-            positive_signals += 1
-
-    for market in result["asia_markets"].values():
-        if "sentiment" in market:
-            total_signals += 1
-            if market["sentiment"] == "POSITIVE":
-                positive_signals += 1
-
-    for comm in result["commodities"].values():
-        if "sentiment" in comm:
-            total_signals += 1
-            if comm["sentiment"] == "POSITIVE":
-                positive_signals += 1
-
-    if total_signals > 0:
-        positive_ratio = positive_signals / total_signals
-        if positive_ratio >= 0.6:
-            result["overall_sentiment"] = "POSITIVE"
-        elif positive_ratio <= 0.4:
-            result["overall_sentiment"] = "NEGATIVE"
-
-    return result
+    return global_markets.snapshot()
 
 
 def get_wib_time_context() -> Dict[str, Any]:
@@ -850,16 +803,24 @@ STOCK_INDICES = {
     ]
 }
 
+# Until an index's members are imported into the symbol master, these lists are its members
+symbol_master.seed(STOCK_INDICES)
+
 
 def get_all_idx_stocks(stock_index: Optional[str] = None) -> List[str]:
     """
     Fetch Indonesian stock symbols based on index filter.
+
+    Besides LQ45 and IDX30, any universe of the symbol master: ALL (every
+    listed symbol), a sector index such as IDXFINANCE, or an imported index.
     """
     # If specific index requested, return that index
-    if stock_index and stock_index.upper() in STOCK_INDICES:
-        stocks = STOCK_INDICES[stock_index.upper()]
-        logger.info(f"Using {stock_index.upper()} index with {len(stocks)} stocks")
-        return stocks
+    if stock_index and stock_index.upper() != "BOTH":
+        stocks = symbol_master.members(stock_index)
+        if stocks:
+            logger.info(f"Using {stock_index.upper()} index with {len(stocks)} stocks")
+            return stocks
+        logger.warning(f"Unknown or empty index {stock_index}, using LQ45+IDX30")
 
     # Default: Return combination of LQ45 and IDX30 (best indices)
     # Use set to avoid duplicates, then convert to sorted list
@@ -873,378 +834,440 @@ def get_all_idx_stocks(stock_index: Optional[str] = None) -> List[str]:
 # TRADING STRATEGY SCREENING FUNCTIONS
 # ============================================================================
 
-def screen_preopen_setups(stock_list: List[str], limit: int = 10, min_score: int = 70, min_avg_volume: int = 1000000, enable_bandarmology: bool = True) -> List[Dict[str, Any]]:
+# What each screener computes per symbol; history_planner turns this into the
+# shortest period that satisfies all of them (bandarmology only when enabled)
+SCREEN_COMPUTATIONS = {
+    "preopen": ["screen_preopen", "atr", "bandarmology"],
+    "bpjs": ["screen_bpjs", "rsi", "macd", "atr", "volume_avg20", "bandarmology"],
+    "bsjp": ["screen_bsjp", "rsi", "atr", "volume_avg20", "bandarmology"],
+    "day_trade": ["screen_day_trade", "rsi", "macd", "volume_avg20", "chart_levels", "pattern_label"],
+}
+
+
+# Latest-bar cutoffs the evaluators apply, checked against the symbol master's
+# stored stats before anything is downloaded (see _prefilter())
+SCREEN_PREFILTERS = {
+    "preopen": {"min_closing_strength": 98},
+    "bpjs": {},
+    "bsjp": {"min_closing_strength": 99},
+}
+
+
+def plan_screen_period(*strategies: str, enable_bandarmology: bool = True) -> str:
+    """Shortest history period that covers every listed screener"""
+    computations = [
+        c for strategy in strategies for c in SCREEN_COMPUTATIONS[strategy]
+        if enable_bandarmology or c != "bandarmology"
+    ]
+    return plan_period(*computations)
+
+
+def _prefilter(strategy: str, stock_list: List[str], params: Dict[str, Any]) -> List[str]:
     """
-    Screen for PRE-OPEN setups (analyzed malem kemarin, execute di 08:45-08:58)
+    The symbols a screener could still pick by their stored stats
+    (symbol_master.prefilter()); params are the evaluator's arguments
     """
-    logger.info(f"Screening {len(stock_list)} stocks for PRE-OPEN setups (bandarmology: {enable_bandarmology})...")
+    if strategy == "day_trade":
+        return symbol_master.prefilter(stock_list, min_volume_ratio=params["volume_threshold"])
+    return symbol_master.prefilter(stock_list, params["min_avg_volume"], **SCREEN_PREFILTERS[strategy])
 
-    # Get global market context
-    global_context = check_global_markets()
-    global_positive = (global_context["overall_sentiment"] == "POSITIVE")
 
-    candidates = []
+def _load_universe(stock_list: List[str], period: str) -> OHLCVPanel:
+    """load_panel() for a screen, keeping the symbol master's liquidity stats current from the bars"""
+    panel = load_panel(stock_list, period=period)
+    try:
+        symbol_master.observe(panel, stock_list)
+    except Exception as e:
+        logger.warning(f"Could not update liquidity stats: {e}")
+    return panel
 
-    for symbol in stock_list:
-        try:
-            ticker = ensure_idx_ticker(symbol)
-            stock = yf.Ticker(ticker)
 
-            # Add small delay to avoid rate limiting
-            time.sleep(0.2)
+def _rank_candidates(strategy: str, candidates: List[Dict[str, Any]], enable_bandarmology: bool = False) -> List[Dict[str, Any]]:
+    """Order a screener's candidates the way its endpoint reports them (in place)"""
+    if strategy == "day_trade":
+        # Sort by volume ratio (most active first)
+        candidates.sort(key=lambda x: x["volume_ratio"], reverse=True)
+    elif enable_bandarmology:
+        candidates.sort(key=lambda x: x.get("score", 0), reverse=True)
+    elif strategy == "bpjs":
+        # Without bandarmology BPJS prefers lower RSI
+        candidates.sort(key=lambda x: x["rsi"], reverse=False)
+    else:
+        candidates.sort(key=lambda x: x["closing_strength_pct"], reverse=True)
+    return candidates
 
-            hist = stock.history(period="1mo")
 
-            if hist.empty or len(hist) < 40:
-                continue
+def _panel_bands(panel: OHLCVPanel, stock_list: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Bandarmology for the whole list in one vectorized pass, or from the saved
+    streaming state with STREAMING_INDICATORS=1, as per-symbol evaluator
+    arguments (None falls back to calculate_bandarmology per symbol)
+    """
+    try:
+        if STREAMING_INDICATORS:
+            states = indicator_store.refresh_panel(panel, stock_list)
+            return {symbol: {"band": bandarmology_from_state(state)} for symbol, state in states.items()}
+        return {symbol: {"band": band} for symbol, band in panel_bandarmology(panel, stock_list).items()}
+    except Exception as e:
+        logger.warning(f"Panel bandarmology failed ({e}), computing per symbol")
+        return None
 
-            # Check average volume (20-day)
-            avg_volume = hist['Volume'].tail(20).mean()
-            if avg_volume < min_avg_volume:
-                continue
 
-            # Check yesterday's closing strength
-            latest = hist.iloc[-1]
-            yesterday_high = float(latest['High'])
-            yesterday_close = float(latest['Close'])
+def _evaluate_preopen(symbol: str, hist: pd.DataFrame, min_score: int, min_avg_volume: int, enable_bandarmology: bool, global_positive: bool, band: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+    """
+    Evaluate one symbol for a PRE-OPEN setup; returns the candidate or None
+    """
+    if hist.empty or len(hist) < 40:
+        return None
 
-            closing_strength = (yesterday_close / yesterday_high) * 100 if yesterday_high > 0 else 0
+    # Check average volume (20-day)
+    avg_volume = hist['Volume'].tail(20).mean()
+    if avg_volume < min_avg_volume:
+        return None
 
-            # Strong close = within 2% of HOD
-            if closing_strength < 98:
-                continue
+    # Check yesterday's closing strength
+    latest = hist.iloc[-1]
+    yesterday_high = float(latest['High'])
+    yesterday_close = float(latest['Close'])
 
-            # Calculate simple ATR for risk management
-            atr_indicator = AverageTrueRange(high=hist['High'], low=hist['Low'], close=hist['Close'], window=14)
-            atr = atr_indicator.average_true_range().iloc[-1]
-
-            # Conditionally get bandarmology
-            if enable_bandarmology:
-                band = calculate_bandarmology(hist)
-                phase = band.get("phase", "")
-                score = band.get("score", 0)
-
-                # Pre-open specific checks
-                if score < min_score:
-                    continue
-
-                # Must be ACCUMULATION or MARKUP
-                if phase not in ["ACCUMULATION", "MARKUP"]:
-                    continue
-
-                # Check for compression
-                signals = band.get("signals", {})
-                structure = signals.get("structure", {})
-                has_compression = structure.get("compression", False)
-                has_absorption = structure.get("absorption", False)
-            else:
-                # Simple mode without bandarmology
-                score = None
-                phase = None
-                has_compression = None
-                has_absorption = None
-
-            # Calculate suggested pre-open price
-            # If global positive, anticipate gap up
-            gap_anticipation = 1.01 if global_positive else 1.005
-            suggested_preopen = yesterday_close * gap_anticipation
-
-            stop_loss = yesterday_close - (atr * 1.5)
-            take_profit_quick = yesterday_close * 1.03  # 3% quick exit
-            take_profit_ride = yesterday_close + (atr * 3.0)  # Ride momentum
-
-            candidate = {
-                "symbol": symbol,
-                "yesterday_close": round(yesterday_close, 0),
-                "suggested_preopen_bid": round(suggested_preopen, 0),
-                "stop_loss": round(stop_loss, 0),
-                "take_profit_scenarios": {
-                    "quick_exit_3pct": round(take_profit_quick, 0),
-                    "ride_momentum": round(take_profit_ride, 0)
-                },
-                "closing_strength_pct": round(closing_strength, 1),
-                "global_catalyst": global_positive,
-                "reasoning": f"Strong close at {closing_strength:.1f}% of HOD. "
-                            f"{'Global markets positive overnight. ' if global_positive else ''}"
-            }
-
-            # Add bandarmology fields if enabled
-            if enable_bandarmology:
-                candidate["score"] = score
-                candidate["phase"] = phase
-                candidate["compression"] = has_compression
-                candidate["absorption"] = has_absorption
-                candidate["reasoning"] = f"{'Compression bars ready for breakout. ' if has_compression else ''}" + candidate["reasoning"] + f" {phase} phase with score {score}/100."
-
-            candidates.append(candidate)
+    closing_strength = (yesterday_close / yesterday_high) * 100 if yesterday_high > 0 else 0
 
-        except Exception as e:
-            logger.warning(f"Error screening {symbol} for pre-open: {e}")
-            continue
+    # Strong close = within 2% of HOD
+    if closing_strength < 98:
+        return None
 
-    # Sort by score if bandarmology enabled, otherwise by closing strength
+    # Calculate simple ATR for risk management
+    atr = features(hist, symbol).atr(14).iloc[-1]
+
+    # Conditionally get bandarmology
     if enable_bandarmology:
-        candidates.sort(key=lambda x: x.get("score", 0), reverse=True)
+        band = band if band is not None else calculate_bandarmology(hist, symbol)
+        phase = band.get("phase", "")
+        score = band.get("score", 0)
+
+        # Pre-open specific checks
+        if score < min_score:
+            return None
+
+        # Must be ACCUMULATION or MARKUP
+        if phase not in ["ACCUMULATION", "MARKUP"]:
+            return None
+
+        # Check for compression
+        signals = band.get("signals", {})
+        structure = signals.get("structure", {})
+        has_compression = structure.get("compression", False)
+        has_absorption = structure.get("absorption", False)
     else:
-        candidates.sort(key=lambda x: x["closing_strength_pct"], reverse=True)
+        # Simple mode without bandarmology
+        score = None
+        phase = None
+        has_compression = None
+        has_absorption = None
+
+    # Calculate suggested pre-open price
+    # If global positive, anticipate gap up
+    gap_anticipation = 1.01 if global_positive else 1.005
+    suggested_preopen = yesterday_close * gap_anticipation
+
+    stop_loss = yesterday_close - (atr * 1.5)
+    take_profit_quick = yesterday_close * 1.03  # 3% quick exit
+    take_profit_ride = yesterday_close + (atr * 3.0)  # Ride momentum
+
+    candidate = {
+        "symbol": symbol,
+        "yesterday_close": round(yesterday_close, 0),
+        "suggested_preopen_bid": round(suggested_preopen, 0),
+        "stop_loss": round(stop_loss, 0),
+        "take_profit_scenarios": {
+            "quick_exit_3pct": round(take_profit_quick, 0),
+            "ride_momentum": round(take_profit_ride, 0)
+        },
+        "closing_strength_pct": round(closing_strength, 1),
+        "global_catalyst": global_positive,
+        "reasoning": f"Strong close at {closing_strength:.1f}% of HOD. "
+                    f"{'Global markets positive overnight. ' if global_positive else ''}"
+    }
+
+    # Add bandarmology fields if enabled
+    if enable_bandarmology:
+        candidate["score"] = score
+        candidate["phase"] = phase
+        candidate["compression"] = has_compression
+        candidate["absorption"] = has_absorption
+        candidate["reasoning"] = f"{'Compression bars ready for breakout. ' if has_compression else ''}" + candidate["reasoning"] + f" {phase} phase with score {score}/100."
 
-    return candidates[:limit]
+    return candidate
 
 
-def screen_bpjs_setups(stock_list: List[str], limit: int = 10, min_score: int = 65, min_avg_volume: int = 1000000, enable_bandarmology: bool = True) -> List[Dict[str, Any]]:
+def screen_preopen_setups(stock_list: List[str], limit: int = 10, min_score: int = 70, min_avg_volume: int = 1000000, enable_bandarmology: bool = True, panel: Optional[OHLCVPanel] = None) -> List[Dict[str, Any]]:
     """
-    Screen for BPJS (Beli Pagi Jual Sore) setups
+    Screen for PRE-OPEN setups (analyzed malem kemarin, execute di 08:45-08:58)
     """
-    logger.info(f"Screening {len(stock_list)} stocks for BPJS setups (bandarmology: {enable_bandarmology})...")
-
-    candidates = []
+    logger.info(f"Screening {len(stock_list)} stocks for PRE-OPEN setups (bandarmology: {enable_bandarmology})...")
 
-    for symbol in stock_list:
-        try:
-            ticker = ensure_idx_ticker(symbol)
-            stock = yf.Ticker(ticker)
+    # Get global market context
+    global_context = check_global_markets()
+    global_positive = (global_context["overall_sentiment"] == "POSITIVE")
 
-            # Add small delay to avoid rate limiting (0.2 seconds between requests)
-            time.sleep(0.2)
+    # One batched download for the whole list unless the caller shares a panel
+    # Symbols their stored stats rule out are not downloaded
+    if panel is None:
+        stock_list = _prefilter("preopen", stock_list, {"min_avg_volume": min_avg_volume})
+        panel = _load_universe(stock_list, plan_screen_period("preopen", enable_bandarmology=enable_bandarmology))
+
+    candidates = evaluate_universe(
+        _evaluate_preopen, "pre-open", panel, stock_list,
+        per_symbol=_panel_bands(panel, stock_list) if enable_bandarmology else None,
+        min_score=min_score, min_avg_volume=min_avg_volume,
+        enable_bandarmology=enable_bandarmology, global_positive=global_positive,
+    )
 
-            hist = stock.history(period="1mo")
+    # Sort by score if bandarmology enabled, otherwise by closing strength
+    return _rank_candidates("preopen", candidates, enable_bandarmology)[:limit]
 
-            if hist.empty or len(hist) < 50:
-                continue
 
-            # Check average volume (20-day)
-            avg_volume = hist['Volume'].tail(20).mean()
-            if avg_volume < min_avg_volume:
-                continue
+def _evaluate_bpjs(symbol: str, hist: pd.DataFrame, min_score: int, min_avg_volume: int, enable_bandarmology: bool, band: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+    """
+    Evaluate one symbol for a BPJS setup; returns the candidate or None
+    """
+    if hist.empty or len(hist) < 50:
+        return None
 
-            # Calculate indicators
-            rsi_indicator = RSIIndicator(close=hist['Close'], window=14)
-            hist['RSI'] = rsi_indicator.rsi()
+    # Check average volume (20-day)
+    avg_volume = hist['Volume'].tail(20).mean()
+    if avg_volume < min_avg_volume:
+        return None
 
-            macd_indicator = MACD(close=hist['Close'])
-            hist['MACD'] = macd_indicator.macd()
-            hist['MACD_signal'] = macd_indicator.macd_signal()
+    # Calculate indicators
+    f = features(hist, symbol)
+    hist['RSI'] = f.rsi(14)
 
-            latest = hist.iloc[-1]
-            rsi = float(latest['RSI'])
-            macd = float(latest['MACD'])
-            macd_signal = float(latest['MACD_signal'])
+    macd_series, macd_signal_series, _ = f.macd()
+    hist['MACD'] = macd_series
+    hist['MACD_signal'] = macd_signal_series
 
-            # RSI check - not overbought
-            if rsi >= 70:
-                continue
+    latest = hist.iloc[-1]
+    rsi = float(latest['RSI'])
+    macd = float(latest['MACD'])
+    macd_signal = float(latest['MACD_signal'])
 
-            # MACD check - bullish
-            if macd <= macd_signal:
-                continue
+    # RSI check - not overbought
+    if rsi >= 70:
+        return None
 
-            current_price = float(latest['Close'])
+    # MACD check - bullish
+    if macd <= macd_signal:
+        return None
 
-            # Calculate simple ATR for risk management
-            atr_indicator = AverageTrueRange(high=hist['High'], low=hist['Low'], close=hist['Close'], window=14)
-            atr = atr_indicator.average_true_range().iloc[-1]
+    current_price = float(latest['Close'])
 
-            # Conditionally get bandarmology
-            if enable_bandarmology:
-                band = calculate_bandarmology(hist)
-                phase = band.get("phase", "")
-                score = band.get("score", 0)
+    # Calculate simple ATR for risk management
+    atr = features(hist, symbol).atr(14).iloc[-1]
 
-                if score < min_score:
-                    continue
+    # Conditionally get bandarmology
+    if enable_bandarmology:
+        band = band if band is not None else calculate_bandarmology(hist, symbol)
+        phase = band.get("phase", "")
+        score = band.get("score", 0)
 
-                # Prefer MARKUP or late ACCUMULATION
-                if phase not in ["MARKUP", "ACCUMULATION"]:
-                    continue
+        if score < min_score:
+            return None
 
-                # Volume check
-                signals = band.get("signals", {})
-                volume_sig = signals.get("volume", {})
-                latest_vol_ratio = volume_sig.get("latest_vol_ratio", 1.0)
+        # Prefer MARKUP or late ACCUMULATION
+        if phase not in ["MARKUP", "ACCUMULATION"]:
+            return None
 
-                # Want volume spike
-                if latest_vol_ratio < 1.5:
-                    continue
-            else:
-                # Simple mode without bandarmology
-                score = None
-                phase = None
-                latest_vol_ratio = latest['Volume'] / avg_volume
-
-            # Risk management
-            entry = current_price
-            stop_loss = entry - (atr * 1.0)  # Tight for intraday
-            take_profit = entry + (atr * 1.5)  # Quick target
-
-            risk_pct = ((entry - stop_loss) / entry) * 100
-            reward_pct = ((take_profit - entry) / entry) * 100
-            rr_ratio = reward_pct / risk_pct if risk_pct > 0 else 0
-
-            candidate = {
-                "symbol": symbol,
-                "entry": round(entry, 0),
-                "stop_loss": round(stop_loss, 0),
-                "take_profit": round(take_profit, 0),
-                "risk_pct": round(risk_pct, 2),
-                "reward_pct": round(reward_pct, 2),
-                "risk_reward": f"1:{rr_ratio:.1f}",
-                "rsi": round(rsi, 1),
-                "exit_deadline": "Before 15:49 WIB (avoid overnight risk)",
-                "reasoning": f"MACD bullish crossover. RSI {rsi:.1f} (not overbought). Exit mandatory before market close."
-            }
-
-            # Add bandarmology fields if enabled
-            if enable_bandarmology:
-                candidate["score"] = score
-                candidate["phase"] = phase
-                candidate["volume_spike"] = f"{latest_vol_ratio:.1f}x"
-                candidate["reasoning"] = f"Volume spike {latest_vol_ratio:.1f}x with MACD bullish. RSI {rsi:.1f} (not overbought). {phase} phase. Exit mandatory before market close."
-
-            candidates.append(candidate)
+        # Volume check
+        signals = band.get("signals", {})
+        volume_sig = signals.get("volume", {})
+        latest_vol_ratio = volume_sig.get("latest_vol_ratio", 1.0)
 
-        except Exception as e:
-            # Log warning but continue with other stocks
-            # Common errors: rate limiting, delisted stocks, insufficient data
-            logger.warning(f"Error screening {symbol} for BPJS: {e}")
-            continue
+        # Want volume spike
+        if latest_vol_ratio < 1.5:
+            return None
+    else:
+        # Simple mode without bandarmology
+        score = None
+        phase = None
+        latest_vol_ratio = latest['Volume'] / avg_volume
+
+    # Risk management
+    entry = current_price
+    stop_loss = entry - (atr * 1.0)  # Tight for intraday
+    take_profit = entry + (atr * 1.5)  # Quick target
+
+    risk_pct = ((entry - stop_loss) / entry) * 100
+    reward_pct = ((take_profit - entry) / entry) * 100
+    rr_ratio = reward_pct / risk_pct if risk_pct > 0 else 0
+
+    candidate = {
+        "symbol": symbol,
+        "entry": round(entry, 0),
+        "stop_loss": round(stop_loss, 0),
+        "take_profit": round(take_profit, 0),
+        "risk_pct": round(risk_pct, 2),
+        "reward_pct": round(reward_pct, 2),
+        "risk_reward": f"1:{rr_ratio:.1f}",
+        "rsi": round(rsi, 1),
+        "exit_deadline": "Before 15:49 WIB (avoid overnight risk)",
+        "reasoning": f"MACD bullish crossover. RSI {rsi:.1f} (not overbought). Exit mandatory before market close."
+    }
 
-    # Sort by score if bandarmology enabled, otherwise by RSI (lower is better)
+    # Add bandarmology fields if enabled
     if enable_bandarmology:
-        candidates.sort(key=lambda x: x.get("score", 0), reverse=True)
-    else:
-        candidates.sort(key=lambda x: x["rsi"], reverse=False)
+        candidate["score"] = score
+        candidate["phase"] = phase
+        candidate["volume_spike"] = f"{latest_vol_ratio:.1f}x"
+        candidate["reasoning"] = f"Volume spike {latest_vol_ratio:.1f}x with MACD bullish. RSI {rsi:.1f} (not overbought). {phase} phase. Exit mandatory before market close."
 
-    return candidates[:limit]
+    return candidate
 
 
-def screen_bsjp_setups(stock_list: List[str], limit: int = 10, min_score: int = 60, min_avg_volume: int = 1000000, enable_bandarmology: bool = True) -> List[Dict[str, Any]]:
+def screen_bpjs_setups(stock_list: List[str], limit: int = 10, min_score: int = 65, min_avg_volume: int = 1000000, enable_bandarmology: bool = True, panel: Optional[OHLCVPanel] = None) -> List[Dict[str, Any]]:
     """
-    Screen for BSJP (Beli Sore Jual Pagi) setups
+    Screen for BPJS (Beli Pagi Jual Sore) setups
     """
-    logger.info(f"Screening {len(stock_list)} stocks for BSJP setups (bandarmology: {enable_bandarmology})...")
+    logger.info(f"Screening {len(stock_list)} stocks for BPJS setups (bandarmology: {enable_bandarmology})...")
 
-    candidates = []
+    # One batched download for the whole list unless the caller shares a panel
+    # Symbols their stored stats rule out are not downloaded
+    if panel is None:
+        stock_list = _prefilter("bpjs", stock_list, {"min_avg_volume": min_avg_volume})
+        panel = _load_universe(stock_list, plan_screen_period("bpjs", enable_bandarmology=enable_bandarmology))
 
-    for symbol in stock_list:
-        try:
-            ticker = ensure_idx_ticker(symbol)
-            stock = yf.Ticker(ticker)
+    candidates = evaluate_universe(
+        _evaluate_bpjs, "BPJS", panel, stock_list,
+        per_symbol=_panel_bands(panel, stock_list) if enable_bandarmology else None,
+        min_score=min_score, min_avg_volume=min_avg_volume, enable_bandarmology=enable_bandarmology,
+    )
 
-            # Add small delay to avoid rate limiting
-            time.sleep(0.2)
+    # Sort by score if bandarmology enabled, otherwise by RSI (lower is better)
+    return _rank_candidates("bpjs", candidates, enable_bandarmology)[:limit]
 
-            hist = stock.history(period="3mo")
 
-            if hist.empty or len(hist) < 50:
-                continue
+def _evaluate_bsjp(symbol: str, hist: pd.DataFrame, min_score: int, min_avg_volume: int, enable_bandarmology: bool, band: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+    """
+    Evaluate one symbol for a BSJP setup; returns the candidate or None
+    """
+    if hist.empty or len(hist) < 50:
+        return None
 
-            # Check average volume (20-day)
-            avg_volume = hist['Volume'].tail(20).mean()
-            if avg_volume < min_avg_volume:
-                continue
+    # Check average volume (20-day)
+    avg_volume = hist['Volume'].tail(20).mean()
+    if avg_volume < min_avg_volume:
+        return None
 
-            # Calculate RSI
-            rsi_indicator = RSIIndicator(close=hist['Close'], window=14)
-            hist['RSI'] = rsi_indicator.rsi()
+    # Calculate RSI
+    hist['RSI'] = features(hist, symbol).rsi(14)
 
-            latest = hist.iloc[-1]
-            rsi = float(latest['RSI'])
+    latest = hist.iloc[-1]
+    rsi = float(latest['RSI'])
 
-            # RSI check - not overextended
-            if rsi >= 65:
-                continue
+    # RSI check - not overextended
+    if rsi >= 65:
+        return None
 
-            # Check closing strength (near HOD)
-            today_high = float(latest['High'])
-            today_close = float(latest['Close'])
-            closing_strength = (today_close / today_high) * 100 if today_high > 0 else 0
+    # Check closing strength (near HOD)
+    today_high = float(latest['High'])
+    today_close = float(latest['Close'])
+    closing_strength = (today_close / today_high) * 100 if today_high > 0 else 0
 
-            # Want strong close (within 1% of HOD)
-            if closing_strength < 99:
-                continue
+    # Want strong close (within 1% of HOD)
+    if closing_strength < 99:
+        return None
 
-            # Calculate simple ATR for risk management
-            atr_indicator = AverageTrueRange(high=hist['High'], low=hist['Low'], close=hist['Close'], window=14)
-            atr = atr_indicator.average_true_range().iloc[-1]
+    # Calculate simple ATR for risk management
+    atr = features(hist, symbol).atr(14).iloc[-1]
 
-            # Conditionally get bandarmology
-            if enable_bandarmology:
-                band = calculate_bandarmology(hist)
-                phase = band.get("phase", "")
-                score = band.get("score", 0)
+    # Conditionally get bandarmology
+    if enable_bandarmology:
+        band = band if band is not None else calculate_bandarmology(hist, symbol)
+        phase = band.get("phase", "")
+        score = band.get("score", 0)
+
+        if score < min_score:
+            return None
+
+        # Prefer ACCUMULATION (patient overnight play)
+        if phase != "ACCUMULATION":
+            return None
+
+        # Check for compression/absorption
+        signals = band.get("signals", {})
+        structure = signals.get("structure", {})
+        has_compression = structure.get("compression", False)
+        has_absorption = structure.get("absorption", False)
+
+        # Want at least one
+        if not (has_compression or has_absorption):
+            return None
+    else:
+        # Simple mode without bandarmology
+        score = None
+        phase = None
+        has_compression = None
+        has_absorption = None
+
+    # Risk management - wider for overnight
+    entry = today_close
+    stop_loss = entry - (atr * 2.0)  # Wider for overnight
+    take_profit = entry + (atr * 3.0)  # Target gap up
+
+    risk_pct = ((entry - stop_loss) / entry) * 100
+    reward_pct = ((take_profit - entry) / entry) * 100
+    rr_ratio = reward_pct / risk_pct if risk_pct > 0 else 0
+
+    candidate = {
+        "symbol": symbol,
+        "entry": round(entry, 0),
+        "stop_loss": round(stop_loss, 0),
+        "take_profit": round(take_profit, 0),
+        "risk_pct": round(risk_pct, 2),
+        "reward_pct": round(reward_pct, 2),
+        "risk_reward": f"1:{rr_ratio:.1f}",
+        "rsi": round(rsi, 1),
+        "closing_strength_pct": round(closing_strength, 1),
+        "exit_window_tomorrow": "09:00-11:30 WIB",
+        "overnight_risks": [
+            "Monitor global markets (US close, Asia open)",
+            "Check for corporate news before market open",
+            "Set alerts for stop loss"
+        ],
+        "reasoning": f"Strong close at {closing_strength:.1f}% of HOD. RSI {rsi:.1f} (room to run). Target gap up tomorrow morning."
+    }
 
-                if score < min_score:
-                    continue
+    # Add bandarmology fields if enabled
+    if enable_bandarmology:
+        candidate["score"] = score
+        candidate["phase"] = phase
+        candidate["compression"] = has_compression
+        candidate["absorption"] = has_absorption
+        candidate["reasoning"] = f"Strong close at {closing_strength:.1f}% of HOD. {'Compression detected. ' if has_compression else ''}{'Absorption bars present. ' if has_absorption else ''}{phase} phase (coiling for breakout). RSI {rsi:.1f} (room to run). Target gap up tomorrow morning."
 
-                # Prefer ACCUMULATION (patient overnight play)
-                if phase != "ACCUMULATION":
-                    continue
+    return candidate
 
-                # Check for compression/absorption
-                signals = band.get("signals", {})
-                structure = signals.get("structure", {})
-                has_compression = structure.get("compression", False)
-                has_absorption = structure.get("absorption", False)
 
-                # Want at least one
-                if not (has_compression or has_absorption):
-                    continue
-            else:
-                # Simple mode without bandarmology
-                score = None
-                phase = None
-                has_compression = None
-                has_absorption = None
-
-            # Risk management - wider for overnight
-            entry = today_close
-            stop_loss = entry - (atr * 2.0)  # Wider for overnight
-            take_profit = entry + (atr * 3.0)  # Target gap up
-
-            risk_pct = ((entry - stop_loss) / entry) * 100
-            reward_pct = ((take_profit - entry) / entry) * 100
-            rr_ratio = reward_pct / risk_pct if risk_pct > 0 else 0
-
-            candidate = {
-                "symbol": symbol,
-                "entry": round(entry, 0),
-                "stop_loss": round(stop_loss, 0),
-                "take_profit": round(take_profit, 0),
-                "risk_pct": round(risk_pct, 2),
-                "reward_pct": round(reward_pct, 2),
-                "risk_reward": f"1:{rr_ratio:.1f}",
-                "rsi": round(rsi, 1),
-                "closing_strength_pct": round(closing_strength, 1),
-                "exit_window_tomorrow": "09:00-11:30 WIB",
-                "overnight_risks": [
-                    "Monitor global markets (US close, Asia open)",
-                    "Check for corporate news before market open",
-                    "Set alerts for stop loss"
-                ],
-                "reasoning": f"Strong close at {closing_strength:.1f}% of HOD. RSI {rsi:.1f} (room to run). Target gap up tomorrow morning."
-            }
-
-            # Add bandarmology fields if enabled
-            if enable_bandarmology:
-                candidate["score"] = score
-                candidate["phase"] = phase
-                candidate["compression"] = has_compression
-                candidate["absorption"] = has_absorption
-                candidate["reasoning"] = f"Strong close at {closing_strength:.1f}% of HOD. {'Compression detected. ' if has_compression else ''}{'Absorption bars present. ' if has_absorption else ''}{phase} phase (coiling for breakout). RSI {rsi:.1f} (room to run). Target gap up tomorrow morning."
-
-            candidates.append(candidate)
+def screen_bsjp_setups(stock_list: List[str], limit: int = 10, min_score: int = 60, min_avg_volume: int = 1000000, enable_bandarmology: bool = True, panel: Optional[OHLCVPanel] = None) -> List[Dict[str, Any]]:
+    """
+    Screen for BSJP (Beli Sore Jual Pagi) setups
+    """
+    logger.info(f"Screening {len(stock_list)} stocks for BSJP setups (bandarmology: {enable_bandarmology})...")
 
-        except Exception as e:
-            logger.warning(f"Error screening {symbol} for BSJP: {e}")
-            continue
+    # One batched download for the whole list unless the caller shares a panel
+    # Symbols their stored stats rule out are not downloaded
+    if panel is None:
+        stock_list = _prefilter("bsjp", stock_list, {"min_avg_volume": min_avg_volume})
+        panel = _load_universe(stock_list, plan_screen_period("bsjp", enable_bandarmology=enable_bandarmology))
 
-    # Sort by score if bandarmology enabled, otherwise by closing strength
-    if enable_bandarmology:
-        candidates.sort(key=lambda x: x.get("score", 0), reverse=True)
-    else:
-        candidates.sort(key=lambda x: x["closing_strength_pct"], reverse=True)
+    candidates = evaluate_universe(
+        _evaluate_bsjp, "BSJP", panel, stock_list,
+        per_symbol=_panel_bands(panel, stock_list) if enable_bandarmology else None,
+        min_score=min_score, min_avg_volume=min_avg_volume, enable_bandarmology=enable_bandarmology,
+    )
 
-    return candidates[:limit]
+    # Sort by score if bandarmology enabled, otherwise by closing strength
+    return _rank_candidates("bsjp", candidates, enable_bandarmology)[:limit]
 
 
 def detect_pattern_label(hist: pd.DataFrame, symbol: str) -> str:
@@ -1257,20 +1280,19 @@ def detect_pattern_label(hist: pd.DataFrame, symbol: str) -> str:
     try:
         # Calculate indicators
         close = hist['Close']
+        f = features(hist, symbol)
 
         # Moving averages
-        ma20 = SMAIndicator(close=close, window=20).sma_indicator()
-        ma50 = SMAIndicator(close=close, window=50).sma_indicator()
-        ma200 = SMAIndicator(close=close, window=200).sma_indicator() if len(hist) >= 200 else None
+        ma20 = f.sma(20)
+        ma50 = f.sma(50)
+        ma200 = f.sma(200) if len(hist) >= 200 else None
 
         # MACD
-        macd_ind = MACD(close=close)
-        macd = macd_ind.macd()
-        macd_signal = macd_ind.macd_signal()
+        macd, macd_signal, _ = f.macd()
 
         # Volume
         volume = hist['Volume']
-        vol_avg20 = volume.rolling(20).mean()
+        vol_avg20 = f.volume_avg(20)
 
         # Latest values
         latest_price = float(close.iloc[-1])
@@ -1319,7 +1341,7 @@ def detect_pattern_label(hist: pd.DataFrame, symbol: str) -> str:
                 return "Approaching MA20"
 
         # 6. Breakout Resistance (20-day high)
-        high_20 = float(hist['High'].rolling(20).max().iloc[-1])
+        high_20 = float(f.rolling_high(20).iloc[-1])
         if latest_price >= high_20 * 0.995:  # Within 0.5% of 20-day high
             return "Breakout Resistance"
 
@@ -1328,7 +1350,7 @@ def detect_pattern_label(hist: pd.DataFrame, symbol: str) -> str:
             return "Above MA200"
 
         # 8. Support Bounce
-        low_20 = float(hist['Low'].rolling(20).min().iloc[-1])
+        low_20 = float(f.rolling_low(20).iloc[-1])
         if latest_price <= low_20 * 1.01:  # Within 1% of 20-day low
             return "Support Bounce"
 
@@ -1340,7 +1362,7 @@ def detect_pattern_label(hist: pd.DataFrame, symbol: str) -> str:
         return "Technical Setup"
 
 
-def calculate_chart_based_levels(hist: pd.DataFrame) -> Dict[str, float]:
+def calculate_chart_based_levels(hist: pd.DataFrame, symbol: Optional[str] = None) -> Dict[str, float]:
     """
     Calculate support/resistance levels from chart analysis
     """
@@ -1355,16 +1377,15 @@ def calculate_chart_based_levels(hist: pd.DataFrame) -> Dict[str, float]:
 
     try:
         close = hist['Close']
-        high = hist['High']
-        low = hist['Low']
+        f = features(hist, symbol)
 
         # Calculate MAs
-        ma20 = SMAIndicator(close=close, window=20).sma_indicator()
-        ma50 = SMAIndicator(close=close, window=50).sma_indicator()
+        ma20 = f.sma(20)
+        ma50 = f.sma(50)
 
         # Swing levels
-        swing_high_20 = float(high.rolling(20).max().iloc[-1])
-        swing_low_20 = float(low.rolling(20).min().iloc[-1])
+        swing_high_20 = float(f.rolling_high(20).iloc[-1])
+        swing_low_20 = float(f.rolling_low(20).iloc[-1])
 
         latest_close = float(close.iloc[-1])
         latest_ma20 = float(ma20.iloc[-1]) if not pd.isna(ma20.iloc[-1]) else latest_close
@@ -1414,123 +1435,199 @@ def calculate_chart_based_levels(hist: pd.DataFrame) -> Dict[str, float]:
         }
 
 
-def screen_day_trade_setups(stock_list: List[str], limit: int = 10, mode: str = "mandiri") -> List[Dict[str, Any]]:
+def _evaluate_day_trade(symbol: str, hist: pd.DataFrame, rsi_threshold: float, macd_threshold: float, volume_threshold: float, risk_threshold: float) -> Optional[Dict[str, Any]]:
     """
-    Screen for day trade opportunities with Mandiri-style simple criteria
+    Evaluate one symbol for a day trade setup; returns the candidate or None
     """
-    logger.info(f"Screening {len(stock_list)} stocks for day trade setups (mode: {mode})...")
+    if hist.empty or len(hist) < 50:
+        return None
 
-    # Set thresholds based on mode
-    if mode == "mandiri":
-        rsi_threshold = 78  # More lenient
-        macd_threshold = -20  # More lenient
-        volume_threshold = 0.5  # More lenient
-        risk_threshold = 6  # More lenient
-    else:  # strict mode
-        rsi_threshold = 75
-        macd_threshold = -10
-        volume_threshold = 0.8
-        risk_threshold = 5
-
-    candidates = []
-
-    for symbol in stock_list:
-        try:
-            ticker = ensure_idx_ticker(symbol)
-            stock = yf.Ticker(ticker)
+    # Calculate basic indicators for filtering
+    close = hist['Close']
+    volume = hist['Volume']
 
-            # Add small delay to avoid rate limiting
-            time.sleep(0.2)
+    f = features(hist, symbol)
 
-            hist = stock.history(period="3mo")
+    # RSI
+    rsi_series = f.rsi(14)
+    rsi = float(rsi_series.iloc[-1]) if not rsi_series.empty else 50
 
-            if hist.empty or len(hist) < 50:
-                continue
+    # MACD
+    macd_series, macd_signal_series, _ = f.macd()
+    macd = float(macd_series.iloc[-1]) if not macd_series.empty else 0
+    macd_signal = float(macd_signal_series.iloc[-1]) if not macd_signal_series.empty else 0
 
-            # Calculate basic indicators for filtering
-            close = hist['Close']
-            volume = hist['Volume']
+    # Volume ratio
+    vol_avg = f.volume_avg(20).iloc[-1]
+    vol_ratio = float(volume.iloc[-1] / vol_avg) if vol_avg > 0 else 1.0
 
-            # RSI
-            rsi_ind = RSIIndicator(close=close, window=14)
-            rsi = float(rsi_ind.rsi().iloc[-1]) if not rsi_ind.rsi().empty else 50
+    # Filter criteria
+    if rsi > rsi_threshold:
+        return None
+    if macd < macd_signal + macd_threshold:
+        return None
+    if vol_ratio < volume_threshold:
+        return None
 
-            # MACD
-            macd_ind = MACD(close=close)
-            macd = float(macd_ind.macd().iloc[-1]) if not macd_ind.macd().empty else 0
-            macd_signal = float(macd_ind.macd_signal().iloc[-1]) if not macd_ind.macd_signal().empty else 0
+    # Get chart levels
+    levels = calculate_chart_based_levels(hist, symbol)
 
-            # Volume ratio
-            vol_avg = volume.rolling(20).mean().iloc[-1]
-            vol_ratio = float(volume.iloc[-1] / vol_avg) if vol_avg > 0 else 1.0
+    # Get pattern label
+    pattern = detect_pattern_label(hist, symbol)
 
-            # Filter criteria
-            if rsi > rsi_threshold:
-                continue
-            if macd < macd_signal + macd_threshold:
-                continue
-            if vol_ratio < volume_threshold:
-                continue
+    # Latest price
+    latest_close = float(close.iloc[-1])
 
-            # Get chart levels
-            levels = calculate_chart_based_levels(hist)
+    # Calculate risk/reward
+    stop_loss = levels["stop_loss"]
+    target = levels["target"]
+    support = levels["support"]
+    resistance = levels["resistance"]
 
-            # Get pattern label
-            pattern = detect_pattern_label(hist, symbol)
+    risk_amount = latest_close - stop_loss
+    reward_amount = target - latest_close
 
-            # Latest price
-            latest_close = float(close.iloc[-1])
+    risk_pct = (risk_amount / latest_close) * 100 if latest_close > 0 else 0
+    reward_pct = (reward_amount / latest_close) * 100 if latest_close > 0 else 0
 
-            # Calculate risk/reward
-            stop_loss = levels["stop_loss"]
-            target = levels["target"]
-            support = levels["support"]
-            resistance = levels["resistance"]
+    # Skip if risk too high
+    if risk_pct > risk_threshold:
+        return None
 
-            risk_amount = latest_close - stop_loss
-            reward_amount = target - latest_close
+    # Skip if R:R too poor (<1:1)
+    if reward_amount <= 0 or risk_amount <= 0:
+        return None
 
-            risk_pct = (risk_amount / latest_close) * 100 if latest_close > 0 else 0
-            reward_pct = (reward_amount / latest_close) * 100 if latest_close > 0 else 0
+    rr_ratio = reward_amount / risk_amount if risk_amount > 0 else 0
 
-            # Skip if risk too high
-            if risk_pct > risk_threshold:
-                continue
+    if rr_ratio < 1.0:
+        return None
 
-            # Skip if R:R too poor (<1:1)
-            if reward_amount <= 0 or risk_amount <= 0:
-                continue
+    # Determine recommendation
+    recommendation = "BUY" if macd > macd_signal else "HOLD"
 
-            rr_ratio = reward_amount / risk_amount if risk_amount > 0 else 0
+    return {
+        "symbol": symbol,
+        "recommendation": recommendation,
+        "harga_penutupan": int(latest_close),
+        "target_harga": int(target),
+        "stop_loss": int(stop_loss),
+        "support": int(support),
+        "resistance": int(resistance),
+        "keterangan": pattern,
+        "rsi": round(rsi, 1),
+        "volume_ratio": round(vol_ratio, 1),
+        "risk_reward": f"1:{rr_ratio:.1f}"
+    }
 
-            if rr_ratio < 1.0:
-                continue
 
-            # Determine recommendation
-            recommendation = "BUY" if macd > macd_signal else "HOLD"
-
-            candidates.append({
-                "symbol": symbol,
-                "recommendation": recommendation,
-                "harga_penutupan": int(latest_close),
-                "target_harga": int(target),
-                "stop_loss": int(stop_loss),
-                "support": int(support),
-                "resistance": int(resistance),
-                "keterangan": pattern,
-                "rsi": round(rsi, 1),
-                "volume_ratio": round(vol_ratio, 1),
-                "risk_reward": f"1:{rr_ratio:.1f}"
-            })
+def screen_day_trade_setups(stock_list: List[str], limit: int = 10, mode: str = "mandiri", panel: Optional[OHLCVPanel] = None) -> List[Dict[str, Any]]:
+    """
+    Screen for day trade opportunities with Mandiri-style simple criteria
+    """
+    logger.info(f"Screening {len(stock_list)} stocks for day trade setups (mode: {mode})...")
 
+    # One batched download for the whole list unless the caller shares a panel
+    thresholds = _day_trade_thresholds(mode)
+    if panel is None:
+        stock_list = _prefilter("day_trade", stock_list, thresholds)
+        panel = _load_universe(stock_list, plan_screen_period("day_trade"))
+
+    candidates = evaluate_universe(_evaluate_day_trade, "day trade", panel, stock_list, **thresholds)
+
+    # Sort by volume ratio (most active first)
+    return _rank_candidates("day_trade", candidates)[:limit]
+
+
+def _day_trade_thresholds(mode: str) -> Dict[str, float]:
+    """_evaluate_day_trade() thresholds for a screening mode (built-in or saved by the parameter sweep)"""
+    try:
+        return mode_settings("day_trade", mode)
+    except KeyError:
+        # Unknown modes screen strictly
+        return mode_settings("day_trade", "strict")
+
+
+# Per-symbol evaluators by screener, for screen_all_setups()
+SCREEN_EVALUATORS = {
+    "preopen": _evaluate_preopen,
+    "bpjs": _evaluate_bpjs,
+    "bsjp": _evaluate_bsjp,
+    "day_trade": _evaluate_day_trade,
+}
+
+
+def _evaluate_screens(symbol: str, hist: pd.DataFrame, screens: Dict[str, tuple], panel_period: str, bands: Optional[Dict[str, dict]] = None, skip: Tuple[str, ...] = ()) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Evaluate one symbol for several screeners. screens maps a screener to
+    (period, evaluator arguments); each sees the trailing window of bars its
+    own screen would load. skip lists screeners whose pre-filter dropped the
+    symbol. Returns {screener: candidate} for the matches.
+    """
+    windows = {panel_period: hist}
+    found = {}
+    for name, (period, params) in screens.items():
+        if name in skip:
+            continue
+        if period not in windows:
+            windows[period] = trim_to_period(hist, period).copy()
+        if bands is not None and params.get("enable_bandarmology"):
+            params = {**params, "band": bands.get(period)}
+        try:
+            candidate = SCREEN_EVALUATORS[name](symbol, windows[period], **params)
         except Exception as e:
-            logger.warning(f"Error screening {symbol} for day trade: {e}")
+            logger.warning(f"Error screening {symbol} for {name}: {e}")
             continue
+        if candidate:
+            found[name] = candidate
+    return found or None
 
-    # Sort by volume ratio (most active first)
-    candidates.sort(key=lambda x: x["volume_ratio"], reverse=True)
 
-    return candidates[:limit]
+def screen_all_setups(stock_list: List[str], settings: Dict[str, Dict[str, Any]], limit: Optional[int] = 10, panel: Optional[OHLCVPanel] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Run several screeners in one pass over one download. settings maps each
+    screener ("preopen", "bpjs", "bsjp", "day_trade") to its arguments as for
+    screen_<name>_setups(); returns each one's ranked candidates, the same
+    as its own screen returns them (all of them when limit is None).
+    """
+    logger.info(f"Screening {len(stock_list)} stocks for {', '.join(settings)} in one pass...")
+
+    screens = {}
+    for name, kwargs in settings.items():
+        if name == "day_trade":
+            screens[name] = (plan_screen_period(name), _day_trade_thresholds(kwargs.get("mode", "mandiri")))
+            continue
+        params = {k: kwargs[k] for k in ("min_score", "min_avg_volume", "enable_bandarmology")}
+        if name == "preopen":
+            params["global_positive"] = check_global_markets()["overall_sentiment"] == "POSITIVE"
+        screens[name] = (plan_screen_period(name, enable_bandarmology=params["enable_bandarmology"]), params)
+    band_periods = {period for period, params in screens.values() if params.get("enable_bandarmology")}
+
+    # One download long enough for every screener, of the symbols that pass
+    # at least one screener's pre-filter
+    per_symbol: Dict[str, Dict[str, Any]] = {}
+    if panel is None:
+        allowed = {name: set(_prefilter(name, stock_list, params)) for name, (_, params) in screens.items()}
+        stock_list = [s for s in stock_list if any(s in kept for kept in allowed.values())]
+        for symbol in stock_list:
+            skip = tuple(name for name, kept in allowed.items() if symbol not in kept)
+            if skip:
+                per_symbol[symbol] = {"skip": skip}
+        panel = _load_universe(stock_list, plan_screen_period(*settings, enable_bandarmology=bool(band_periods)))
+
+    # Bandarmology once per window, shared by the screeners that use it
+    for period in band_periods:
+        for symbol, kwargs in (_panel_bands(panel.trimmed(period), stock_list) or {}).items():
+            per_symbol.setdefault(symbol, {}).setdefault("bands", {})[period] = kwargs["band"]
+
+    matches = evaluate_universe(
+        _evaluate_screens, "all screens", panel, stock_list,
+        per_symbol=per_symbol, screens=screens, panel_period=panel.period,
+    )
+    return {
+        name: _rank_candidates(name, [m[name] for m in matches if name in m], params.get("enable_bandarmology", False))[:limit]
+        for name, (_, params) in screens.items()
+    }
 
 
 def format_day_trade_table(setups: List[Dict[str, Any]], session_info: Dict[str, Any]) -> str:
@@ -1608,6 +1705,12 @@ class BandarmologyRequest(BaseModel):
     period: str = Field("6mo", description="History period: 3mo, 6mo, 1y")
 
 
+FUNDAMENTAL_FIELDS = [
+    "marketCap", "trailingPE", "priceToBook", "trailingEps", "dividendYield", "totalRevenue",
+    "profitMargins", "returnOnEquity", "debtToEquity", "currentRatio", "beta",
+]
+
+
 class FundamentalsRequest(BaseModel):
     symbol: str = Field(..., description="Stock ticker symbol")
 
@@ -1626,43 +1729,395 @@ class TimeContextRequest(BaseModel):
 
 
 class StockListRequest(BaseModel):
-    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, or BOTH")
+    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, BOTH, ALL or a sector index (IDXFINANCE, IDXENERGY, ...)")
+
+
+class SymbolRefreshRequest(BaseModel):
+    stock_index: Optional[str] = Field("ALL", description="Universe to refresh (see /api/market/symbols)")
+    liquidity: bool = Field(True, description="Download a month of bars and store each symbol's liquidity")
+    sectors: bool = Field(False, description="Fill missing sectors from Ticker.info")
 
 
 class PreopenSetupsRequest(BaseModel):
-    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, or BOTH")
+    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, BOTH, ALL or a sector index (IDXFINANCE, IDXENERGY, ...)")
     limit: int = Field(10, description="Number of setups to return")
     min_score: int = Field(70, description="Minimum bandarmology score")
     min_avg_volume: int = Field(1000000, description="Minimum average volume")
     enable_bandarmology: bool = Field(True, description="Enable bandarmology analysis")
+    mode: Optional[str] = Field(None, description="Named mode from the parameter sweep (see /api/screen/modes); overrides min_score and min_avg_volume")
+    job: bool = Field(False, description="Run as a background job and return its ID (poll /api/screen/jobs/{job_id})")
 
 
 class BPJSSetupsRequest(BaseModel):
-    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, or BOTH")
+    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, BOTH, ALL or a sector index (IDXFINANCE, IDXENERGY, ...)")
     limit: int = Field(10, description="Number of setups to return")
     min_score: int = Field(65, description="Minimum bandarmology score")
     min_avg_volume: int = Field(1000000, description="Minimum average volume")
     enable_bandarmology: bool = Field(True, description="Enable bandarmology analysis")
+    mode: Optional[str] = Field(None, description="Named mode from the parameter sweep (see /api/screen/modes); overrides min_score and min_avg_volume")
+    job: bool = Field(False, description="Run as a background job and return its ID (poll /api/screen/jobs/{job_id})")
 
 
 class BSJPSetupsRequest(BaseModel):
-    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, or BOTH")
+    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, BOTH, ALL or a sector index (IDXFINANCE, IDXENERGY, ...)")
     limit: int = Field(10, description="Number of setups to return")
     min_score: int = Field(60, description="Minimum bandarmology score")
     min_avg_volume: int = Field(1000000, description="Minimum average volume")
     enable_bandarmology: bool = Field(False, description="Enable bandarmology analysis")
+    mode: Optional[str] = Field(None, description="Named mode from the parameter sweep (see /api/screen/modes); overrides min_score and min_avg_volume")
+    job: bool = Field(False, description="Run as a background job and return its ID (poll /api/screen/jobs/{job_id})")
 
 
 class DayTradeSetupsRequest(BaseModel):
-    stock_index: Optional[str] = Field(None, description="Stock index: LQ45, IDX30, or BOTH")
+    stock_index: Optional[str] = Field(None, description="Stock index: LQ45, IDX30, BOTH, ALL or a sector index (IDXFINANCE, IDXENERGY, ...)")
     limit: int = Field(10, description="Number of setups to return")
-    mode: str = Field("mandiri", description="Screening mode: mandiri or strict")
+    mode: str = Field("mandiri", description="Screening mode: mandiri, strict or a mode saved by the parameter sweep")
+    job: bool = Field(False, description="Run as a background job and return its ID (poll /api/screen/jobs/{job_id})")
+
+
+class AllSetupsRequest(BaseModel):
+    stock_index: Optional[str] = Field("BOTH", description="Stock index: LQ45, IDX30, BOTH, ALL or a sector index (IDXFINANCE, IDXENERGY, ...)")
+    limit: int = Field(10, description="Number of setups to return per strategy")
+    strategies: List[str] = Field(["preopen", "bpjs", "bsjp", "day_trade"], description="Strategies to screen: preopen, bpjs, bsjp, day_trade")
+    min_avg_volume: int = Field(1000000, description="Minimum average volume (PREOPEN, BPJS, BSJP)")
+    preopen_min_score: int = Field(70, description="Minimum bandarmology score for PREOPEN")
+    bpjs_min_score: int = Field(65, description="Minimum bandarmology score for BPJS")
+    bsjp_min_score: int = Field(60, description="Minimum bandarmology score for BSJP")
+    enable_bandarmology: bool = Field(True, description="Enable bandarmology analysis for PREOPEN and BPJS")
+    bsjp_enable_bandarmology: bool = Field(False, description="Enable bandarmology analysis for BSJP")
+    mode: str = Field("mandiri", description="Day trade screening mode: mandiri, strict or a mode saved by the parameter sweep")
+    modes: Dict[str, str] = Field({}, description="Named mode per strategy for PREOPEN, BPJS and BSJP (see /api/screen/modes)")
+    job: bool = Field(False, description="Run as a background job and return its ID (poll /api/screen/jobs/{job_id})")
+
+
+class BacktestRequest(AllSetupsRequest):
+    """Screen settings as for /api/screen/all, replayed over `period` of history"""
+    period: str = Field("2y", description="History to backtest over, e.g. 1y, 2y, 5y, max")
+    limit: int = Field(10, description="Number of most recent trades to list per strategy")
+    hold: int = Field(1, description="Bars each trade is held at most")
+    cost_pct: float = Field(0.0, description="Round-trip trading cost in percent, taken from every trade")
+
+
+# ============================================================================
+# SCHEDULED SCREEN SNAPSHOTS
+# ============================================================================
+
+# Request model per strategy; the scheduler materializes each at its defaults
+SCREEN_REQUESTS = {
+    "preopen": PreopenSetupsRequest,
+    "bpjs": BPJSSetupsRequest,
+    "bsjp": BSJPSetupsRequest,
+    "day_trade": DayTradeSetupsRequest,
+}
+
+
+def _named_mode(strategy: str, mode: Optional[str]) -> Dict[str, Any]:
+    """Settings of a PREOPEN/BPJS/BSJP mode ({} when none is asked for)"""
+    if not mode:
+        return {}
+    try:
+        return mode_settings(strategy, mode)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown {strategy} mode: {mode}")
+
+
+def _screen_settings(strategy: str, request: BaseModel) -> Dict[str, Any]:
+    """The screen_<strategy>_setups() arguments a request asks for"""
+    if strategy == "day_trade":
+        return {"mode": request.mode}
+    settings = {"min_score": request.min_score, "min_avg_volume": request.min_avg_volume, "enable_bandarmology": request.enable_bandarmology}
+    return {**settings, **_named_mode(strategy, request.mode)}
+
+
+def _all_setups_settings(request: AllSetupsRequest) -> Dict[str, Dict[str, Any]]:
+    """screen_all_setups() settings per strategy for an /api/screen/all style request"""
+    settings = {
+        "preopen": {"min_score": request.preopen_min_score, "min_avg_volume": request.min_avg_volume,
+                    "enable_bandarmology": request.enable_bandarmology},
+        "bpjs": {"min_score": request.bpjs_min_score, "min_avg_volume": request.min_avg_volume,
+                 "enable_bandarmology": request.enable_bandarmology},
+        "bsjp": {"min_score": request.bsjp_min_score, "min_avg_volume": request.min_avg_volume,
+                 "enable_bandarmology": request.bsjp_enable_bandarmology},
+        "day_trade": {"mode": request.mode},
+    }
+    for name, mode in request.modes.items():
+        if name in settings and name != "day_trade":
+            settings[name].update(_named_mode(name, mode))
+    return settings
+
+
+def materialize_screens() -> Dict[str, Any]:
+    """
+    Refresh the bar store and features for the default universe and keep
+    every strategy's full ranked candidate list at the endpoint defaults.
+    Then bring the symbol master's stats up to the latest bar for the rest
+    of the exchange (and the symbols the pre-filter skipped).
+    """
+    started = now_wib()
+    stocks = get_all_idx_stocks()
+    settings = {name: _screen_settings(name, model()) for name, model in SCREEN_REQUESTS.items()}
+    results = screen_all_setups(stocks, settings, limit=None)
+    try:
+        symbol_master.refresh_liquidity(symbol_master.stale(symbol_master.members("ALL"), started))
+    except Exception as e:
+        logger.warning(f"Could not refresh symbol stats: {e}")
+    return {"universe": stocks, "settings": settings, "results": results}
+
+
+screen_scheduler = ScreenScheduler(materialize_screens)
+
+
+def _snapshot_setups(strategy: str, stock_index: Optional[str], settings: Dict[str, Any], limit: int) -> Optional[Tuple[List[Dict[str, Any]], str]]:
+    """
+    (setups, as_of) from the current snapshot when it was computed with these
+    settings for a universe covering stock_index, else None. Candidates are
+    re-ranked in the requested universe's order, as a live screen ranks them.
+    """
+    snapshot = screen_scheduler.snapshot()
+    if snapshot is None or snapshot["data"]["settings"].get(strategy) != settings:
+        return None
+    stocks = get_all_idx_stocks(stock_index)
+    if not set(stocks) <= set(snapshot["data"]["universe"]):
+        return None
+    order = {symbol: i for i, symbol in enumerate(stocks)}
+    candidates = sorted((c for c in snapshot["data"]["results"][strategy] if c["symbol"] in order), key=lambda c: order[c["symbol"]])
+    ranked = _rank_candidates(strategy, candidates, settings.get("enable_bandarmology", False))
+    return ranked[:limit], snapshot["as_of"].isoformat()
+
+
+async def _screen_setups(strategy: str, request: BaseModel, screen: Callable[..., List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """A strategy's setups from the snapshot when it covers the request, otherwise screened now"""
+    settings = _screen_settings(strategy, request)
+    served = _snapshot_setups(strategy, request.stock_index, settings, request.limit)
+    if served is not None:
+        setups, as_of = served
+        return setups, {"as_of": as_of, "source": "snapshot"}
+    as_of = now_wib().isoformat()
+    setups = await run_blocking("screen", screen, get_all_idx_stocks(request.stock_index), limit=request.limit, **settings)
+    return setups, {"as_of": as_of, "source": "live"}
+
+
+def _setups_body(strategy: str, request: BaseModel, setups: List[Dict[str, Any]], freshness: Dict[str, str]) -> Dict[str, Any]:
+    """A single-strategy screen endpoint's response"""
+    body = {"strategy": strategy.upper(), **freshness, "count": len(setups), "setups": setups}
+    if strategy == "day_trade":
+        session_info = get_wib_time_context()
+        body.update({"mode": request.mode, "session": session_info, "table": format_day_trade_table(setups, session_info)})
+    return body
+
+
+def _all_setups_body(request: AllSetupsRequest, stocks: List[str], results: Dict[str, List[Dict[str, Any]]],
+                     freshness: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """/api/screen/all's response"""
+    strategies = {}
+    for name in dict.fromkeys(request.strategies):
+        setups = results[name]
+        strategies[name.upper()] = {**freshness[name], "count": len(setups), "setups": setups}
+    if "day_trade" in results:
+        session_info = get_wib_time_context()
+        strategies["DAY_TRADE"].update({
+            "mode": request.mode,
+            "session": session_info,
+            "table": format_day_trade_table(results["day_trade"], session_info),
+        })
+    return {
+        "universe": len(stocks),
+        "strategies": strategies
+    }
+
+
+# ============================================================================
+# STREAMED SCREENS
+# ============================================================================
+
+def stream_screens(stock_list: List[str], settings: Dict[str, Dict[str, Any]], emit: Emit, cancelled: threading.Event,
+                   first: int = STREAM_FIRST_STEP, largest: int = DOWNLOAD_CHUNK_SIZE) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    screen_all_setups() over stock_list in growing steps (screen_stream.steps()),
+    emitting every candidate once its step is screened and a progress event
+    after each step. Returns each strategy's candidates in universe order,
+    unranked; stops early, with those found so far, when cancelled is set.
+    """
+    started = time.monotonic()
+    found: Dict[str, List[Dict[str, Any]]] = {name: [] for name in settings}
+    screened = 0
+    for chunk in steps(stock_list, first, largest):
+        if cancelled.is_set():
+            logger.info(f"Streamed screen cancelled after {screened}/{len(stock_list)} stocks")
+            break
+        order = {symbol: i for i, symbol in enumerate(chunk)}
+        for name, candidates in screen_all_setups(chunk, settings, limit=None).items():
+            for candidate in sorted(candidates, key=lambda c: order[c["symbol"]]):
+                found[name].append(candidate)
+                emit({"event": "candidate", "strategy": name, "source": "live", "candidate": candidate})
+        screened += len(chunk)
+        elapsed = time.monotonic() - started
+        emit({
+            "event": "progress",
+            "screened": screened,
+            "universe": len(stock_list),
+            "found": {name: len(candidates) for name, candidates in found.items()},
+            "elapsed_s": round(elapsed, 2),
+            "eta_s": round(elapsed / screened * (len(stock_list) - screened), 1),
+        })
+    return found
+
+
+Summarize = Callable[[Dict[str, List[Dict[str, Any]]], Dict[str, Dict[str, str]]], Dict[str, Any]]
+
+
+def _single_summary(strategy: str, request: BaseModel) -> Summarize:
+    return lambda results, freshness: _setups_body(strategy, request, results[strategy], freshness[strategy])
+
+
+def _snapshot_results(request: BaseModel, strategies: List[str], settings: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Dict[str, str]]]:
+    """(results, freshness) of the strategies the snapshot covers"""
+    results, freshness = {}, {}
+    for name in strategies:
+        served = _snapshot_setups(name, request.stock_index, settings[name], request.limit)
+        if served is not None:
+            results[name] = served[0]
+            freshness[name] = {"as_of": served[1], "source": "snapshot"}
+    return results, freshness
+
+
+def _ranked(found: Dict[str, List[Dict[str, Any]]], settings: Dict[str, Dict[str, Any]], limit: Optional[int]) -> Dict[str, List[Dict[str, Any]]]:
+    """stream_screens() candidates ranked and limited as the endpoints report them"""
+    return {
+        name: _rank_candidates(name, candidates, settings[name].get("enable_bandarmology", False))[:limit]
+        for name, candidates in found.items()
+    }
+
+
+async def _stream_setups(request: BaseModel, stocks: List[str], strategies: List[str], settings: Dict[str, Dict[str, Any]],
+                         summarize: Summarize) -> AsyncIterator[Dict[str, Any]]:
+    """
+    A screen's events: start, every candidate (from the snapshot for the
+    strategies it covers, else as they are screened), progress, and finally
+    summarize(results, freshness), the endpoint's usual response, as summary
+    """
+    yield {"event": "start", "universe": len(stocks), "strategies": strategies}
+    results, freshness = _snapshot_results(request, strategies, settings)
+    for name, candidates in results.items():
+        for candidate in candidates:
+            yield {"event": "candidate", "strategy": name, "source": "snapshot", "candidate": candidate}
+    missing = [name for name in strategies if name not in results]
+    if missing:
+        as_of = now_wib().isoformat()
+        async for event in stream_events("screen", stream_screens, stocks, {name: settings[name] for name in missing}):
+            if event["event"] != "result":
+                yield event
+                if event["event"] == "error":
+                    return
+                continue
+            results.update(_ranked(event["result"], settings, request.limit))
+            freshness.update({name: {"as_of": as_of, "source": "live"} for name in missing})
+    yield {"event": "summary", **summarize(results, freshness)}
+
+
+def _screen_stream(http_request: Request, strategy: str, request: BaseModel):
+    """Streamed response of a single-strategy screen"""
+    settings = {strategy: _screen_settings(strategy, request)}
+    stocks = get_all_idx_stocks(request.stock_index)
+    return stream_response(http_request, _stream_setups(request, stocks, [strategy], settings, _single_summary(strategy, request)))
+
+
+# ============================================================================
+# SCREEN JOBS
+# ============================================================================
+
+def _job_response(kind: str, request: BaseModel, settings: Dict[str, Any], run: Callable[[Emit, threading.Event], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    With request.job, the job for this request: started now, attached to an
+    identical running one, or cached from one that finished. Without, the
+    result of an identical finished job, or None to answer as usual.
+    """
+    params = {"request": request.model_dump(exclude={"job"}), "settings": settings}
+    if not request.job:
+        return screen_jobs.cached(kind, params)
+    job, how = screen_jobs.submit(kind, params, run)
+    return {**job, "source": how, "poll": f"/api/screen/jobs/{job['job_id']}"}
+
+
+def _screen_job(kind: str, request: BaseModel, stocks: List[str], strategies: List[str], settings: Dict[str, Dict[str, Any]],
+                summarize: Summarize) -> Optional[Dict[str, Any]]:
+    """_job_response() for a screen: the snapshot where it covers, the rest screened in SCREEN_JOB_STEP steps with progress"""
+    def run(emit: Emit, cancelled: threading.Event) -> Dict[str, Any]:
+        results, freshness = _snapshot_results(request, strategies, settings)
+        missing = [name for name in strategies if name not in results]
+        if missing:
+            as_of = now_wib().isoformat()
+            found = stream_screens(stocks, {name: settings[name] for name in missing}, emit, cancelled,
+                                   first=SCREEN_JOB_STEP, largest=SCREEN_JOB_STEP)
+            results.update(_ranked(found, settings, request.limit))
+            freshness.update({name: {"as_of": as_of, "source": "live"} for name in missing})
+        return summarize(results, freshness)
+
+    return _job_response(kind, request, settings, run)
+
+
+def _single_job(strategy: str, request: BaseModel) -> Optional[Dict[str, Any]]:
+    settings = {strategy: _screen_settings(strategy, request)}
+    stocks = get_all_idx_stocks(request.stock_index)
+    return _screen_job(strategy, request, stocks, [strategy], settings, _single_summary(strategy, request))
+
+
+# ============================================================================
+# BACKTESTING
+# ============================================================================
+
+def backtest_strategies(stocks: List[str], settings: Dict[str, Dict[str, Any]], period: str = "2y",
+                        hold: int = 1, cost_pct: float = 0.0, recent: int = 0) -> Dict[str, Any]:
+    """
+    Replay screen_all_setups() settings over `period` of daily bars for the
+    universe and report each strategy's trades (see backtest.py)
+    """
+    signal_settings, periods = {}, {}
+    for name, params in settings.items():
+        if name == "day_trade":
+            signal_settings[name] = _day_trade_thresholds(params["mode"])
+            periods[name] = plan_screen_period(name)
+        else:
+            signal_settings[name] = dict(params)
+            periods[name] = plan_screen_period(name, enable_bandarmology=params["enable_bandarmology"])
+    panel = load_panel(stocks, period=period)
+    return run_backtest(panel, signal_settings, periods=periods, hold=hold, cost_pct=cost_pct, recent=recent)
+
+
+def _backtest_body(request: BacktestRequest, stocks: List[str], settings: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """/api/backtest's response"""
+    result = backtest_strategies(stocks, settings, period=request.period, hold=request.hold,
+                                 cost_pct=request.cost_pct, recent=request.limit)
+    if "day_trade" in result["strategies"]:
+        result["strategies"]["day_trade"]["mode"] = request.mode
+    return {"universe": len(stocks), "period": request.period, **result}
 
 
 # ============================================================================
 # REST API ENDPOINTS
 # ============================================================================
 
+@app.on_event("startup")
+async def prewarm_caches():
+    """Fetch Ticker.info for the index universe in the background"""
+    if os.getenv("INFO_PREWARM", "1") == "1":
+        info_cache.prewarm(get_all_idx_stocks())
+
+
+@app.on_event("startup")
+async def start_screen_scheduler():
+    """Materialize screen results at the scheduled times (SCREEN_SCHEDULE)"""
+    screen_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_screening_pool():
+    """Stop the screen scheduler, the screen jobs and the screening worker processes"""
+    screen_scheduler.stop()
+    screen_jobs.shutdown()
+    shutdown_pool()
+
+
 @app.get("/")
 @app.post("/")
 async def root():
@@ -1681,10 +2136,19 @@ async def root():
             "global_markets": "/api/market/global",
             "time_context": "/api/market/time-context",
             "stock_list": "/api/market/stock-list",
+            "symbols": "/api/market/symbols",
+            "symbols_refresh": "/api/market/symbols/refresh",
             "preopen_setups": "/api/screen/preopen",
             "bpjs_setups": "/api/screen/bpjs",
             "bsjp_setups": "/api/screen/bsjp",
             "day_trade_setups": "/api/screen/day-trade",
+            "all_setups": "/api/screen/all",
+            "screen_stream": "/api/screen/{preopen,bpjs,bsjp,day-trade,all}/stream",
+            "screen_jobs": "/api/screen/jobs",
+            "screen_snapshot": "/api/screen/snapshot",
+            "screen_snapshot_refresh": "/api/screen/snapshot/refresh",
+            "screen_modes": "/api/screen/modes",
+            "backtest": "/api/backtest",
             "get_news": "/api/news/get",
             "news_status": "/api/news/status",
             "get_news_sync": "/api/news/get/sync",
@@ -1692,7 +2156,12 @@ async def root():
             "read_news_report_json": "/api/news/read/json",
             "read_news_analyze": "/api/news/analyze",
             "read_news_check_files": "/api/news/check_files",
-        }
+        },
+        "feature_store": feature_store.stats(),
+        "indicator_state": indicator_store.stats(),
+        "screen_snapshot": screen_scheduler.status(),
+        "global_markets": global_markets.stats(),
+        "screen_jobs": screen_jobs.stats(),
     }
 
 
@@ -1701,9 +2170,8 @@ async def get_stock_price(request: StockPriceRequest):
     """Get current/latest price and basic info for Indonesian stock"""
     try:
         ticker = ensure_idx_ticker(request.symbol)
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        history = stock.history(period="1d")
+        info = await run_blocking("stock", info_cache.get, request.symbol, fields=["marketCap", "currency"])
+        history = await run_blocking("stock", get_provider().history, ticker, period="1d")
 
         if history.empty:
             raise HTTPException(status_code=404, detail=f"No data found for {request.symbol}")
@@ -1731,9 +2199,7 @@ async def get_stock_price(request: StockPriceRequest):
 async def get_historical_data(request: HistoricalDataRequest):
     """Get historical OHLCV data"""
     try:
-        ticker = ensure_idx_ticker(request.symbol)
-        stock = yf.Ticker(ticker)
-        history = stock.history(period=request.period)
+        history = await run_blocking("stock", load_history, request.symbol, period=request.period)
 
         if history.empty:
             raise HTTPException(status_code=404, detail=f"No data found for {request.symbol}")
@@ -1764,45 +2230,13 @@ async def get_historical_data(request: HistoricalDataRequest):
 async def get_technical_indicators(request: TechnicalIndicatorsRequest):
     """Calculate technical indicators (RSI, MACD, MA, Bollinger Bands)"""
     try:
-        ticker = ensure_idx_ticker(request.symbol)
-        stock = yf.Ticker(ticker)
-        history = stock.history(period=request.period)
+        history = await run_blocking("stock", load_history, request.symbol, period=request.period)
 
         if history.empty or len(history) < 50:
             raise HTTPException(status_code=404, detail="Insufficient data")
 
-        # Calculate indicators
-        close = history['Close']
-
-        rsi = RSIIndicator(close=close, window=14).rsi()
-        macd_indicator = MACD(close=close)
-        sma_20 = SMAIndicator(close=close, window=20).sma_indicator()
-        sma_50 = SMAIndicator(close=close, window=50).sma_indicator()
-        ema_12 = EMAIndicator(close=close, window=12).ema_indicator()
-        bb = BollingerBands(close=close, window=20, window_dev=2)
-
-        latest_price = float(close.iloc[-1])
-
-        return {
-            "symbol": request.symbol,
-            "current_price": latest_price,
-            "rsi": float(rsi.iloc[-1]) if not rsi.empty else None,
-            "macd": {
-                "macd": float(macd_indicator.macd().iloc[-1]),
-                "signal": float(macd_indicator.macd_signal().iloc[-1]),
-                "histogram": float(macd_indicator.macd_diff().iloc[-1]),
-            },
-            "moving_averages": {
-                "sma_20": float(sma_20.iloc[-1]),
-                "sma_50": float(sma_50.iloc[-1]),
-                "ema_12": float(ema_12.iloc[-1]),
-            },
-            "bollinger_bands": {
-                "upper": float(bb.bollinger_hband().iloc[-1]),
-                "middle": float(bb.bollinger_mavg().iloc[-1]),
-                "lower": float(bb.bollinger_lband().iloc[-1]),
-            },
-        }
+        result = await run_blocking("stock", calculate_technical_indicators, history, request.symbol)
+        return {"symbol": request.symbol, **result}
     except Exception as e:
         logger.error(f"Error calculating technicals for {request.symbol}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1812,14 +2246,12 @@ async def get_technical_indicators(request: TechnicalIndicatorsRequest):
 async def get_bandarmology(request: BandarmologyRequest):
     """Bandarmology-style analysis using OHLCV data"""
     try:
-        ticker = ensure_idx_ticker(request.symbol)
-        stock = yf.Ticker(ticker)
-        history = stock.history(period=request.period)
+        history = await run_blocking("stock", load_history, request.symbol, period=request.period)
 
         if history.empty:
             raise HTTPException(status_code=404, detail=f"No data found for {request.symbol}")
 
-        result = calculate_bandarmology(history)
+        result = await run_blocking("stock", calculate_bandarmology, history, request.symbol)
         result['symbol'] = request.symbol
 
         return result
@@ -1832,9 +2264,7 @@ async def get_bandarmology(request: BandarmologyRequest):
 async def get_fundamentals(request: FundamentalsRequest):
     """Get fundamental data (P/E, P/B, Market Cap, etc.)"""
     try:
-        ticker = ensure_idx_ticker(request.symbol)
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = await run_blocking("stock", info_cache.get, request.symbol, fields=FUNDAMENTAL_FIELDS)
 
         return {
             "symbol": request.symbol,
@@ -1859,7 +2289,7 @@ async def get_fundamentals(request: FundamentalsRequest):
 async def get_mandiri_report(request: MandiriReportRequest):
     """Get Mandiri Sekuritas-style analysis report"""
     try:
-        report = format_mandiri_style_report(request.symbol, request.period)
+        report = await run_blocking("stock", format_mandiri_style_report, request.symbol, request.period)
         return {"report": report}
     except Exception as e:
         logger.error(f"Error generating Mandiri report for {request.symbol}: {e}")
@@ -1870,7 +2300,7 @@ async def get_mandiri_report(request: MandiriReportRequest):
 async def get_global_markets(request: GlobalMarketsRequest):
     """Check global markets sentiment"""
     try:
-        result = check_global_markets()
+        result = await run_blocking("market", check_global_markets)
         return result
     except Exception as e:
         logger.error(f"Error checking global markets: {e}")
@@ -1903,23 +2333,46 @@ async def get_stock_list(request: StockListRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/market/symbols")
+async def get_symbols():
+    """Universes of the symbol master (member counts) and its coverage"""
+    return {
+        "indices": symbol_master.indices(),
+        "sectors": SECTOR_INDICES,
+        "stats": symbol_master.stats(),
+    }
+
+
+@app.post("/api/market/symbols/refresh")
+async def refresh_symbols(request: SymbolRefreshRequest):
+    """Refresh the symbol master's liquidity stats and/or sectors for a universe"""
+    try:
+        stocks = symbol_master.members(request.stock_index or "ALL")
+        if not stocks:
+            raise HTTPException(status_code=404, detail=f"Unknown or empty index: {request.stock_index}")
+        if request.sectors:
+            await run_blocking("market", symbol_master.refresh_sectors, stocks)
+        if request.liquidity:
+            await run_blocking("market", symbol_master.refresh_liquidity, stocks)
+        return {"index": request.stock_index, "count": len(stocks), "stats": symbol_master.stats()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error refreshing symbols: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/screen/preopen")
 async def screen_preopen(request: PreopenSetupsRequest):
     """Screen for PRE-OPEN setups (analyzed malem kemarin, execute di 08:45-08:58)"""
     try:
-        stocks = get_all_idx_stocks(request.stock_index)
-        setups = screen_preopen_setups(
-            stocks,
-            limit=request.limit,
-            min_score=request.min_score,
-            min_avg_volume=request.min_avg_volume,
-            enable_bandarmology=request.enable_bandarmology
-        )
-        return {
-            "strategy": "PREOPEN",
-            "count": len(setups),
-            "setups": setups
-        }
+        body = _single_job("preopen", request)
+        if body is not None:
+            return body
+        setups, freshness = await _screen_setups("preopen", request, screen_preopen_setups)
+        return _setups_body("preopen", request, setups, freshness)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error screening preopen setups: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1929,19 +2382,13 @@ async def screen_preopen(request: PreopenSetupsRequest):
 async def screen_bpjs(request: BPJSSetupsRequest):
     """Screen for BPJS (Beli Pagi Jual Sore) setups"""
     try:
-        stocks = get_all_idx_stocks(request.stock_index)
-        setups = screen_bpjs_setups(
-            stocks,
-            limit=request.limit,
-            min_score=request.min_score,
-            min_avg_volume=request.min_avg_volume,
-            enable_bandarmology=request.enable_bandarmology
-        )
-        return {
-            "strategy": "BPJS",
-            "count": len(setups),
-            "setups": setups
-        }
+        body = _single_job("bpjs", request)
+        if body is not None:
+            return body
+        setups, freshness = await _screen_setups("bpjs", request, screen_bpjs_setups)
+        return _setups_body("bpjs", request, setups, freshness)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error screening BPJS setups: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1951,19 +2398,13 @@ async def screen_bpjs(request: BPJSSetupsRequest):
 async def screen_bsjp(request: BSJPSetupsRequest):
     """Screen for BSJP (Beli Sore Jual Pagi) setups"""
     try:
-        stocks = get_all_idx_stocks(request.stock_index)
-        setups = screen_bsjp_setups(
-            stocks,
-            limit=request.limit,
-            min_score=request.min_score,
-            min_avg_volume=request.min_avg_volume,
-            enable_bandarmology=request.enable_bandarmology
-        )
-        return {
-            "strategy": "BSJP",
-            "count": len(setups),
-            "setups": setups
-        }
+        body = _single_job("bsjp", request)
+        if body is not None:
+            return body
+        setups, freshness = await _screen_setups("bsjp", request, screen_bsjp_setups)
+        return _setups_body("bsjp", request, setups, freshness)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error screening BSJP setups: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1973,27 +2414,161 @@ async def screen_bsjp(request: BSJPSetupsRequest):
 async def screen_day_trade(request: DayTradeSetupsRequest):
     """Screen for day trade opportunities with Mandiri-style criteria"""
     try:
+        body = _single_job("day_trade", request)
+        if body is not None:
+            return body
+        setups, freshness = await _screen_setups("day_trade", request, screen_day_trade_setups)
+        return _setups_body("day_trade", request, setups, freshness)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error screening day trade setups: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/screen/all")
+async def screen_all(request: AllSetupsRequest):
+    """Screen PREOPEN, BPJS, BSJP and day trade setups in one pass over one download"""
+    try:
+        unknown = [s for s in request.strategies if s not in SCREEN_EVALUATORS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown strategies: {', '.join(unknown)}")
+        settings = _all_setups_settings(request)
         stocks = get_all_idx_stocks(request.stock_index)
-        session_info = get_wib_time_context()
-        setups = screen_day_trade_setups(
-            stocks,
-            limit=request.limit,
-            mode=request.mode
-        )
+        strategies = list(dict.fromkeys(request.strategies))
+        body = _screen_job("all", request, stocks, strategies, settings,
+                           lambda results, freshness: _all_setups_body(request, stocks, results, freshness))
+        if body is not None:
+            return body
+
+        # Strategies the snapshot covers are served from it, the rest screened now
+        results, freshness = _snapshot_results(request, strategies, settings)
+        missing = [name for name in strategies if name not in results]
+        if missing:
+            as_of = now_wib().isoformat()
+            results.update(await run_blocking(
+                "screen",
+                screen_all_setups,
+                stocks,
+                {name: settings[name] for name in missing},
+                limit=request.limit
+            ))
+            freshness.update({name: {"as_of": as_of, "source": "live"} for name in missing})
+        return _all_setups_body(request, stocks, results, freshness)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error screening all setups: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Format as table if requested
-        table = format_day_trade_table(setups, session_info)
 
-        return {
-            "strategy": "DAY_TRADE",
-            "mode": request.mode,
-            "session": session_info,
-            "count": len(setups),
-            "setups": setups,
-            "table": table
-        }
+@app.post("/api/screen/preopen/stream")
+async def screen_preopen_stream(request: PreopenSetupsRequest, http_request: Request):
+    """/api/screen/preopen streamed: candidates as they are found, progress, then the usual response"""
+    return _screen_stream(http_request, "preopen", request)
+
+
+@app.post("/api/screen/bpjs/stream")
+async def screen_bpjs_stream(request: BPJSSetupsRequest, http_request: Request):
+    """/api/screen/bpjs streamed: candidates as they are found, progress, then the usual response"""
+    return _screen_stream(http_request, "bpjs", request)
+
+
+@app.post("/api/screen/bsjp/stream")
+async def screen_bsjp_stream(request: BSJPSetupsRequest, http_request: Request):
+    """/api/screen/bsjp streamed: candidates as they are found, progress, then the usual response"""
+    return _screen_stream(http_request, "bsjp", request)
+
+
+@app.post("/api/screen/day-trade/stream")
+async def screen_day_trade_stream(request: DayTradeSetupsRequest, http_request: Request):
+    """/api/screen/day-trade streamed: candidates as they are found, progress, then the usual response"""
+    return _screen_stream(http_request, "day_trade", request)
+
+
+@app.post("/api/screen/all/stream")
+async def screen_all_stream(request: AllSetupsRequest, http_request: Request):
+    """/api/screen/all streamed: candidates of every strategy as they are found, progress, then the usual response"""
+    unknown = [s for s in request.strategies if s not in SCREEN_EVALUATORS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown strategies: {', '.join(unknown)}")
+    stocks = get_all_idx_stocks(request.stock_index)
+    return stream_response(http_request, _stream_setups(
+        request, stocks, list(dict.fromkeys(request.strategies)), _all_setups_settings(request),
+        lambda results, freshness: _all_setups_body(request, stocks, results, freshness),
+    ))
+
+
+@app.get("/api/screen/snapshot")
+async def get_screen_snapshot():
+    """Schedule and freshness of the materialized screen results"""
+    return screen_scheduler.status()
+
+
+@app.post("/api/screen/snapshot/refresh")
+async def refresh_screen_snapshot():
+    """Materialize the screen results now instead of waiting for the schedule"""
+    try:
+        if not await run_blocking("screen", screen_scheduler.refresh):
+            raise HTTPException(status_code=409, detail=screen_scheduler.last_error or "A refresh is already running")
+        return screen_scheduler.status()
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error screening day trade setups: {e}")
+        logger.error(f"Error refreshing screen snapshot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/screen/jobs")
+async def list_screen_jobs():
+    """Screen and backtest jobs that are queued, running or kept with their result"""
+    return {"jobs": screen_jobs.list(), "stats": screen_jobs.stats()}
+
+
+@app.get("/api/screen/jobs/{job_id}")
+async def get_screen_job(job_id: str):
+    """A job's status and progress, with the endpoint's response once it is done"""
+    job = screen_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+
+@app.delete("/api/screen/jobs/{job_id}")
+async def cancel_screen_job(job_id: str):
+    """Stop a queued or running job (it ends after its current step)"""
+    job = screen_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+
+@app.get("/api/screen/modes")
+async def get_screen_modes():
+    """Named threshold modes per strategy: built-in and saved by the parameter sweep"""
+    return list_modes()
+
+
+@app.post("/api/backtest")
+async def backtest(request: BacktestRequest):
+    """Hit rate, expectancy and drawdown of the screening strategies over past data"""
+    try:
+        unknown = [s for s in request.strategies if s not in SCREEN_EVALUATORS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown strategies: {', '.join(unknown)}")
+        if request.hold < 1:
+            raise HTTPException(status_code=400, detail="hold must be at least 1 bar")
+        settings = _all_setups_settings(request)
+        settings = {name: settings[name] for name in dict.fromkeys(request.strategies)}
+        stocks = get_all_idx_stocks(request.stock_index)
+        body = _job_response("backtest", request, settings, lambda emit, cancelled: _backtest_body(request, stocks, settings))
+        if body is not None:
+            return body
+        return await run_blocking("screen", _backtest_body, request, stocks, settings)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running backtest: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2035,7 +2610,7 @@ async def get_news_sync(request: GetNewsRequest):
         )
 
     try:
-        output = run_pipeline(request)
+        output = await run_blocking("news", run_pipeline, request)
 
         return {
             "status": "completed",
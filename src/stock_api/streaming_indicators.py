@@ -0,0 +1,716 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicators: indicator state updated one bar at a time
+
+The feature store and panel_indicators recompute each indicator over the
+whole history. The classes here keep only what an indicator needs to take
+the next bar (an EMA's last value, Wilder's running averages, the last N
+inputs of a rolling window, cumulative flow totals), so updating a symbol
+after the close costs a few dozen float operations instead of a pass over
+its history.
+
+Every update repeats the ta/pandas arithmetic for that step (pandas' ewm and
+rolling mean/variance kernels, ta's ATR recursion and 14-bar money-flow
+sums), so a state fed the same bars as a batch computation returns the same
+values. Like the batch series, the values depend on the first bar fed.
+
+IndicatorStore keeps one IndicatorSet per (symbol, interval), saved as JSON
+next to the bar store's files and resumed on the next refresh. Only bars the
+bar store no longer re-downloads go into the saved state; the last
+SETTLE_BARS are replayed on a copy each time, so a revised intraday bar
+never leaks into it. A history that no longer contains the saved state's
+last bar unchanged (a re-adjusted series) is replayed from its first bar.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BAR_STORE_DIR, OHLCV_FIELDS
+from market_data import OHLCVPanel, ensure_idx_ticker
+
+logger = logging.getLogger("idx-stock-api")
+
+# Screeners read bandarmology from the saved state instead of the panel
+STREAMING_INDICATORS = os.getenv("STREAMING_INDICATORS", "0") == "1"
+INDICATOR_STATE_DIR = os.getenv("INDICATOR_STATE_DIR", BAR_STORE_DIR)
+
+STATE_VERSION = 1
+SETTLE_BARS = 2  # trailing bars a tail refresh re-downloads (BarStore.plan)
+LOOKBACK = 10  # slope window, as in _slope()
+
+NAN = float("nan")
+
+
+def _div(a: float, b: float) -> float:
+    """a / b with numpy's inf/NaN results instead of ZeroDivisionError"""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _nanmean(values: Iterable[float]) -> float:
+    """Series.mean(): NaN-skipping sum (numpy's summation order) over the count"""
+    x = np.array(values, dtype=np.float64)
+    missing = np.isnan(x)
+    count = x.size - int(missing.sum())
+    if count == 0:
+        return NAN
+    x[missing] = 0.0
+    return float(x.sum() / count)
+
+
+def _slope(first: float, last: float) -> float:
+    denom = abs(first) if abs(first) > 1e-9 else 1.0
+    return (last - first) / denom
+
+
+# ============================================================================
+# INDICATORS
+# ============================================================================
+
+_TYPES: Dict[str, type] = {}
+
+
+class StreamingIndicator:
+    """Base class: state() / restore() round-trip an indicator through JSON, copy() clones it"""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _TYPES[cls.__name__] = cls
+
+    def copy(self) -> "StreamingIndicator":
+        # Fields are floats, tuples, lists or deques of those, or nested indicators
+        clone = object.__new__(type(self))
+        for key, value in vars(self).items():
+            if isinstance(value, StreamingIndicator):
+                value = value.copy()
+            elif isinstance(value, deque):
+                value = deque(value, maxlen=value.maxlen)
+            elif isinstance(value, list):
+                value = list(value)
+            clone.__dict__[key] = value
+        return clone
+
+    def state(self) -> dict:
+        return {"type": type(self).__name__, "fields": {k: _encode(v) for k, v in vars(self).items()}}
+
+    @staticmethod
+    def restore(state: dict) -> "StreamingIndicator":
+        indicator = object.__new__(_TYPES[state["type"]])
+        indicator.__dict__.update({k: _decode(v) for k, v in state["fields"].items()})
+        return indicator
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, StreamingIndicator):
+        return value.state()
+    if isinstance(value, deque):
+        return {"deque": [_encode(v) for v in value], "maxlen": value.maxlen}
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "deque" in value:
+            return deque((_decode(v) for v in value["deque"]), maxlen=value["maxlen"])
+        return StreamingIndicator.restore(value)
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+class EMA(StreamingIndicator):
+    """Series.ewm(span=window or alpha=alpha, adjust=False).mean(), as in ta"""
+
+    def __init__(self, window: Optional[int] = None, alpha: Optional[float] = None, min_periods: Optional[int] = None):
+        # pandas converts span/alpha to a center of mass and back
+        com = (window - 1) / 2.0 if window is not None else (1 - alpha) / alpha
+        self.alpha = 1.0 / (1.0 + com)
+        self.min_periods = max(window if min_periods is None else min_periods, 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        observed = x == x
+        self.nobs += int(observed)
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if observed:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif observed:
+            self.weighted = x
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class RSI(StreamingIndicator):
+    """ta's RSIIndicator: Wilder-smoothed gains over losses"""
+
+    def __init__(self, window: int = 14):
+        self.prev_close = NAN
+        self.gain = EMA(alpha=1 / window, min_periods=window)
+        self.loss = EMA(alpha=1 / window, min_periods=window)
+
+    def update(self, close: float) -> float:
+        diff = close - self.prev_close  # NaN on the first bar, counted as no change
+        self.gain.update(diff if diff > 0 else 0.0)
+        self.loss.update(-(diff if diff < 0 else 0.0))
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        loss = self.loss.value
+        if loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + _div(self.gain.value, loss)))
+
+
+class MACD(StreamingIndicator):
+    """ta's MACD: (macd, signal, histogram)"""
+
+    def __init__(self, window_fast: int = 12, window_slow: int = 26, window_sign: int = 9):
+        self.fast = EMA(window_fast)
+        self.slow = EMA(window_slow)
+        self.signal = EMA(window_sign)
+        self.macd = NAN
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        self.macd = self.fast.update(close) - self.slow.update(close)
+        self.signal.update(self.macd)
+        return self.value
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        signal = self.signal.value
+        return self.macd, signal, self.macd - signal
+
+
+class RollingMean(StreamingIndicator):
+    """Series.rolling(window).mean() with pandas' compensated add/remove"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.sum = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_run = 0
+        self.prev = None
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.comp_remove
+                t = self.sum + y
+                self.comp_remove = t - self.sum - y
+                self.sum = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+        self.values.append(x)
+        if self.prev is None:
+            self.prev = x
+        if x == x:
+            self.nobs += 1
+            y = x - self.comp_add
+            t = self.sum + y
+            self.comp_add = t - self.sum - y
+            self.sum = t
+            if math.copysign(1.0, x) < 0:
+                self.neg_ct += 1
+            # pandas returns the value itself over a run of equal values
+            self.same_run = self.same_run + 1 if x == self.prev else 1
+            self.prev = x
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.nobs < self.window:
+            return NAN
+        if self.same_run >= self.nobs:
+            return self.prev
+        result = self.sum / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class RollingStd(StreamingIndicator):
+    """Series.rolling(window).std(ddof=0): pandas' Welford update with Kahan compensation"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_run = 0
+        self.prev = None
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if old == old:
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean - self.comp_remove
+                    y = old - self.comp_remove
+                    t = y - self.mean
+                    self.comp_remove = t + self.mean - y
+                    self.mean = self.mean - t / self.nobs
+                    self.ssqdm = self.ssqdm - (old - prev_mean) * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+        self.values.append(x)
+        if self.prev is None:
+            self.prev = x
+        if x == x:
+            self.nobs += 1
+            self.same_run = self.same_run + 1 if x == self.prev else 1
+            self.prev = x
+            prev_mean = self.mean - self.comp_add
+            y = x - self.comp_add
+            t = y - self.mean
+            self.comp_add = t + self.mean - y
+            self.mean = self.mean + t / self.nobs
+            self.ssqdm = self.ssqdm + (x - prev_mean) * (x - self.mean)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.nobs < self.window:
+            return NAN
+        if self.nobs == 1 or self.same_run >= self.nobs:
+            return 0.0
+        variance = self.ssqdm / self.nobs
+        return math.sqrt(variance) if variance >= 0 else 0.0
+
+
+class RollingMax(StreamingIndicator):
+    """Series.rolling(window).max()"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+
+    def _pick(self, values):
+        return max(values)
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        observed = [v for v in self.values if v == v]
+        return self._pick(observed) if len(observed) >= self.window else NAN
+
+
+class RollingMin(RollingMax):
+    """Series.rolling(window).min()"""
+
+    def _pick(self, values):
+        return min(values)
+
+
+class Bollinger(StreamingIndicator):
+    """ta's BollingerBands: (upper, middle, lower)"""
+
+    def __init__(self, window: int = 20, window_dev: int = 2):
+        self.window_dev = window_dev
+        self.mavg = RollingMean(window)
+        self.mstd = RollingStd(window)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        self.mavg.update(close)
+        self.mstd.update(close)
+        return self.value
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        mavg, mstd = self.mavg.value, self.mstd.value
+        return mavg + self.window_dev * mstd, mavg, mavg - self.window_dev * mstd
+
+
+class ATR(StreamingIndicator):
+    """ta's AverageTrueRange: 0 until the mean of the first `window` true ranges, then Wilder's recursion"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.prev_close = NAN
+        self.seed = []
+        self.atr = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        ranges = [r for r in (high - low, abs(high - self.prev_close), abs(low - self.prev_close)) if r == r]
+        true_range = max(ranges) if ranges else NAN
+        self.prev_close = close
+        if self.seed is not None:
+            self.seed.append(true_range)
+            if len(self.seed) == self.window:
+                self.atr = float(pd.Series(self.seed).mean())
+                self.seed = None
+        else:
+            self.atr = (self.atr * (self.window - 1) + true_range) / float(self.window)
+        return self.atr
+
+    @property
+    def value(self) -> float:
+        return self.atr
+
+
+class _CumulativeSum(StreamingIndicator):
+    """Series.cumsum(): NaN inputs add nothing and read as NaN"""
+
+    def __init__(self):
+        self.total = None
+        self.value = NAN
+
+    def add(self, x: float) -> float:
+        step = x if x == x else 0.0
+        self.total = step if self.total is None else self.total + step
+        self.value = self.total if x == x else NAN
+        return self.value
+
+
+class OBV(_CumulativeSum):
+    """ta's OnBalanceVolumeIndicator"""
+
+    def __init__(self):
+        super().__init__()
+        self.prev_close = NAN
+
+    def update(self, close: float, volume: float) -> float:
+        signed = -volume if close < self.prev_close else volume
+        self.prev_close = close
+        return self.add(signed)
+
+
+class ADL(_CumulativeSum):
+    """ta's AccDistIndexIndicator"""
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        clv = _div((close - low) - (high - close), high - low)
+        return self.add((clv if clv == clv else 0.0) * volume)
+
+
+class VPT(_CumulativeSum):
+    """ta's VolumePriceTrendIndicator"""
+
+    def __init__(self):
+        super().__init__()
+        self.prev_close = NAN
+
+    def update(self, close: float, volume: float) -> float:
+        change = _div(close, self.prev_close) - 1
+        self.prev_close = close
+        return self.add(change * volume)
+
+
+class MFI(StreamingIndicator):
+    """ta's MFIIndicator"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.prev_tp = NAN
+        self.flows = deque(maxlen=window)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        typical_price = (high + low + close) / 3.0
+        direction = 1 if typical_price > self.prev_tp else -1 if typical_price < self.prev_tp else 0
+        self.prev_tp = typical_price
+        self.flows.append(typical_price * volume * direction)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.flows) < self.window:
+            return NAN
+        x = np.array(self.flows)
+        if np.isnan(x).any():
+            return NAN
+        positive = np.sum(np.where(x >= 0.0, x, 0.0))
+        negative = abs(np.sum(np.where(x < 0.0, x, 0.0)))
+        return 100 - (100 / (1 + _div(float(positive), float(negative))))
+
+
+# ============================================================================
+# PER-SYMBOL STATE
+# ============================================================================
+
+class IndicatorSet(StreamingIndicator):
+    """
+    Every indicator the API reads for one symbol, fed bar by bar: the
+    technicals (RSI, MACD, SMA/EMA, Bollinger, ATR) and what
+    calculate_bandarmology() scores (flow indicators and their 10-bar
+    slopes, MFI, volume ratios, 20-day range).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.last_ts = None  # ns since epoch (UTC) of the last bar fed
+        self.bar = (NAN, NAN, NAN, NAN, NAN)
+        self.volume_seen = False
+        self.rsi14 = RSI(14)
+        self.macd = MACD()
+        self.sma20 = RollingMean(20)
+        self.sma50 = RollingMean(50)
+        self.ema12 = EMA(12)
+        self.ema20 = EMA(20)
+        self.bollinger = Bollinger(20, 2)
+        self.atr14 = ATR(14)
+        self.obv = OBV()
+        self.adl = ADL()
+        self.vpt = VPT()
+        self.mfi14 = MFI(14)
+        self.volume_avg20 = RollingMean(20)
+        self.high20 = RollingMax(20)
+        self.low20 = RollingMin(20)
+        self.flows = deque(maxlen=LOOKBACK)  # (obv, adl, vpt, mfi) per bar
+        self.vol_ratios = deque(maxlen=5)
+        self.ranges = deque(maxlen=14)
+
+    def update(self, ts: int, open_: float, high: float, low: float, close: float, volume: float):
+        self.count += 1
+        self.last_ts = ts
+        self.bar = (open_, high, low, close, volume)
+        self.volume_seen = self.volume_seen or (volume == volume and volume != 0)
+
+        self.rsi14.update(close)
+        self.macd.update(close)
+        self.sma20.update(close)
+        self.sma50.update(close)
+        self.ema12.update(close)
+        self.ema20.update(close)
+        self.bollinger.update(close)
+        self.atr14.update(high, low, close)
+        self.high20.update(high)
+        self.low20.update(low)
+
+        vol_avg = self.volume_avg20.update(volume)
+        self.vol_ratios.append(volume / (vol_avg if vol_avg != 0 else 1e-6))
+        self.ranges.append(high - low)
+        self.flows.append((
+            self.obv.update(close, volume),
+            self.adl.update(high, low, close, volume),
+            self.vpt.update(close, volume),
+            self.mfi14.update(high, low, close, volume),
+        ))
+
+    def technicals(self) -> Dict[str, Any]:
+        """Latest values in calculate_technical_indicators()'s layout"""
+        macd, signal, histogram = self.macd.value
+        upper, middle, lower = self.bollinger.value
+        return {
+            "current_price": self.bar[3],
+            "rsi": self.rsi14.value,
+            "macd": {"macd": macd, "signal": signal, "histogram": histogram},
+            "moving_averages": {"sma_20": self.sma20.value, "sma_50": self.sma50.value, "ema_12": self.ema12.value},
+            "bollinger_bands": {"upper": upper, "middle": middle, "lower": lower},
+        }
+
+    def bandarmology_inputs(self) -> Dict[str, Any]:
+        """The latest-bar quantities calculate_bandarmology() scores (score_bandarmology's arguments)"""
+        open_, high, low, close, volume = self.bar
+        vol_avg = self.volume_avg20.value
+
+        latest = self.vol_ratios[-1]
+        latest_vol_ratio = float(latest) if latest == latest and vol_avg > 0 else 1.0
+        recent = _nanmean(self.vol_ratios)
+        recent_vol_ratio = recent if recent == recent and vol_avg > 0 else 1.0
+
+        if len(self.flows) == LOOKBACK and self.count >= LOOKBACK:
+            first, last = self.flows[0], self.flows[-1]
+            obv_slope, adl_slope, vpt_slope = (_slope(first[i], last[i]) for i in range(3))
+            # The batch path back-fills MFI gaps and treats a trailing gap as 50
+            mfi_first = next((row[3] for row in self.flows if row[3] == row[3]), 50.0)
+            mfi_slope = _slope(mfi_first, last[3] if last[3] == last[3] else 50.0)
+        else:
+            obv_slope = adl_slope = vpt_slope = mfi_slope = 0.0
+        mfi = self.mfi14.value
+
+        atr = self.atr14.value
+        if not (atr == atr and atr > 0):
+            recent_range = _nanmean(self.ranges)
+            atr = recent_range if recent_range > 0 else close * 0.02
+
+        rng = high - low
+        body_ratio = abs(close - open_) / (rng if rng != 0 else 1e-6)
+        ema20, sma50 = self.ema20.value, self.sma50.value
+        return {
+            "close": close,
+            "high_20": self.high20.value,
+            "low_20": self.low20.value,
+            "ema20_now": ema20 if ema20 == ema20 else close,
+            "sma50_now": sma50 if self.count >= 50 and sma50 == sma50 else None,
+            "atr_now": atr,
+            "latest_vol_ratio": latest_vol_ratio,
+            "recent_vol_ratio": recent_vol_ratio,
+            "obv_slope": obv_slope,
+            "adl_slope": adl_slope,
+            "vpt_slope": vpt_slope,
+            "latest_mfi": mfi if mfi == mfi else 50.0,
+            "mfi_slope": mfi_slope,
+            "latest_body_ratio": body_ratio if body_ratio == body_ratio else 0.0,
+            "last_range": rng if rng == rng else 0.0,
+        }
+
+
+# ============================================================================
+# PERSISTENCE
+# ============================================================================
+
+def _bars(hist: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(int64 ns timestamps, float rows of OHLCV) for the traded bars of hist"""
+    hist = hist.dropna(subset=["Close"])
+    return hist.index.asi8, hist[OHLCV_FIELDS].to_numpy(dtype=np.float64)
+
+
+class IndicatorStore:
+    def __init__(self, root: Optional[str] = INDICATOR_STATE_DIR):
+        self.root = root or None  # None keeps state in memory only
+        self._settled: Dict[Tuple[str, str], IndicatorSet] = {}
+        self._lock = threading.Lock()
+        self.resumed = 0
+        self.rebuilt = 0
+        self.bars_fed = 0
+
+    def _path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, interval, f"{ticker}.indicators.json")
+
+    def _load(self, ticker: str, interval: str) -> Optional[IndicatorSet]:
+        with self._lock:
+            state = self._settled.get((ticker, interval))
+        if state is not None or self.root is None:
+            return state
+        try:
+            with open(self._path(ticker, interval), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("version") != STATE_VERSION:
+                return None
+            state = StreamingIndicator.restore(saved["state"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Discarding indicator state for {ticker}: {e}")
+            return None
+        with self._lock:
+            self._settled[(ticker, interval)] = state
+        return state
+
+    def _save(self, ticker: str, interval: str, state: IndicatorSet):
+        with self._lock:
+            self._settled[(ticker, interval)] = state
+        if self.root is None:
+            return
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so a crash never leaves a half-written state
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": STATE_VERSION, "state": state.state()}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not save indicator state for {ticker}: {e}")
+
+    def refresh(self, symbol: str, hist: pd.DataFrame, interval: str = "1d") -> Optional[IndicatorSet]:
+        """
+        Indicator state through the last bar of hist (None for no bars),
+        resuming the saved state when hist continues it. The returned set
+        is shared and must not be updated by the caller.
+        """
+        ts, bars = _bars(hist)
+        return self._refresh(ensure_idx_ticker(symbol), interval, ts, bars)
+
+    def _refresh(self, ticker: str, interval: str, ts: np.ndarray, bars: np.ndarray) -> Optional[IndicatorSet]:
+        if len(ts) == 0:
+            return None
+        settled = self._load(ticker, interval)
+        start, save = 0, True
+        if settled is not None:
+            pos = int(np.searchsorted(ts, settled.last_ts))
+            if settled.last_ts > ts[-1]:
+                # An older window than the saved state: answer it without saving
+                settled, save = None, False
+            elif pos < len(ts) and ts[pos] == settled.last_ts and bars[pos, 3] == settled.bar[3]:
+                start = pos + 1
+                self.resumed += 1
+            else:
+                settled = None
+                self.rebuilt += 1
+        else:
+            self.rebuilt += 1
+        settled = IndicatorSet() if settled is None else settled
+        self.bars_fed += len(ts) - start
+
+        settle_end = max(start, len(ts) - SETTLE_BARS)
+        if settle_end > start:
+            settled = settled.copy() if start else settled  # the cached set may be shared with callers
+            for i in range(start, settle_end):
+                settled.update(int(ts[i]), *bars[i].tolist())
+            if save:
+                self._save(ticker, interval, settled)
+
+        if settle_end == len(ts):
+            return settled
+        current = settled.copy()
+        for i in range(settle_end, len(ts)):
+            current.update(int(ts[i]), *bars[i].tolist())
+        return current
+
+    def refresh_panel(self, panel: OHLCVPanel, symbols: Iterable[str]) -> Dict[str, IndicatorSet]:
+        """refresh() for each symbol's panel history; symbols without bars are left out"""
+        symbols = [s for s in symbols if s in panel]
+        frame = panel.frame.sort_index()
+        columns = pd.MultiIndex.from_product([symbols, OHLCV_FIELDS])
+        dense = frame.reindex(columns=columns).to_numpy(dtype=np.float64, na_value=np.nan)
+        dense = dense.reshape(len(frame.index), len(symbols), len(OHLCV_FIELDS))
+        ts = frame.index.asi8
+
+        result = {}
+        for j, symbol in enumerate(symbols):
+            traded = ~np.isnan(dense[:, j, OHLCV_FIELDS.index("Close")])
+            state = self._refresh(ensure_idx_ticker(symbol), panel.interval, ts[traded], dense[traded, j])
+            if state is not None:
+                result[symbol] = state
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            symbols = len(self._settled)
+        return {"symbols": symbols, "resumed": self.resumed, "rebuilt": self.rebuilt, "bars_fed": self.bars_fed}
+
+    def clear(self):
+        with self._lock:
+            self._settled.clear()
+
+
+# Shared store; INDICATOR_STATE_DIR="" keeps the state in memory only
+indicator_store = IndicatorStore()
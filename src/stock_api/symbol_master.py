@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Symbol Master: every IDX symbol with its sector, index membership, listing
+status and liquidity
+
+The API used to know only the hard-coded LQ45 and IDX30 lists. The symbol
+master is a table on disk (SYMBOL_MASTER_FILE, CSV) held in memory, one row
+per symbol:
+- name, sector (IDX-IC), board, status (listed, suspended, delisted)
+- indices the symbol belongs to (";"-separated)
+- latest-bar stats, updated after every close: 20-day average volume and
+  value, last close, ATR% (14), closing strength and volume ratio, and when
+  they were measured
+
+It answers universes by name: ALL (every listed symbol), an index whose
+members were imported or seeded (LQ45, IDX30), or a sector index
+(IDXFINANCE, IDXENERGY, ...), whose members are the listed symbols of that
+sector. Rows come from IDX's listed-company export or index member lists
+(import_file()), sectors from Ticker.info, and liquidity from the bars the
+screens load anyway (observe()) or an explicit refresh_liquidity().
+
+Screens prune the universe with these stats before any history is
+downloaded, a cheap-first cascade in the order of their own checks
+(prefilter()):
+1. average volume/value far below the screen's minimum (PREFILTER_MARGIN),
+   for stats younger than LIQUIDITY_MAX_AGE_DAYS; the exact check still
+   runs on fresh bars, the margin only keeps a symbol whose volume jumped
+   since it was measured
+2. the screen's latest-bar cutoffs (closing strength, volume ratio), exact,
+   but only while no bar can have been added since the stats were measured
+   (screen_scheduler.valid_until(): until the next session opens)
+Symbols without stats are always kept.
+
+  python src/stock_api/symbol_master.py --import daftar_saham.csv --complete
+  python src/stock_api/symbol_master.py --import lq45.csv --index LQ45
+  python src/stock_api/symbol_master.py --refresh_liquidity --refresh_sectors
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_store import OHLCV_FIELDS
+from market_data import OHLCVPanel
+from screen_scheduler import WIB, now_wib, valid_until
+
+logger = logging.getLogger("idx-stock-api")
+
+SYMBOL_MASTER_FILE = os.getenv("SYMBOL_MASTER_FILE", "data/symbol_master.csv")
+# Stored liquidity older than this is ignored by the pre-filter
+LIQUIDITY_MAX_AGE_DAYS = int(os.getenv("LIQUIDITY_MAX_AGE_DAYS", "7"))
+# A symbol is pre-filtered out below this fraction of the screen's minimum
+PREFILTER_MARGIN = float(os.getenv("PREFILTER_MARGIN", "0.5"))
+
+COLUMNS = ["symbol", "name", "sector", "board", "status", "indices", "listed_date",
+           "avg_volume", "avg_value", "last_close", "atr_pct", "closing_strength", "volume_ratio", "stats_as_of"]
+# Numeric stats, as float arrays in table()
+STATS = ["avg_volume", "avg_value", "last_close", "atr_pct", "closing_strength", "volume_ratio"]
+
+# IDX-IC sector indices and the sector whose listed symbols they hold
+SECTOR_INDICES = {
+    "IDXENERGY": "Energy",
+    "IDXBASIC": "Basic Materials",
+    "IDXINDUST": "Industrials",
+    "IDXNONCYC": "Consumer Non-Cyclicals",
+    "IDXCYCLIC": "Consumer Cyclicals",
+    "IDXHEALTH": "Healthcare",
+    "IDXFINANCE": "Financials",
+    "IDXPROPERT": "Properties & Real Estate",
+    "IDXTECHNO": "Technology",
+    "IDXINFRA": "Infrastructures",
+    "IDXTRANS": "Transportation & Logistic",
+}
+
+# Yahoo's sector names in Ticker.info -> IDX-IC sector (IDX-IC has no separate
+# utilities or telecom sector; both are infrastructure)
+YAHOO_SECTORS = {
+    "Energy": "Energy",
+    "Basic Materials": "Basic Materials",
+    "Industrials": "Industrials",
+    "Consumer Defensive": "Consumer Non-Cyclicals",
+    "Consumer Cyclical": "Consumer Cyclicals",
+    "Healthcare": "Healthcare",
+    "Financial Services": "Financials",
+    "Real Estate": "Properties & Real Estate",
+    "Technology": "Technology",
+    "Utilities": "Infrastructures",
+    "Communication Services": "Infrastructures",
+}
+
+# Column names in IDX exports (Daftar Saham, index constituents) and common variants
+IMPORT_COLUMNS = {
+    "kode": "symbol", "kode saham": "symbol", "code": "symbol", "ticker": "symbol", "symbol": "symbol",
+    "nama": "name", "nama perusahaan": "name", "name": "name", "company": "name",
+    "sektor": "sector", "sector": "sector",
+    "papan pencatatan": "board", "papan": "board", "board": "board",
+    "tanggal pencatatan": "listed_date", "listing date": "listed_date", "listed_date": "listed_date",
+    "status": "status", "indices": "indices",
+}
+
+
+def _split(indices: Any) -> List[str]:
+    return [i for i in str(indices).split(";") if i] if isinstance(indices, str) else []
+
+
+class SymbolMaster:
+    def __init__(self, path: str = SYMBOL_MASTER_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._seed: Dict[str, List[str]] = {}
+        self._table: Optional[pd.DataFrame] = None
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            frame = pd.read_csv(self.path, dtype={"symbol": str, "indices": str}, keep_default_na=False, na_values=[""],
+                                float_precision="round_trip")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read symbol master {self.path}: {e}")
+            return
+        frame = frame.reindex(columns=COLUMNS)
+        for row in frame.to_dict("records"):
+            self._rows[row["symbol"]] = {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items()}
+        logger.info(f"Loaded {len(self._rows)} symbols from {self.path}")
+
+    def save(self):
+        with self._lock:
+            self._table = None
+        if not self.path:
+            return
+        with self._lock:
+            frame = pd.DataFrame(sorted(self._rows.values(), key=lambda r: r["symbol"]), columns=COLUMNS)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        frame.to_csv(self.path + suffix, index=False)
+        os.replace(self.path + suffix, self.path)
+
+    def _row(self, symbol: str) -> Dict[str, Any]:
+        if symbol not in self._rows:
+            self._rows[symbol] = {**dict.fromkeys(COLUMNS), "symbol": symbol, "status": "listed"}
+        return self._rows[symbol]
+
+    # Universes
+
+    def seed(self, indices: Dict[str, List[str]]):
+        """
+        Built-in member lists, used for an index until its membership is
+        imported (they are never written to the table)
+        """
+        with self._lock:
+            self._seed = {index.upper(): list(symbols) for index, symbols in indices.items()}
+
+    def _known(self, symbol: str) -> bool:
+        return symbol in self._rows or any(symbol in symbols for symbols in self._seed.values())
+
+    def indices(self) -> Dict[str, int]:
+        """Every universe name with its number of listed members"""
+        with self._lock:
+            names = sorted({i for row in self._rows.values() for i in _split(row["indices"])} | set(self._seed))
+        return {name: len(self.members(name)) for name in ["ALL", *names, *SECTOR_INDICES]}
+
+    def members(self, index: str) -> List[str]:
+        """Listed symbols of a universe, sorted ([] when unknown)"""
+        index = index.upper()
+        with self._lock:
+            unlisted = {s for s, row in self._rows.items() if row["status"] != "listed"}
+            if index == "ALL":
+                selected = set(self._rows) | {s for symbols in self._seed.values() for s in symbols}
+            elif index in SECTOR_INDICES:
+                selected = {s for s, row in self._rows.items() if row["sector"] == SECTOR_INDICES[index]}
+            else:
+                selected = {s for s, row in self._rows.items() if index in _split(row["indices"])}
+                if not selected:
+                    selected = set(self._seed.get(index, []))
+        return sorted(selected - unlisted)
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._rows.get(symbol)
+            return dict(row) if row is not None else None
+
+    # Liquidity
+
+    def table(self) -> pd.DataFrame:
+        """The stats as a frame indexed by symbol (STATS as floats, as_of parsed), rebuilt after changes"""
+        with self._lock:
+            if self._table is None:
+                frame = pd.DataFrame(list(self._rows.values()), columns=COLUMNS).set_index("symbol")
+                frame[STATS] = frame[STATS].astype(float)
+                frame["as_of"] = pd.to_datetime(frame["stats_as_of"], utc=True).dt.tz_convert(WIB)
+                self._table = frame
+            return self._table
+
+    def _ages(self, frame: pd.DataFrame, now: pd.Timestamp):
+        """(fresh, current) masks: stats young enough for the volume stage, and describing the latest bar"""
+        as_of = frame["as_of"]
+        fresh = (now - as_of <= pd.Timedelta(days=LIQUIDITY_MAX_AGE_DAYS)).to_numpy()
+        until = {t: valid_until(t) for t in as_of.dropna().unique()}
+        current = (pd.to_datetime(as_of.map(until), utc=True) > now).to_numpy()
+        return fresh, current
+
+    def prefilter(self, symbols: Iterable[str], min_avg_volume: float = 0, min_avg_value: float = 0,
+                  min_closing_strength: Optional[float] = None, min_volume_ratio: Optional[float] = None) -> List[str]:
+        """
+        symbols, in order, without those their stored stats rule out: fresh
+        average volume (or value) below PREFILTER_MARGIN of the minimum, then
+        a current latest bar below min_closing_strength or min_volume_ratio
+        """
+        symbols = list(symbols)
+        if not (min_avg_volume or min_avg_value or min_closing_strength or min_volume_ratio):
+            return symbols
+        stats = self.table().reindex(symbols)
+        fresh, current = self._ages(stats, now_wib())
+        keep = np.ones(len(symbols), dtype=bool)
+        counts = [len(symbols)]
+        # NaN comparisons are False: symbols without stats are kept
+        with np.errstate(invalid="ignore"):
+            for column, minimum in (("avg_volume", min_avg_volume), ("avg_value", min_avg_value)):
+                if minimum:
+                    keep &= ~(fresh & (stats[column].to_numpy() < minimum * PREFILTER_MARGIN))
+            counts.append(int(keep.sum()))
+            for column, minimum in (("closing_strength", min_closing_strength), ("volume_ratio", min_volume_ratio)):
+                if minimum is not None:
+                    keep &= ~(current & (stats[column].to_numpy() < minimum))
+            counts.append(int(keep.sum()))
+        if counts[-1] < counts[0]:
+            logger.info(f"Pre-filter: {counts[0]} symbols, {counts[1]} after liquidity, {counts[2]} after latest bar")
+        return [symbol for symbol, kept in zip(symbols, keep) if kept]
+
+    def observe(self, panel: OHLCVPanel, symbols: Optional[Iterable[str]] = None, save: bool = True):
+        """Update the stats of symbols from bars already loaded (the last 20 of each)"""
+        symbols = [s for s in (symbols if symbols is not None else panel.symbols) if s in panel]
+        if not symbols:
+            return
+        from panel_indicators import right_align
+
+        aligned, lengths = right_align(panel, symbols)
+        recent = aligned[-21:]
+        high, low, close, volume = (recent[:, :, OHLCV_FIELDS.index(f)] for f in ("High", "Low", "Close", "Volume"))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_volume = np.nanmean(volume[1:], axis=0)
+            avg_value = np.nanmean(close[1:] * volume[1:], axis=0)
+            true_range = np.maximum(high[1:] - low[1:], np.maximum(abs(high[1:] - close[:-1]), abs(low[1:] - close[:-1])))
+            atr_pct = np.mean(true_range[-14:], axis=0) / close[-1] * 100
+            closing_strength = np.where(high[-1] > 0, close[-1] / high[-1] * 100, 0.0)
+            # As _evaluate_day_trade() computes it (NaN when a volume is missing)
+            vol_avg = np.mean(volume[1:], axis=0)
+            volume_ratio = np.where(vol_avg > 0, volume[-1] / vol_avg, 1.0)
+        as_of = now_wib().isoformat(timespec="seconds")
+
+        def value(x):
+            return None if np.isnan(x) else float(x)
+
+        with self._lock:
+            for j, symbol in enumerate(symbols):
+                # Only symbols of the exchange get rows (not ad-hoc tickers)
+                if lengths[j] == 0 or np.isnan(avg_volume[j]) or not self._known(symbol):
+                    continue
+                row = self._row(symbol)
+                row.update(avg_volume=round(float(avg_volume[j])), avg_value=round(float(avg_value[j])),
+                           last_close=float(close[-1, j]), atr_pct=value(np.round(atr_pct[j], 2)),
+                           closing_strength=value(closing_strength[j]), volume_ratio=value(volume_ratio[j]),
+                           stats_as_of=as_of)
+            self._table = None
+        if save:
+            self.save()
+
+    def stale(self, symbols: Iterable[str], before: pd.Timestamp) -> List[str]:
+        """symbols whose stats are missing or were measured before `before`"""
+        symbols = list(symbols)
+        as_of = self.table()["as_of"].reindex(symbols)
+        return [symbol for symbol, old in zip(symbols, (as_of < before) | as_of.isna()) if old]
+
+    def refresh_liquidity(self, symbols: Optional[Iterable[str]] = None, period: str = "1mo"):
+        """Load recent bars for symbols (default ALL) and store their stats"""
+        from market_data import load_panel
+
+        symbols = list(symbols) if symbols is not None else self.members("ALL")
+        if not symbols:
+            return
+        self.observe(load_panel(symbols, period=period), symbols)
+        logger.info(f"Refreshed liquidity for {len(symbols)} symbols")
+
+    def refresh_sectors(self, symbols: Optional[Iterable[str]] = None, overwrite: bool = False):
+        """Fill sectors from Ticker.info (mapped to IDX-IC) for symbols without one"""
+        from info_cache import info_cache
+
+        with self._lock:
+            symbols = list(symbols) if symbols is not None else self.members("ALL")
+            todo = [s for s in symbols if overwrite or not (self._rows.get(s) or {}).get("sector")]
+        filled = 0
+        for symbol in todo:
+            info = info_cache.get(symbol, fields=["sector", "longName"])
+            sector = YAHOO_SECTORS.get(info.get("sector"))
+            with self._lock:
+                row = self._row(symbol)
+                if sector:
+                    row["sector"] = sector
+                    filled += 1
+                if not row["name"] and info.get("longName"):
+                    row["name"] = info["longName"]
+        self.save()
+        logger.info(f"Filled sectors for {filled}/{len(todo)} symbols")
+
+    # Imports
+
+    def import_file(self, path: str, index: Optional[str] = None, complete: bool = False) -> int:
+        """
+        Add or update rows from a CSV or Excel export. With index, the file
+        is that index's member list and replaces its membership; with
+        complete, it lists the whole exchange and symbols missing from it
+        are marked delisted. Returns the number of rows read.
+        """
+        frame = pd.read_excel(path, dtype=str) if path.endswith((".xls", ".xlsx")) else pd.read_csv(path, dtype=str)
+        frame = frame.rename(columns=lambda c: IMPORT_COLUMNS.get(str(c).strip().lower(), str(c)))
+        if "symbol" not in frame.columns:
+            raise ValueError(f"{path} has no symbol/kode column")
+        frame["symbol"] = frame["symbol"].str.strip().str.upper().str.replace(r"\.JK$", "", regex=True)
+        frame = frame.dropna(subset=["symbol"]).drop_duplicates("symbol")
+        fields = [c for c in ("name", "sector", "board", "listed_date", "status", "indices") if c in frame.columns]
+
+        with self._lock:
+            seen = set()
+            for record in frame.to_dict("records"):
+                row = self._row(record["symbol"])
+                row.update({f: record[f] for f in fields if isinstance(record[f], str) and record[f]})
+                if complete and "status" not in fields:
+                    row["status"] = "listed"
+                seen.add(record["symbol"])
+            if index:
+                index = index.upper()
+                for symbol, row in self._rows.items():
+                    members = [i for i in _split(row["indices"]) if i != index]
+                    row["indices"] = ";".join(members + ([index] if symbol in seen else [])) or None
+            if complete:
+                for symbol, row in self._rows.items():
+                    if symbol not in seen:
+                        row["status"] = "delisted"
+        self.save()
+        logger.info(f"Imported {len(frame)} symbols from {path}" + (f" as {index}" if index else ""))
+        return len(frame)
+
+    def stats(self) -> Dict[str, Any]:
+        frame = self.table()
+        fresh, current = self._ages(frame, now_wib())
+        return {
+            "symbols": len(frame),
+            "listed": int((frame["status"] == "listed").sum()),
+            "with_sector": int(frame["sector"].notna().sum()),
+            "fresh_liquidity": int(fresh.sum()),
+            "current_bar": int(current.sum()),
+        }
+
+
+# Shared table used by the API and the screens
+symbol_master = SymbolMaster()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the IDX symbol master")
+    parser.add_argument("--import", dest="import_path", type=str, default=None, help="CSV/Excel export to import")
+    parser.add_argument("--index", type=str, default=None, help="The import is this index's member list")
+    parser.add_argument("--complete", action="store_true", help="The import lists every listed symbol")
+    parser.add_argument("--refresh_liquidity", action="store_true", help="Download a month of bars and store liquidity")
+    parser.add_argument("--refresh_sectors", action="store_true", help="Fill missing sectors from Ticker.info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(message)s", stream=sys.stderr)
+    # The API's shared table, seeded with its LQ45/IDX30 lists
+    import stock_api_server  # noqa: F401
+    from symbol_master import symbol_master
+
+    if args.import_path:
+        symbol_master.import_file(args.import_path, index=args.index, complete=args.complete)
+    if args.refresh_sectors:
+        symbol_master.refresh_sectors()
+    if args.refresh_liquidity:
+        symbol_master.refresh_liquidity()
+    for name, count in symbol_master.indices().items():
+        print(f"{name:<12} {count:>5}")
+    print(symbol_master.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())